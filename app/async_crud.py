@@ -0,0 +1,483 @@
+"""
+Versões assíncronas das operações de `crud.py`, usadas quando DB_MODE=async.
+
+As regras de validação e as mensagens de erro são as mesmas da versão
+síncrona; apenas o acesso ao banco é feito com AsyncSession.
+"""
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from . import changefeed, models, schemas
+from .cache import task_cache, task_key
+from .logging_config import log_failure
+from .crud import (
+    TASK_COLUMNS, apply_task_filters, apply_task_page, cached_tasks, can_fill_cache,
+    delete_task_statement, expired_idempotency_keys, flight_key, idempotency_record_key, merge_batch,
+    new_idempotency_record, parse_ids, parse_page, request_hash, should_purge_idempotency_keys,
+    stored_response, update_task_statement
+)
+from .singleflight import AsyncSingleFlight
+import logging
+
+
+logger = logging.getLogger("app")
+
+# Ver `crud.task_flight` e `crud.idempotency_flight`
+task_flight = AsyncSingleFlight()
+idempotency_flight = AsyncSingleFlight()
+
+async def create_task(db: AsyncSession, task: schemas.TaskCreate) -> models.Task:
+    """
+    Cria uma nova tarefa no banco de dados.
+
+    Args:
+        db: Sessão assíncrona do banco de dados
+        task: Dados da tarefa a ser criada (validados pelo esquema TaskCreate)
+
+    Returns:
+        Task: A tarefa criada com todos os dados (incluindo ID gerado)
+    """
+    try:
+        if not task.title or not task.title.strip():
+            raise ValueError("O título da tarefa não pode estar vazio")
+
+        db_task = models.Task(
+            title=task.title.strip(),
+            description=task.description.strip() if task.description else None
+        )
+
+        db.add(db_task)
+        # O ID é necessário para o evento do feed de alterações
+        await db.flush()
+        changefeed.record(db, "created", [db_task.id])
+        await db.commit()
+        await db.refresh(db_task)
+        logger.info(f"Creating new task {task.title}")
+        return db_task
+
+    except ValueError as e:
+        await db.rollback()
+        log_failure(logger, "Failed to create task", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error("Failed to create task", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao salvar a tarefa no banco de dados: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Failed to create task", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao criar tarefa: {str(e)}"
+        )
+
+async def _create_or_replay(
+    db: AsyncSession, task: schemas.TaskCreate, record_key: str, fingerprint: str
+) -> tuple[str, bool]:
+    record = await db.get(models.IdempotencyKey, record_key)
+    body = stored_response(record, fingerprint)
+    if body is not None:
+        return body, True
+
+    if not task.title or not task.title.strip():
+        raise ValueError("O título da tarefa não pode estar vazio")
+
+    try:
+        if record is not None:
+            db.expunge(record)
+            await db.execute(expired_idempotency_keys(record_key))
+        record = new_idempotency_record(record_key, fingerprint)
+        db.add(record)
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        body = stored_response(await db.get(models.IdempotencyKey, record_key), fingerprint)
+        if body is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Já existe uma requisição com esta Idempotency-Key em andamento"
+            )
+        return body, True
+
+    db_task = models.Task(
+        title=task.title.strip(),
+        description=task.description.strip() if task.description else None
+    )
+    db.add(db_task)
+    await db.flush()
+    await db.refresh(db_task)
+    record.response = schemas.Task.model_validate(db_task).model_dump_json()
+    changefeed.record(db, "created", [db_task.id])
+    if should_purge_idempotency_keys():
+        await db.execute(expired_idempotency_keys())
+    await db.commit()
+    logger.info(f"Creating new task {task.title}")
+    return record.response, False
+
+async def create_task_idempotent(
+    db: AsyncSession, task: schemas.TaskCreate, idempotency_key: str, client: str
+) -> tuple[str, bool]:
+    """
+    Cria uma tarefa uma única vez por Idempotency-Key (ver `crud.create_task_idempotent`).
+
+    Raises:
+        HTTPException:
+            - 400: Se a chave ou os dados forem inválidos
+            - 409: Se a requisição original ainda não terminou
+            - 422: Se a chave já foi usada com outro corpo
+            - 500: Se ocorrer erro no banco de dados
+    """
+    try:
+        record_key = idempotency_record_key(client, idempotency_key)
+        fingerprint = request_hash(task)
+        executed = False
+
+        async def create() -> tuple[str, bool]:
+            nonlocal executed
+            executed = True
+            return await _create_or_replay(db, task, record_key, fingerprint)
+
+        body, replayed = await idempotency_flight.do(f"{record_key}:{fingerprint}", create)
+        return body, replayed or not executed
+
+    except ValueError as e:
+        await db.rollback()
+        log_failure(logger, "Failed to create task", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException as e:
+        await db.rollback()
+        log_failure(logger, "Failed to create task", e)
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Failed to create task", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao salvar a tarefa no banco de dados: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Failed to create task", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao criar tarefa: {str(e)}"
+        )
+
+async def get_tasks(
+    db: AsyncSession, skip: int = 0, limit: int = 100, after: str | None = None,
+    filters: schemas.TaskFilter | None = None, sort: str = "id",
+    entities=(models.Task,)
+) -> List[models.Task]:
+    """
+    Retorna uma lista paginada de tarefas (por deslocamento ou por cursor).
+
+    Args:
+        db: Sessão assíncrona do banco de dados
+        skip: Número de registros a pular (para paginação)
+        limit: Número máximo de registros a retornar (para paginação)
+        after: Cursor opaco retornado pela página anterior (modo cursor)
+        filters: Filtros por prefixo do título, busca textual e data de criação
+        sort: Campo de ordenação (id, created_at ou title; "-" para decrescente)
+        entities: Entidade ou colunas selecionadas (ver `crud.TASK_COLUMNS`)
+
+    Returns:
+        List[models.Task]: Lista de tarefas encontradas
+    """
+    try:
+        page = parse_page(skip, limit, after, sort)
+        query = select(*entities)
+        if filters is not None:
+            query = apply_task_filters(query, filters, db.bind.dialect.name)
+        query = apply_task_page(query, page)
+
+        result = await db.execute(query)
+        if len(entities) == 1:
+            return list(result.scalars().all())
+        return list(result.all())
+
+    except ValueError as e:
+        log_failure(logger, "Failed to get tasks", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error("Failed to get tasks", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao acessar o banco de dados: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Failed to get tasks", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao recuperar tarefas: {str(e)}"
+        )
+
+async def get_task_rows(
+    db: AsyncSession, skip: int = 0, limit: int = 100, after: str | None = None,
+    filters: schemas.TaskFilter | None = None, sort: str = "id"
+):
+    """
+    Retorna a página como linhas com as colunas de `crud.TASK_COLUMNS`,
+    sem objetos do ORM (para a serialização rápida).
+    """
+    return await get_tasks(
+        db, skip=skip, limit=limit, after=after, filters=filters, sort=sort,
+        entities=TASK_COLUMNS
+    )
+
+async def get_task(db: AsyncSession, task_id: int) -> models.Task:
+    """
+    Retorna uma tarefa específica pelo seu ID.
+
+    Raises:
+        HTTPException:
+            - 400: Se o ID for inválido
+            - 404: Se a tarefa não for encontrada
+            - 500: Se ocorrer um erro no banco de dados
+    """
+    try:
+        if not isinstance(task_id, int) or task_id <= 0:
+            raise ValueError("ID da tarefa deve ser um número inteiro positivo")
+
+        task = await db.get(models.Task, task_id)
+
+        if task is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tarefa com ID {task_id} não encontrada"
+            )
+
+        return task
+
+    except ValueError as e:
+        log_failure(logger, "Failed to get task", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error("Failed to get task", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao acessar o banco de dados: {str(e)}"
+        )
+    except HTTPException as e:
+        log_failure(logger, "Failed to get task", e)
+        raise
+    except Exception as e:
+        logger.error("Failed to get task", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao buscar tarefa: {str(e)}"
+        )
+
+async def _cache_call(method, *args):
+    """
+    Executa uma operação do cache. Com um backend de rede (Redis, cliente
+    síncrono) ela vai para o threadpool para não bloquear o event loop.
+    """
+    if task_cache.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+async def get_task_cached(db: AsyncSession, task_id: int) -> schemas.Task:
+    """
+    Versão com cache de leitura de `get_task` (ver `crud.get_task_cached`).
+    """
+    key = task_key(task_id)
+    cached = await _cache_call(task_cache.get, key)
+    if cached is not None:
+        return schemas.Task.model_validate_json(cached)
+
+    generation = await _cache_call(task_cache.generation)
+
+    async def load() -> schemas.Task:
+        task = schemas.Task.model_validate(await get_task(db, task_id))
+        if can_fill_cache(db):
+            await _cache_call(task_cache.fill, key, task.model_dump_json(), generation)
+        return task
+
+    return await task_flight.do(flight_key(db, key, generation), load)
+
+def _fill_tasks(tasks: list[schemas.Task], generation: int):
+    for task in tasks:
+        task_cache.fill(task_key(task.id), task.model_dump_json(), generation)
+
+async def get_tasks_batch(db: AsyncSession, ids: str) -> schemas.TaskBatch:
+    """
+    Versão assíncrona de `crud.get_tasks_batch`.
+    """
+    try:
+        task_ids = parse_ids(ids)
+        found = await _cache_call(cached_tasks, task_ids)
+        misses = [task_id for task_id in task_ids if task_id not in found]
+        if misses:
+            generation = await _cache_call(task_cache.generation)
+            fill = can_fill_cache(db)
+            rows = (await db.execute(select(models.Task).where(models.Task.id.in_(misses)))).scalars()
+            loaded = [schemas.Task.model_validate(row) for row in rows]
+            if fill and loaded:
+                await _cache_call(_fill_tasks, loaded, generation)
+            found.update((task.id, task) for task in loaded)
+        return merge_batch(task_ids, found)
+
+    except ValueError as e:
+        log_failure(logger, "Failed to get tasks batch", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error("Failed to get tasks batch", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao acessar o banco de dados: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Failed to get tasks batch", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao buscar tarefas: {str(e)}"
+        )
+
+async def update_task(db: AsyncSession, task_id: int, task: schemas.TaskCreate) -> models.Task:
+    """
+    Atualiza uma tarefa existente no banco de dados.
+
+    Raises:
+        HTTPException:
+            - 400: Se os dados ou ID forem inválidos
+            - 404: Se a tarefa não for encontrada
+            - 500: Se ocorrer erro no banco de dados
+    """
+    try:
+        if not isinstance(task_id, int) or task_id <= 0:
+            raise ValueError("ID da tarefa deve ser um número inteiro positivo")
+
+        if not task.title or not task.title.strip():
+            raise ValueError("O título da tarefa não pode estar vazio")
+
+        returning = db.bind.dialect.update_returning
+        try:
+            if returning:
+                # Um único UPDATE ... RETURNING, sem SELECT prévio nem refresh
+                db_task = (await db.execute(update_task_statement(task_id, task))).scalar_one_or_none()
+            else:
+                db_task = await db.get(models.Task, task_id)
+                if db_task:
+                    db_task.title = task.title.strip()
+                    db_task.description = task.description.strip() if task.description else None
+                    db_task.version = models.Task.version + 1
+
+            if not db_task:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Tarefa com ID {task_id} não encontrada"
+                )
+
+            if returning:
+                db.expunge(db_task)
+            changefeed.record(db, "updated", [task_id])
+            await db.commit()
+            await _cache_call(task_cache.invalidate, task_key(task_id))
+            if not returning:
+                await db.refresh(db_task)
+        except SQLAlchemyError as e:
+            logger.error("Failed to update task", exc_info=True)
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro ao atualizar a tarefa no banco de dados: {str(e)}"
+            )
+
+        return db_task
+
+    except ValueError as e:
+        log_failure(logger, "Failed to update task", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException as e:
+        log_failure(logger, "Failed to update task", e)
+        raise
+    except Exception as e:
+        logger.error("Failed to update task", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao atualizar tarefa: {str(e)}"
+        )
+
+async def delete_task(db: AsyncSession, task_id: int) -> models.Task:
+    """
+    Exclui uma tarefa do banco de dados.
+
+    Raises:
+        HTTPException:
+            - 400: Se o ID for inválido
+            - 404: Se a tarefa não for encontrada
+            - 500: Se ocorrer erro no banco de dados
+    """
+    try:
+        if not isinstance(task_id, int) or task_id <= 0:
+            raise ValueError("ID da tarefa deve ser um número inteiro positivo")
+
+        returning = db.bind.dialect.delete_returning
+        try:
+            if returning:
+                # Um único DELETE ... RETURNING devolve a tarefa excluída
+                db_task = (await db.execute(delete_task_statement(task_id))).scalar_one_or_none()
+            else:
+                db_task = await db.get(models.Task, task_id)
+
+            if not db_task:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Tarefa com ID {task_id} não encontrada"
+                )
+
+            if returning:
+                db.expunge(db_task)
+            else:
+                await db.delete(db_task)
+            changefeed.record(db, "deleted", [task_id])
+            await db.commit()
+            await _cache_call(task_cache.invalidate, task_key(task_id))
+        except SQLAlchemyError as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro ao excluir a tarefa do banco de dados: {str(e)}"
+            )
+
+        return db_task
+
+    except ValueError as e:
+        log_failure(logger, "Failed to delete task", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException as e:
+        log_failure(logger, "Failed to delete task", e)
+        raise
+    except Exception as e:
+        logger.error("Failed to delete task", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao excluir tarefa: {str(e)}"
+        )
@@ -0,0 +1,267 @@
+"""
+Cache de leitura (read-through) para tarefas individuais.
+
+Os valores guardados são o JSON de `schemas.Task`. O backend é escolhido por
+CACHE_BACKEND: "memory" (LRU com TTL no próprio processo), "redis" (qualquer
+cliente compatível com get/set/delete) ou "none" (desativado).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class CacheStats:
+    """Contadores de acertos, faltas e remoções do cache."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class BaseCache:
+    """
+    Interface comum dos backends: `get`, `set` e `delete` de strings.
+
+    Para que uma leitura lenta não grave no cache um valor anterior a uma
+    escrita concorrente, quem lê o banco obtém `generation()` antes da
+    consulta e grava com `fill()`, que descarta o valor se houve alguma
+    invalidação no meio tempo. A comparação e a gravação são atômicas em
+    relação ao incremento da geração; como a invalidação incrementa antes de
+    remover a chave, um `fill` que passou na comparação é apagado em seguida.
+    """
+    name = "base"
+    # Operações com E/S de rede: o código assíncrono as executa no threadpool
+    blocking = False
+
+    def __init__(self):
+        self.stats = CacheStats()
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        # Instante (monotônico) da última invalidação
+        self.invalidated_at = float("-inf")
+
+    def get(self, key: str) -> str | None:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def size(self) -> int | None:
+        return None
+
+    def generation(self) -> int:
+        return self._generation
+
+    def fill(self, key: str, value: str, generation: int):
+        with self._generation_lock:
+            if generation == self._generation:
+                self.set(key, value)
+
+    def _next_generation(self):
+        with self._generation_lock:
+            self._generation += 1
+
+    def invalidate(self, key: str):
+        self._next_generation()
+        self.invalidated_at = time.monotonic()
+        self.delete(key)
+        self.stats.incr("invalidations")
+
+    def get_many(self, keys: list[str]) -> list[str | None]:
+        return [self.get(key) for key in keys]
+
+    def delete_many(self, keys: list[str]):
+        for key in keys:
+            self.delete(key)
+
+    def invalidate_many(self, keys: list[str]):
+        if not keys:
+            return
+        self._next_generation()
+        self.invalidated_at = time.monotonic()
+        self.delete_many(keys)
+        self.stats.incr("invalidations", len(keys))
+
+
+class NullCache(BaseCache):
+    """Backend desativado: toda leitura é uma falta."""
+    name = "none"
+
+    def get(self, key):
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+
+class MemoryCache(BaseCache):
+    """Cache LRU com TTL mantido na memória do processo."""
+    name = "memory"
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS,
+                 clock=time.monotonic):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.stats.incr("hits")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self.stats.incr("evictions")
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.incr("evictions", evicted)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def size(self):
+        return len(self._entries)
+
+
+# Grava o valor apenas se a geração compartilhada não mudou desde a leitura
+FILL_IF_GENERATION_LUA = """
+local current = redis.call('GET', KEYS[1]) or '0'
+if current ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class RedisCache(BaseCache):
+    """
+    Backend para um servidor compatível com Redis. Recebe o cliente pronto
+    (ex.: `redis.Redis`), o que permite usar um dublê local nos testes.
+    A expiração e a remoção por memória ficam a cargo do servidor.
+
+    A geração fica no próprio Redis, compartilhada pelos workers: uma
+    escrita em um worker descarta o `fill` de uma leitura em andamento em
+    outro. A comparação e o SET são feitos por um script Lua.
+    """
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client, ttl: float = CACHE_TTL_SECONDS, prefix: str = "tasksynchub:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.generation_key = prefix + "generation"
+        self._fill_script = client.register_script(FILL_IF_GENERATION_LUA)
+
+    def generation(self):
+        value = self.client.get(self.generation_key)
+        return int(value) if value is not None else 0
+
+    def fill(self, key, value, generation):
+        self._fill_script(
+            keys=[self.generation_key, self.prefix + key],
+            args=[generation, value, max(int(self.ttl), 1)],
+        )
+
+    def _next_generation(self):
+        self.client.incr(self.generation_key)
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return value.decode() if isinstance(value, bytes) else value
+
+    def get_many(self, keys):
+        # Um MGET em vez de um GET por chave
+        if not keys:
+            return []
+        values = self.client.mget([self.prefix + key for key in keys])
+        hits = sum(value is not None for value in values)
+        self.stats.incr("hits", hits)
+        self.stats.incr("misses", len(values) - hits)
+        return [value.decode() if isinstance(value, bytes) else value for value in values]
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=max(int(self.ttl), 1))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def delete_many(self, keys):
+        # Um DEL com várias chaves por vez em vez de um comando por chave
+        for start in range(0, len(keys), 1000):
+            self.client.delete(*(self.prefix + key for key in keys[start:start + 1000]))
+
+
+def build_cache(backend: str = CACHE_BACKEND) -> BaseCache:
+    """Cria o backend configurado em CACHE_BACKEND."""
+    if backend == "none":
+        return NullCache()
+    if backend == "redis":
+        import redis
+
+        return RedisCache(redis.Redis.from_url(REDIS_URL))
+    if backend == "memory":
+        return MemoryCache()
+    raise ValueError(f"CACHE_BACKEND inválido: '{backend}'")
+
+
+def task_key(task_id: int) -> str:
+    return f"task:{task_id}"
+
+
+task_cache = build_cache()
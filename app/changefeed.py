@@ -0,0 +1,359 @@
+"""
+Feed de alterações das tarefas (GET /tasks/changes, server-sent events).
+
+As funções de escrita do `crud`/`async_crud` registram na sessão as tarefas
+criadas, alteradas e excluídas (`record`); os eventos só são publicados
+quando a transação é confirmada e são descartados se ela for desfeita.
+
+- `CHANGEFEED_BACKEND=memory`: os eventos vão apenas para os assinantes do
+  próprio worker.
+- `CHANGEFEED_BACKEND=postgres`: os eventos são enviados com `pg_notify` na
+  mesma transação da escrita, e cada worker recebe todos eles por uma conexão
+  dedicada com `LISTEN`. Use com vários workers.
+
+Cada worker guarda os últimos CHANGEFEED_BACKLOG eventos, já codificados. Um
+cliente que reconecta com o header `Last-Event-ID` recebe o que perdeu; se o
+evento não estiver mais no buffer, recebe `{"type": "reset"}` e deve reler a
+lista. Os assinantes não têm fila nem timer próprios: todos esperam o mesmo
+`asyncio.Event`, acordado a cada publicação e pelo keep-alive periódico, de
+modo que assinantes ociosos não consomem CPU.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import secrets
+import signal
+import threading
+from collections import deque
+
+import orjson
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from . import database
+
+# memory ou postgres
+CHANGEFEED_BACKEND = os.getenv("CHANGEFEED_BACKEND", "memory").lower()
+CHANGEFEED_BACKLOG = int(os.getenv("CHANGEFEED_BACKLOG", "1000"))
+CHANGEFEED_HEARTBEAT_SECONDS = float(os.getenv("CHANGEFEED_HEARTBEAT_SECONDS", "15"))
+CHANGEFEED_CHANNEL = os.getenv("CHANGEFEED_CHANNEL", "task_changes")
+
+# Chave de `Session.info` com os eventos ainda não confirmados
+PENDING_INFO = "changefeed_pending"
+
+# Eventos por NOTIFY (o payload do PostgreSQL é limitado a 8000 bytes)
+NOTIFY_BATCH = 100
+
+# Intervalo de reconexão sugerido ao navegador, em milissegundos
+CLIENT_RETRY_MS = 3000
+
+KEEPALIVE = b": keepalive\n\n"
+RESET = b'data: {"type":"reset"}\n\n'
+
+logger = logging.getLogger("app")
+
+# IDs únicos entre processos: os workers recebem os mesmos eventos do
+# PostgreSQL, e o cliente pode reconectar em qualquer um deles
+_process_token = secrets.token_hex(4)
+_counter = itertools.count(1)
+
+
+def record(db, change: str, task_ids: list[int]):
+    """
+    Registra na sessão eventos `change` (created, updated ou deleted) para as
+    tarefas `task_ids`, a publicar quando a transação for confirmada.
+    """
+    pending = db.info.setdefault(PENDING_INFO, [])
+    pending.extend(
+        {"id": f"{_process_token}-{next(_counter)}", "type": change, "task_id": task_id}
+        for task_id in task_ids
+    )
+
+
+def encode(change: dict) -> bytes:
+    """Mensagem SSE do evento (o ID vai no campo `id`, o resto em `data`)."""
+    data = {key: value for key, value in change.items() if key != "id"}
+    return b"id: " + change["id"].encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+class ChangeFeed:
+    """
+    Buffer dos últimos eventos do worker e entrega aos assinantes.
+
+    `publish` pode ser chamado de qualquer thread (rotas síncronas); o resto
+    roda no event loop.
+    """
+
+    def __init__(self, backlog: int = CHANGEFEED_BACKLOG, heartbeat: float = CHANGEFEED_HEARTBEAT_SECONDS):
+        self.heartbeat = heartbeat
+        # (sequência local, id do evento, mensagem SSE)
+        self._events: deque = deque(maxlen=backlog)
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._loop = None
+        self._task = None
+        self._closed = False
+        self.subscribers = 0
+        self.published = 0
+
+    def publish(self, changes: list):
+        loop = self._loop
+        # Sem event loop (feed não iniciado) não há assinantes
+        if loop is None or not changes:
+            return
+        loop.call_soon_threadsafe(self.append, changes)
+
+    def append(self, changes: list):
+        for change in changes:
+            self._seq += 1
+            self._events.append((self._seq, change["id"], encode(change)))
+        self.published += len(changes)
+        self._wake()
+
+    def reset(self):
+        """Descarta o buffer: quem estava conectado recebe `reset` (eventos podem ter se perdido)."""
+        self._events.clear()
+        self._seq += 1
+        self._wake()
+
+    def _wake(self):
+        # Um Event novo para a próxima espera; os assinantes acordam todos juntos
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    def _position(self, last_event_id: str | None) -> int | None:
+        """Sequência do último evento recebido pelo cliente, ou None se ele não está no buffer."""
+        if last_event_id is None:
+            return self._seq
+        for seq, event_id, _ in reversed(self._events):
+            if event_id == last_event_id:
+                return seq
+        return None
+
+    def _since(self, position: int) -> list[bytes] | None:
+        """Mensagens posteriores a `position`, ou None se alguma já saiu do buffer."""
+        missing = self._seq - position
+        if missing <= 0:
+            return []
+        if missing > len(self._events):
+            return None
+        return [self._events[-i][2] for i in range(missing, 0, -1)]
+
+    async def subscribe(self, last_event_id: str | None = None):
+        """Gera as mensagens SSE para um assinante até o feed ser encerrado."""
+        self.subscribers += 1
+        try:
+            yield f"retry: {CLIENT_RETRY_MS}\n\n".encode()
+            position = self._position(last_event_id)
+            if position is None:
+                yield RESET
+                position = self._seq
+            while not self._closed:
+                # Capturados antes do yield: o que for publicado enquanto a
+                # mensagem é enviada acorda a próxima espera imediatamente
+                wakeup = self._wakeup
+                messages = self._since(position)
+                position = self._seq
+                if messages is None:
+                    yield RESET
+                elif messages:
+                    yield b"".join(messages)
+                await wakeup.wait()
+                if self._seq == position and not self._closed:
+                    yield KEEPALIVE
+        finally:
+            self.subscribers -= 1
+
+    async def _run_heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self._wake()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._closed = False
+        if self._task is None:
+            self._task = self._loop.create_task(self._run_heartbeat())
+
+    def close(self):
+        """Encerra os streams abertos (no event loop)."""
+        self._closed = True
+        self._wake()
+
+    def close_on_shutdown_signal(self):
+        """
+        Encerra os streams assim que o servidor recebe SIGTERM/SIGINT, antes
+        de ele esperar as conexões abertas terminarem: do contrário cada
+        cliente conectado faria o desligamento esperar todo o
+        SERVER_GRACEFUL_TIMEOUT. Chama em seguida o handler anterior (o do
+        uvicorn). Só tem efeito na thread principal.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(signum)
+
+            def handle_shutdown(signum, frame, previous=previous):
+                loop = self._loop
+                if loop is not None:
+                    loop.call_soon_threadsafe(self.close)
+                if callable(previous):
+                    previous(signum, frame)
+
+            signal.signal(signum, handle_shutdown)
+
+    async def stop(self):
+        # Encerra os streams ainda abertos
+        self.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+    def status(self) -> dict:
+        return {
+            "backend": CHANGEFEED_BACKEND,
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "buffered": len(self._events),
+        }
+
+
+class PostgresListener:
+    """
+    Conexão dedicada (fora do pool) com `LISTEN` no canal dos eventos. O
+    socket é observado pelo event loop (`add_reader`), sem thread nem polling.
+    """
+
+    def __init__(self, feed: ChangeFeed, url: str, channel: str = CHANGEFEED_CHANNEL,
+                 retry_seconds: float = 1.0):
+        # psycopg2 aceita a URL sem o sufixo do driver
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.feed = feed
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self._task = None
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    async def _listen(self, conn):
+        loop = asyncio.get_running_loop()
+        lost = loop.create_future()
+
+        def on_readable():
+            try:
+                conn.poll()
+            except Exception as e:
+                if not lost.done():
+                    lost.set_exception(e)
+                return
+            changes = []
+            while conn.notifies:
+                changes.extend(orjson.loads(conn.notifies.pop(0).payload))
+            if changes:
+                self.feed.append(changes)
+
+        loop.add_reader(conn.fileno(), on_readable)
+        try:
+            await lost
+        finally:
+            loop.remove_reader(conn.fileno())
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        connected_before = False
+        while True:
+            conn = None
+            try:
+                conn = await loop.run_in_executor(None, self._connect)
+                if connected_before:
+                    # Notificações enviadas durante a queda não chegaram
+                    self.feed.reset()
+                connected_before = True
+                await self._listen(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed listener disconnected: {type(e).__name__}")
+            finally:
+                if conn is not None:
+                    conn.close()
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+change_feed = ChangeFeed()
+_listener = None
+
+
+def start():
+    """Inicia o feed do worker (e o LISTEN, no backend postgres)."""
+    global _listener
+    if CHANGEFEED_BACKEND not in ("memory", "postgres"):
+        raise ValueError(f"CHANGEFEED_BACKEND inválido: '{CHANGEFEED_BACKEND}'")
+    change_feed.start()
+    change_feed.close_on_shutdown_signal()
+    if CHANGEFEED_BACKEND == "postgres" and _listener is None:
+        _listener = PostgresListener(change_feed, database.SQLALCHEMY_DATABASE_URL)
+        _listener.start()
+
+
+async def stop():
+    global _listener
+    if _listener is not None:
+        await _listener.stop()
+        _listener = None
+    await change_feed.stop()
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session):
+    # No backend postgres o NOTIFY faz parte da transação: só é entregue se ela for confirmada
+    if CHANGEFEED_BACKEND != "postgres":
+        return
+    pending = session.info.get(PENDING_INFO)
+    for start in range(0, len(pending or []), NOTIFY_BATCH):
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANGEFEED_CHANNEL, "payload": orjson.dumps(pending[start:start + NOTIFY_BATCH]).decode()}
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    pending = session.info.pop(PENDING_INFO, None)
+    if pending and CHANGEFEED_BACKEND == "memory":
+        change_feed.publish(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    # O rollback de um savepoint não desfaz o que foi registrado fora dele
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_INFO, None)
@@ -1,13 +1,53 @@
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, NamedTuple
+from sqlalchemy import (
+    Integer, any_, delete, func, insert, literal, literal_column, or_, select, text, tuple_, update
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from . import models, schemas
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from . import changefeed, models, schemas
+from .cache import task_cache, task_key
+from .database import REPLICA_MAX_LAG_INFO
+from .logging_config import log_failure
+from .pagination import decode_sort_cursor, parse_sort
+from .singleflight import SingleFlight
+import hashlib
+import itertools
 import logging
+import os
+import time
 
 
 logger = logging.getLogger("app")
 
+# Linhas buscadas por vez do cursor do servidor durante a exportação
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "1000"))
+
+# Quantidade de linhas por INSERT multi-linha na criação em lote
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "500"))
+TITLE_MAX_LENGTH = models.Task.title.type.length
+
+# IDs por comando nas alterações em lote quando o banco não aceita um array
+# como parâmetro único (o SQLite limita o número de variáveis por comando)
+BULK_ID_CHUNK_SIZE = 900
+
+# Máximo de IDs por requisição em GET /tasks/batch
+BATCH_MAX_IDS = 100
+
+# Leituras simultâneas da mesma tarefa (numa falta do cache) compartilham uma consulta
+task_flight = SingleFlight()
+
+# Validade das respostas guardadas por Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# A cada quantas chaves novas (por worker) as expiradas são removidas da tabela
+IDEMPOTENCY_PURGE_EVERY = 1000
+
+# Repetições simultâneas da mesma criação no worker esperam pela primeira
+idempotency_flight = SingleFlight()
+_idempotency_writes = itertools.count(1)
+
 def create_task(db: Session, task: schemas.TaskCreate) -> models.Task:
     """
     Cria uma nova tarefa no banco de dados.
@@ -32,6 +72,9 @@ def create_task(db: Session, task: schemas.TaskCreate) -> models.Task:
         
         
         db.add(db_task)
+        # O ID é necessário para o evento do feed de alterações
+        db.flush()
+        changefeed.record(db, "created", [db_task.id])
         db.commit()
         db.refresh(db_task)
         logger.info(f"Creating new task {task.title}")
@@ -39,11 +82,166 @@ def create_task(db: Session, task: schemas.TaskCreate) -> models.Task:
         
     except ValueError as e:
         db.rollback()
+        log_failure(logger, "Failed to create task", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error("Failed to create task", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao salvar a tarefa no banco de dados: {str(e)}"
+        )
+    except Exception as e:
         logger.error("Failed to create task", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao criar tarefa: {str(e)}"
+        )
+
+def idempotency_record_key(client: str, idempotency_key: str) -> str:
+    """Chave da tabela `idempotency_keys`: chaves iguais de clientes diferentes não colidem."""
+    if not idempotency_key or len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise ValueError(
+            f"O header 'Idempotency-Key' deve ter entre 1 e {IDEMPOTENCY_KEY_MAX_LENGTH} caracteres"
+        )
+    return hashlib.sha256(f"{client}\n{idempotency_key}".encode()).hexdigest()
+
+def request_hash(task: schemas.TaskCreate) -> str:
+    """SHA-256 do JSON canônico do corpo: detecta a reutilização da chave com outro corpo (422)."""
+    return hashlib.sha256(task.model_dump_json().encode()).hexdigest()
+
+def stored_response(record: models.IdempotencyKey | None, fingerprint: str) -> str | None:
+    """
+    Resposta guardada para a chave, ou None se não há registro válido.
+
+    Raises:
+        HTTPException: 422 se a chave foi usada com outro corpo
+    """
+    if record is None or record.expires_at <= time.time():
+        return None
+    if record.request_hash != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="A Idempotency-Key já foi usada com outra requisição"
+        )
+    return record.response
+
+def new_idempotency_record(record_key: str, fingerprint: str) -> models.IdempotencyKey:
+    return models.IdempotencyKey(
+        key=record_key, request_hash=fingerprint, response="",
+        expires_at=int(time.time()) + IDEMPOTENCY_TTL_SECONDS
+    )
+
+def expired_idempotency_keys(record_key: str | None = None):
+    """DELETE dos registros expirados (de uma chave ou, sem `record_key`, de todas)."""
+    stmt = delete(models.IdempotencyKey).where(models.IdempotencyKey.expires_at <= int(time.time()))
+    if record_key is not None:
+        stmt = stmt.where(models.IdempotencyKey.key == record_key)
+    return stmt
+
+def should_purge_idempotency_keys() -> bool:
+    return next(_idempotency_writes) % IDEMPOTENCY_PURGE_EVERY == 0
+
+def _create_or_replay(db: Session, task: schemas.TaskCreate, record_key: str, fingerprint: str) -> tuple[str, bool]:
+    record = db.get(models.IdempotencyKey, record_key)
+    body = stored_response(record, fingerprint)
+    if body is not None:
+        return body, True
+
+    if not task.title or not task.title.strip():
+        raise ValueError("O título da tarefa não pode estar vazio")
+
+    try:
+        if record is not None:
+            # Registro expirado: a chave pode ser usada de novo
+            db.expunge(record)
+            db.execute(expired_idempotency_keys(record_key))
+        record = new_idempotency_record(record_key, fingerprint)
+        db.add(record)
+        # Com a mesma chave em andamento em outra transação, o INSERT espera
+        # por ela (índice único) e falha quando ela é confirmada
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        body = stored_response(db.get(models.IdempotencyKey, record_key), fingerprint)
+        if body is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Já existe uma requisição com esta Idempotency-Key em andamento"
+            )
+        return body, True
+
+    db_task = models.Task(
+        title=task.title.strip(),
+        description=task.description.strip() if task.description else None
+    )
+    db.add(db_task)
+    db.flush()
+    db.refresh(db_task)
+    record.response = schemas.Task.model_validate(db_task).model_dump_json()
+    changefeed.record(db, "created", [db_task.id])
+    if should_purge_idempotency_keys():
+        db.execute(expired_idempotency_keys())
+    db.commit()
+    logger.info(f"Creating new task {task.title}")
+    return record.response, False
+
+def create_task_idempotent(
+    db: Session, task: schemas.TaskCreate, idempotency_key: str, client: str
+) -> tuple[str, bool]:
+    """
+    Cria uma tarefa uma única vez por Idempotency-Key.
+
+    A chave e a resposta são gravadas na mesma transação da tarefa. Uma
+    repetição recebe a resposta original consultando apenas a tabela
+    `idempotency_keys`. Repetições simultâneas esperam pela primeira (no
+    worker, pelo single-flight; entre workers, pelo índice único da chave).
+
+    Args:
+        db: Sessão do banco de dados
+        task: Dados da tarefa a ser criada
+        idempotency_key: Valor do header `Idempotency-Key`
+        client: Identificação do cliente (ver `ratelimit.client_key`)
+
+    Returns:
+        tuple[str, bool]: JSON da tarefa criada e se a resposta é uma repetição
+
+    Raises:
+        HTTPException:
+            - 400: Se a chave ou os dados forem inválidos
+            - 409: Se a requisição original ainda não terminou
+            - 422: Se a chave já foi usada com outro corpo
+            - 500: Se ocorrer erro no banco de dados
+    """
+    try:
+        record_key = idempotency_record_key(client, idempotency_key)
+        fingerprint = request_hash(task)
+        executed = False
+
+        def create() -> tuple[str, bool]:
+            nonlocal executed
+            executed = True
+            return _create_or_replay(db, task, record_key, fingerprint)
+
+        body, replayed = idempotency_flight.do(f"{record_key}:{fingerprint}", create)
+        # Quem esperou pela primeira requisição recebe a resposta dela
+        return body, replayed or not executed
+
+    except ValueError as e:
+        db.rollback()
+        log_failure(logger, "Failed to create task", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HTTPException as e:
+        db.rollback()
+        log_failure(logger, "Failed to create task", e)
+        raise
     except SQLAlchemyError as e:
         logger.error("Failed to create task", exc_info=True)
         db.rollback()
@@ -58,54 +256,366 @@ def create_task(db: Session, task: schemas.TaskCreate) -> models.Task:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro inesperado ao criar tarefa: {str(e)}"
         )
-def get_tasks(db: Session, skip: int = 0, limit: int = 100) -> List[models.Task]:
+
+def _validate_bulk_items(tasks: List[schemas.TaskCreate]):
     """
-    Retorna uma lista paginada de tarefas do banco de dados.
-    
+    Valida e normaliza os itens de um lote em uma única passada.
+
+    Returns:
+        tuple: (linhas válidas como pares (índice, valores), erros por item)
+    """
+    rows = []
+    errors = []
+    for index, task in enumerate(tasks):
+        title = task.title.strip() if task.title else ""
+        if not title:
+            errors.append(schemas.TaskBulkError(
+                index=index, detail="O título da tarefa não pode estar vazio"
+            ))
+            continue
+        if len(title) > TITLE_MAX_LENGTH:
+            errors.append(schemas.TaskBulkError(
+                index=index,
+                detail=f"O título da tarefa deve ter no máximo {TITLE_MAX_LENGTH} caracteres"
+            ))
+            continue
+        rows.append((index, {
+            "title": title,
+            "description": task.description.strip() if task.description else None
+        }))
+    return rows, errors
+
+
+def _insert_task_rows(db: Session, rows: List[dict]) -> List[int]:
+    """
+    Insere as linhas com um único INSERT ... VALUES (...), (...) RETURNING id.
+
+    Os IDs de um mesmo comando são gerados na ordem dos VALUES, por isso
+    ordená-los devolve a mesma ordem da entrada.
+    """
+    stmt = insert(models.Task).values(rows).returning(models.Task.id)
+    return sorted(db.execute(stmt).scalars().all())
+
+
+def _insert_chunk_isolated(db: Session, chunk, errors: List[schemas.TaskBulkError]) -> List[int]:
+    """
+    Insere um bloco dentro de um SAVEPOINT. Se o bloco falhar, repete linha a
+    linha para que apenas os itens problemáticos sejam reportados como erro.
+    """
+    savepoint = db.begin_nested()
+    try:
+        ids = _insert_task_rows(db, [row for _, row in chunk])
+        savepoint.commit()
+        return ids
+    except SQLAlchemyError:
+        savepoint.rollback()
+
+    ids = []
+    for index, row in chunk:
+        savepoint = db.begin_nested()
+        try:
+            ids.extend(_insert_task_rows(db, [row]))
+            savepoint.commit()
+        except SQLAlchemyError as e:
+            savepoint.rollback()
+            logger.warning(f"Failed to create task at index {index} in bulk")
+            errors.append(schemas.TaskBulkError(
+                index=index,
+                detail=f"Erro ao salvar a tarefa no banco de dados: {str(e)}"
+            ))
+    return ids
+
+
+def create_tasks(
+    db: Session,
+    tasks: List[schemas.TaskCreate],
+    chunk_size: int = BULK_INSERT_CHUNK_SIZE,
+    all_or_nothing: bool = False
+) -> schemas.TaskBulkResult:
+    """
+    Cria várias tarefas usando INSERTs multi-linha em blocos.
+
     Args:
         db: Sessão do banco de dados
-        skip: Número de registros a pular (para paginação)
-        limit: Número máximo de registros a retornar (para paginação)
-        
+        tasks: Lista de tarefas a serem criadas
+        chunk_size: Número de linhas enviadas em cada INSERT
+        all_or_nothing: Se verdadeiro, qualquer erro cancela o lote inteiro
+
     Returns:
-        List[models.Task]: Lista de tarefas encontradas
-        
+        schemas.TaskBulkResult: IDs criados (na ordem de entrada) e os erros por item
+
     Raises:
-        HTTPException: Se ocorrer algum erro ao acessar o banco de dados
+        HTTPException:
+            - 400: Se o tamanho do bloco for inválido, ou se houver itens
+              inválidos no modo tudo-ou-nada
+            - 500: Se ocorrer erro no banco de dados
     """
     try:
-        if skip < 0:
-            raise ValueError("O parâmetro 'skip' não pode ser negativo")
-        if limit <= 0 or limit > 1000:  # Definimos um limite máximo razoável
-            raise ValueError("O parâmetro 'limit' deve estar entre 1 e 1000")
-            
-        tasks = db.query(models.Task)\
-                 .order_by(models.Task.id)\
-                 .offset(skip)\
-                 .limit(limit)\
-                 .all()
-                 
-        return tasks
+        if chunk_size <= 0 or chunk_size > 10000:
+            raise ValueError("O parâmetro 'chunk_size' deve estar entre 1 e 10000")
+
+        rows, errors = _validate_bulk_items(tasks)
+
+        if all_or_nothing and errors:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=[error.model_dump() for error in errors]
+            )
+
+        ids = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            if all_or_nothing:
+                ids.extend(_insert_task_rows(db, [row for _, row in chunk]))
+            else:
+                ids.extend(_insert_chunk_isolated(db, chunk, errors))
+
+        changefeed.record(db, "created", ids)
+        db.commit()
+        logger.info(f"Creating {len(ids)} tasks in bulk")
+        errors.sort(key=lambda error: error.index)
+        return schemas.TaskBulkResult(created=len(ids), ids=ids, errors=errors)
+
+    except ValueError as e:
+        log_failure(logger, "Failed to create tasks in bulk", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException as e:
+        db.rollback()
+        log_failure(logger, "Failed to create tasks in bulk", e)
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Failed to create tasks in bulk", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao salvar as tarefas no banco de dados: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Failed to create tasks in bulk", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao criar tarefas: {str(e)}"
+        )
+
+# Colunas de `schemas.Task`, na mesma ordem, para leituras que não precisam
+# de objetos do ORM (listagem rápida e exportação)
+TASK_COLUMNS = (
+    models.Task.id, models.Task.title, models.Task.description,
+    models.Task.created_at, models.Task.updated_at, models.Task.version
+)
+
+SORT_COLUMNS = {
+    "id": models.Task.id,
+    "created_at": models.Task.created_at,
+    "title": models.Task.title,
+}
+
+def _search_clause(q: str, dialect: str):
+    """
+    Condição de busca textual em título e descrição para o dialeto do banco:
+    tsvector + índice GIN no PostgreSQL, FTS5 no SQLite e ILIKE nos demais.
+    """
+    if dialect == "postgresql":
+        return models.task_search_vector(models.Task.title, models.Task.description).op("@@")(
+            func.plainto_tsquery(literal_column("'simple'"), q)
+        )
+    if dialect == "sqlite":
+        # Cada termo entre aspas: a sintaxe de consulta do FTS5 não é exposta
+        terms = " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+        matches = text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH :terms")\
+            .bindparams(terms=terms)\
+            .columns(rowid=models.Task.id.type)
+        return models.Task.id.in_(matches)
+    return or_(
+        models.Task.title.icontains(q, autoescape=True),
+        models.Task.description.icontains(q, autoescape=True)
+    )
+
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """
+    Menor string, na ordem dos code points, maior que todas as que começam
+    com `prefix` (None quando não existe: prefixo só de U+10FFFF).
+    """
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if code == 0xD800:
+            # Surrogates não podem ser codificados em UTF-8
+            code = 0xE000
+        if code <= 0x10FFFF:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]
+    return None
+
+def apply_task_filters(query, filters: schemas.TaskFilter | None, dialect: str):
+    """
+    Aplica os filtros de listagem a uma consulta (Query ou Select).
+    """
+    if filters is None:
+        return query
+    if filters.title_prefix:
+        prefix = filters.title_prefix
+        query = query.filter(models.Task.title.startswith(prefix, autoescape=True))
+        # No SQLite (colação BINARY) o intervalo [prefixo, prefixo seguinte)
+        # permite usar o índice de título. No PostgreSQL a ordem depende da
+        # colação, e o LIKE usa o índice text_pattern_ops
+        if dialect == "sqlite":
+            query = query.filter(models.Task.title >= prefix)
+            upper = _prefix_upper_bound(prefix)
+            if upper is not None:
+                query = query.filter(models.Task.title < upper)
+    if filters.created_after is not None:
+        query = query.filter(models.Task.created_at >= filters.created_after)
+    if filters.created_before is not None:
+        query = query.filter(models.Task.created_at < filters.created_before)
+    if filters.q and filters.q.strip():
+        query = query.filter(_search_clause(filters.q.strip(), dialect))
+    return query
+
+class Page(NamedTuple):
+    """Parâmetros de ordenação e paginação já validados."""
+    field: str
+    descending: bool
+    skip: int
+    limit: int
+    cursor: tuple | None
+
+def parse_page(skip: int, limit: int, after: str | None, sort: str) -> Page:
+    """
+    Valida os parâmetros de paginação e ordenação e decodifica o cursor.
+
+    Raises:
+        ValueError: Se os parâmetros de paginação ou ordenação forem inválidos
+    """
+    if skip < 0:
+        raise ValueError("O parâmetro 'skip' não pode ser negativo")
+    if limit <= 0 or limit > 1000:  # Definimos um limite máximo razoável
+        raise ValueError("O parâmetro 'limit' deve estar entre 1 e 1000")
+    field, descending = parse_sort(sort)
+    cursor = None
+    if after is not None:
+        if skip:
+            raise ValueError("Use 'skip' ou 'after', não ambos")
+        cursor = decode_sort_cursor(after, field)
+    return Page(field, descending, skip, limit, cursor)
+
+def apply_task_page(query, page: Page):
+    """
+    Aplica ordenação e paginação (por deslocamento ou por cursor) a uma consulta.
+    """
+    column = SORT_COLUMNS[page.field]
+    if page.field == "id":
+        order = (column.desc(),) if page.descending else (column,)
+    else:
+        order = (column.desc(), models.Task.id.desc()) if page.descending else (column, models.Task.id)
+
+    if page.cursor is not None:
+        last_id, key = page.cursor
+        if page.field == "id":
+            position = column < last_id if page.descending else column > last_id
+        else:
+            current = tuple_(column, models.Task.id)
+            bound = tuple_(literal(key, column.type), literal(last_id, models.Task.id.type))
+            position = current < bound if page.descending else current > bound
+        return query.filter(position).order_by(*order).limit(page.limit)
+
+    return query.order_by(*order).offset(page.skip).limit(page.limit)
+
+def _query_tasks(db: Session, entities, skip: int, limit: int, after: str | None,
+                 filters: schemas.TaskFilter | None = None, sort: str = "id"):
+    """
+    Executa a consulta paginada de tarefas selecionando `entities`.
+
+    Raises:
+        HTTPException: Se os parâmetros forem inválidos ou ocorrer erro no banco
+    """
+    try:
+        page = parse_page(skip, limit, after, sort)
+        query = db.query(*entities)
+        if filters is not None:
+            query = apply_task_filters(query, filters, db.get_bind().dialect.name)
+        return apply_task_page(query, page).all()
         
     except ValueError as e:
-        logger.error("Failed to create task", exc_info=True)
+        log_failure(logger, "Failed to get tasks", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except SQLAlchemyError as e:
-        logger.error("Failed to create task", exc_info=True)
+        logger.error("Failed to get tasks", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao acessar o banco de dados: {str(e)}"
         )
     except Exception as e:
-        logger.error("Failed to create task", exc_info=True)
+        logger.error("Failed to get tasks", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro inesperado ao recuperar tarefas: {str(e)}"
         )
 
+def get_tasks(
+    db: Session, skip: int = 0, limit: int = 100, after: str | None = None,
+    filters: schemas.TaskFilter | None = None, sort: str = "id"
+) -> List[models.Task]:
+    """
+    Retorna uma lista paginada de tarefas do banco de dados.
+
+    Há dois modos de paginação: por deslocamento (`skip`), mantido por
+    compatibilidade, e por cursor (`after`), que busca com `WHERE id > :cursor`
+    no índice da chave primária e tem custo constante em qualquer página.
+    
+    Args:
+        db: Sessão do banco de dados
+        skip: Número de registros a pular (para paginação)
+        limit: Número máximo de registros a retornar (para paginação)
+        after: Cursor opaco retornado pela página anterior (modo cursor)
+        filters: Filtros por prefixo do título, busca textual e data de criação
+        sort: Campo de ordenação (id, created_at ou title; "-" para decrescente)
+        
+    Returns:
+        List[models.Task]: Lista de tarefas encontradas
+        
+    Raises:
+        HTTPException: Se ocorrer algum erro ao acessar o banco de dados
+    """
+    return _query_tasks(db, (models.Task,), skip, limit, after, filters, sort)
+
+def get_task_rows(
+    db: Session, skip: int = 0, limit: int = 100, after: str | None = None,
+    filters: schemas.TaskFilter | None = None, sort: str = "id"
+):
+    """
+    Mesma página de `get_tasks`, mas como linhas com as colunas de
+    TASK_COLUMNS em vez de objetos do ORM (para a serialização rápida).
+    """
+    return _query_tasks(db, TASK_COLUMNS, skip, limit, after, filters, sort)
+
+def iter_tasks(db: Session, after_id: int = 0, fetch_size: int = EXPORT_FETCH_SIZE):
+    """
+    Percorre todas as tarefas com id maior que `after_id`, em ordem de id.
+
+    Usa um cursor do lado do servidor (`stream_results`/`yield_per`) e
+    seleciona apenas colunas, sem instanciar objetos do ORM, para que a
+    memória usada seja constante em qualquer tamanho de tabela.
+
+    Yields:
+        Row: (id, title, description, created_at, updated_at, version)
+    """
+    stmt = select(*TASK_COLUMNS).where(models.Task.id > after_id).order_by(models.Task.id)
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=fetch_size))
+    try:
+        yield from result
+    except SQLAlchemyError:
+        logger.error("Failed to export tasks", exc_info=True)
+        raise
+    finally:
+        result.close()
+
 def get_task(db: Session, task_id: int) -> models.Task:
     """
     Retorna uma tarefa específica pelo seu ID.
@@ -140,7 +650,7 @@ def get_task(db: Session, task_id: int) -> models.Task:
         return task
         
     except ValueError as e:
-        logger.error("Failed to get task", exc_info=True)
+        log_failure(logger, "Failed to get task", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -151,8 +661,8 @@ def get_task(db: Session, task_id: int) -> models.Task:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao acessar o banco de dados: {str(e)}"
         )
-    except HTTPException:
-        logger.error("Failed to get task", exc_info=True)
+    except HTTPException as e:
+        log_failure(logger, "Failed to get task", e)
         raise
     except Exception as e:
         logger.error("Failed to get task", exc_info=True)
@@ -161,6 +671,166 @@ def get_task(db: Session, task_id: int) -> models.Task:
             detail=f"Erro inesperado ao buscar tarefa: {str(e)}"
         )
 
+def get_task_cached(db: Session, task_id: int) -> schemas.Task:
+    """
+    Versão com cache de leitura de `get_task`.
+
+    Procura primeiro no cache; numa falta consulta o banco via `get_task` e
+    guarda o `schemas.Task` serializado. As escritas (`update_task`,
+    `delete_task`) invalidam a entrada correspondente.
+
+    Returns:
+        schemas.Task: A tarefa encontrada
+
+    Raises:
+        HTTPException: As mesmas de `get_task`
+    """
+    key = task_key(task_id)
+    cached = task_cache.get(key)
+    if cached is not None:
+        return schemas.Task.model_validate_json(cached)
+
+    generation = task_cache.generation()
+
+    def load() -> schemas.Task:
+        task = schemas.Task.model_validate(get_task(db, task_id))
+        if can_fill_cache(db):
+            task_cache.fill(key, task.model_dump_json(), generation)
+        return task
+
+    # A geração faz parte da chave: uma leitura iniciada depois de uma escrita
+    # não recebe o resultado de uma consulta que começou antes dela. A origem
+    # também: quem precisa ler no primário não recebe o resultado de uma réplica
+    return task_flight.do(flight_key(db, key, generation), load)
+
+def replica_max_lag(db) -> float | None:
+    """Atraso máximo aceito, se `db` for uma sessão aberta em uma réplica (ver `app.replicas`)."""
+    value = db.info.get(REPLICA_MAX_LAG_INFO)
+    return value if isinstance(value, (int, float)) else None
+
+def can_fill_cache(db) -> bool:
+    """
+    Indica se o que foi lido com `db` pode ir para o cache. Uma réplica pode
+    ainda não ter aplicado uma escrita que invalidou o cache há pouco: o que
+    ela retorna só é guardado depois do atraso máximo aceito.
+    """
+    max_lag = replica_max_lag(db)
+    return max_lag is None or time.monotonic() - task_cache.invalidated_at > max_lag
+
+def flight_key(db, key: str, generation: int) -> str:
+    source = "primary" if replica_max_lag(db) is None else "replica"
+    return f"{key}:{generation}:{source}"
+
+def parse_ids(value: str) -> list[int]:
+    """
+    Converte a lista de IDs separados por vírgula, sem repetições e na ordem
+    recebida.
+
+    Raises:
+        ValueError: Se algum ID for inválido ou a quantidade passar de BATCH_MAX_IDS
+    """
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise ValueError("O parâmetro 'ids' deve ser uma lista de números separados por vírgula")
+    if not ids:
+        raise ValueError("Informe ao menos um ID")
+    if any(task_id <= 0 for task_id in ids):
+        raise ValueError("Os IDs devem ser números inteiros positivos")
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > BATCH_MAX_IDS:
+        raise ValueError(f"Máximo de {BATCH_MAX_IDS} IDs por requisição")
+    return ids
+
+def merge_batch(ids: list[int], found: dict[int, schemas.Task]) -> schemas.TaskBatch:
+    """Monta a resposta do lote na ordem pedida, separando os IDs inexistentes."""
+    return schemas.TaskBatch(
+        tasks=[found[task_id] for task_id in ids if task_id in found],
+        missing_ids=[task_id for task_id in ids if task_id not in found]
+    )
+
+def cached_tasks(ids: list[int]) -> dict[int, schemas.Task]:
+    """Tarefas do lote já presentes no cache de leitura."""
+    values = task_cache.get_many([task_key(task_id) for task_id in ids])
+    return {
+        task_id: schemas.Task.model_validate_json(value)
+        for task_id, value in zip(ids, values) if value is not None
+    }
+
+def get_tasks_batch(db: Session, ids: str) -> schemas.TaskBatch:
+    """
+    Retorna várias tarefas de uma vez: as que estão no cache de leitura e as
+    demais com um único `WHERE id IN (...)`.
+
+    Args:
+        db: Sessão do banco de dados
+        ids: IDs separados por vírgula
+
+    Returns:
+        schemas.TaskBatch: Tarefas encontradas (na ordem pedida) e IDs inexistentes
+
+    Raises:
+        HTTPException:
+            - 400: Se a lista de IDs for inválida
+            - 500: Se ocorrer um erro no banco de dados
+    """
+    try:
+        task_ids = parse_ids(ids)
+        found = cached_tasks(task_ids)
+        misses = [task_id for task_id in task_ids if task_id not in found]
+        if misses:
+            generation = task_cache.generation()
+            fill = can_fill_cache(db)
+            rows = db.execute(select(models.Task).where(models.Task.id.in_(misses))).scalars()
+            for row in rows:
+                task = schemas.Task.model_validate(row)
+                if fill:
+                    task_cache.fill(task_key(task.id), task.model_dump_json(), generation)
+                found[task.id] = task
+        return merge_batch(task_ids, found)
+
+    except ValueError as e:
+        log_failure(logger, "Failed to get tasks batch", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error("Failed to get tasks batch", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao acessar o banco de dados: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Failed to get tasks batch", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao buscar tarefas: {str(e)}"
+        )
+
+def update_task_statement(task_id: int, task: schemas.TaskCreate):
+    """UPDATE ... RETURNING da tarefa completa, incrementando a versão."""
+    return (
+        update(models.Task)
+        .where(models.Task.id == task_id)
+        .values(
+            title=task.title.strip(),
+            description=task.description.strip() if task.description else None,
+            version=models.Task.version + 1
+        )
+        .returning(models.Task)
+        .execution_options(synchronize_session=False)
+    )
+
+def delete_task_statement(task_id: int):
+    """DELETE ... RETURNING da tarefa completa."""
+    return (
+        delete(models.Task)
+        .where(models.Task.id == task_id)
+        .returning(models.Task)
+        .execution_options(synchronize_session=False)
+    )
+
 def update_task(db: Session, task_id: int, task: schemas.TaskCreate) -> models.Task:
     """
     Atualiza uma tarefa existente no banco de dados.
@@ -188,22 +858,33 @@ def update_task(db: Session, task_id: int, task: schemas.TaskCreate) -> models.T
         if not task.title or not task.title.strip():
             raise ValueError("O título da tarefa não pode estar vazio")
             
-        # Busca a tarefa existente
-        db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-        
-        if not db_task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Tarefa com ID {task_id} não encontrada"
-            )
-            
-        # Atualiza os campos
-        db_task.title = task.title.strip()
-        db_task.description = task.description.strip() if task.description else None
-        
+        returning = db.get_bind().dialect.update_returning
         try:
+            if returning:
+                # Um único UPDATE ... RETURNING, sem SELECT prévio nem refresh
+                db_task = db.execute(update_task_statement(task_id, task)).scalar_one_or_none()
+            else:
+                # Bancos sem RETURNING: busca a tarefa e altera os campos
+                db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+                if db_task:
+                    db_task.title = task.title.strip()
+                    db_task.description = task.description.strip() if task.description else None
+                    db_task.version = models.Task.version + 1
+
+            if not db_task:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Tarefa com ID {task_id} não encontrada"
+                )
+
+            if returning:
+                # Mantém os valores retornados sem expirá-los no commit
+                db.expunge(db_task)
+            changefeed.record(db, "updated", [task_id])
             db.commit()
-            db.refresh(db_task)
+            task_cache.invalidate(task_key(task_id))
+            if not returning:
+                db.refresh(db_task)
         except SQLAlchemyError as e:
             logger.error("Failed to update task", exc_info=True)
             db.rollback()
@@ -215,13 +896,13 @@ def update_task(db: Session, task_id: int, task: schemas.TaskCreate) -> models.T
         return db_task
         
     except ValueError as e:
-        logger.error("Failed to update task", exc_info=True)
+        log_failure(logger, "Failed to update task", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    except HTTPException:
-        logger.error("Failed to update task", exc_info=True)
+    except HTTPException as e:
+        log_failure(logger, "Failed to update task", e)
         raise
     except Exception as e:
         logger.error("Failed to update task", exc_info=True)
@@ -252,19 +933,28 @@ def delete_task(db: Session, task_id: int) -> models.Task:
         if not isinstance(task_id, int) or task_id <= 0:
             raise ValueError("ID da tarefa deve ser um número inteiro positivo")
         
-        # Busca a tarefa no banco de dados
-        db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-        
-        if not db_task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Tarefa com ID {task_id} não encontrada"
-            )
-            
+        returning = db.get_bind().dialect.delete_returning
         try:
+            if returning:
+                # Um único DELETE ... RETURNING devolve a tarefa excluída
+                db_task = db.execute(delete_task_statement(task_id)).scalar_one_or_none()
+            else:
+                db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+
+            if not db_task:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Tarefa com ID {task_id} não encontrada"
+                )
+
             # Remove a tarefa e confirma a transação
-            db.delete(db_task)
+            if returning:
+                db.expunge(db_task)
+            else:
+                db.delete(db_task)
+            changefeed.record(db, "deleted", [task_id])
             db.commit()
+            task_cache.invalidate(task_key(task_id))
         except SQLAlchemyError as e:
             db.rollback()
             raise HTTPException(
@@ -275,17 +965,185 @@ def delete_task(db: Session, task_id: int) -> models.Task:
         return db_task
         
     except ValueError as e:
-        logger.error("Failed to delete task", exc_info=True)
+        log_failure(logger, "Failed to delete task", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    except HTTPException:
-        logger.error("Failed to delete task", exc_info=True)
+    except HTTPException as e:
+        log_failure(logger, "Failed to delete task", e)
         raise
     except Exception as e:
         logger.error("Failed to delete task", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro inesperado ao excluir tarefa: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+def _has_criteria(filters: schemas.TaskFilter | None) -> bool:
+    return filters is not None and bool(
+        filters.title_prefix
+        or (filters.q and filters.q.strip())
+        or filters.created_after is not None
+        or filters.created_before is not None
+    )
+
+def _bulk_statements(stmt, selection: schemas.TaskBulkDelete, dialect: str) -> list:
+    """
+    Restringe `stmt` aos alvos de uma alteração em lote.
+
+    Com `ids`, o PostgreSQL recebe um único `id = ANY(:ids)`; nos demais
+    bancos a lista é dividida em blocos de `IN (...)`. Com `filter`, usa os
+    mesmos filtros da listagem em um único comando.
+
+    Raises:
+        ValueError: Se os alvos não forem informados corretamente
+    """
+    if selection.ids is not None:
+        if selection.filter is not None:
+            raise ValueError("Informe 'ids' ou 'filter', não ambos")
+        if not selection.ids:
+            raise ValueError("A lista 'ids' não pode estar vazia")
+        ids = sorted(set(selection.ids))
+        if dialect == "postgresql":
+            return [stmt.where(models.Task.id == any_(literal(ids, ARRAY(Integer))))]
+        return [
+            stmt.where(models.Task.id.in_(ids[start:start + BULK_ID_CHUNK_SIZE]))
+            for start in range(0, len(ids), BULK_ID_CHUNK_SIZE)
+        ]
+    if not _has_criteria(selection.filter):
+        raise ValueError("Informe 'ids' ou um 'filter' com ao menos um critério")
+    return [apply_task_filters(stmt, selection.filter, dialect)]
+
+def _execute_bulk(db: Session, stmt, selection: schemas.TaskBulkDelete, returning: bool) -> List[int]:
+    """
+    Executa o UPDATE/DELETE em lote e devolve os IDs afetados, sem carregar
+    objetos do ORM. Sem suporte a RETURNING no banco, os IDs são lidos antes
+    com um SELECT usando os mesmos critérios.
+    """
+    dialect = db.get_bind().dialect.name
+    options = {"synchronize_session": False}
+    ids = []
+    if returning:
+        for target in _bulk_statements(stmt, selection, dialect):
+            ids.extend(db.execute(target.returning(models.Task.id), execution_options=options).scalars())
+        return sorted(ids)
+
+    for target in _bulk_statements(select(models.Task.id), selection, dialect):
+        found = list(db.execute(target).scalars())
+        for start in range(0, len(found), BULK_ID_CHUNK_SIZE):
+            chunk = found[start:start + BULK_ID_CHUNK_SIZE]
+            db.execute(stmt.where(models.Task.id.in_(chunk)), execution_options=options)
+        ids.extend(found)
+    return sorted(ids)
+
+def _bulk_change_result(selection: schemas.TaskBulkDelete, ids: List[int]) -> schemas.TaskBulkChangeResult:
+    missing = sorted(set(selection.ids) - set(ids)) if selection.ids is not None else []
+    return schemas.TaskBulkChangeResult(affected=len(ids), ids=ids, missing_ids=missing)
+
+def update_tasks(db: Session, changes: schemas.TaskBulkUpdate) -> schemas.TaskBulkChangeResult:
+    """
+    Atualiza várias tarefas com um UPDATE ... RETURNING id baseado em conjunto.
+
+    Apenas os campos enviados são alterados (`description: null` limpa a
+    descrição). A versão de cada tarefa é incrementada e o cache invalidado.
+
+    Args:
+        db: Sessão do banco de dados
+        changes: Alvos (`ids` ou `filter`) e os novos valores
+
+    Returns:
+        schemas.TaskBulkChangeResult: Quantidade e IDs afetados e os IDs não encontrados
+
+    Raises:
+        HTTPException:
+            - 400: Se os alvos ou os valores forem inválidos
+            - 500: Se ocorrer erro no banco de dados
+    """
+    try:
+        values = {}
+        if "title" in changes.model_fields_set:
+            title = changes.title.strip() if changes.title else ""
+            if not title:
+                raise ValueError("O título da tarefa não pode estar vazio")
+            if len(title) > TITLE_MAX_LENGTH:
+                raise ValueError(f"O título da tarefa deve ter no máximo {TITLE_MAX_LENGTH} caracteres")
+            values["title"] = title
+        if "description" in changes.model_fields_set:
+            values["description"] = changes.description.strip() if changes.description else None
+        if not values:
+            raise ValueError("Informe ao menos um campo para atualizar ('title' ou 'description')")
+
+        stmt = update(models.Task).values(**values, version=models.Task.version + 1)
+        ids = _execute_bulk(db, stmt, changes, db.get_bind().dialect.update_returning)
+        changefeed.record(db, "updated", ids)
+        db.commit()
+        task_cache.invalidate_many([task_key(task_id) for task_id in ids])
+        logger.info(f"Updated {len(ids)} tasks in bulk")
+        return _bulk_change_result(changes, ids)
+
+    except ValueError as e:
+        log_failure(logger, "Failed to update tasks in bulk", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error("Failed to update tasks in bulk", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao atualizar as tarefas no banco de dados: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Failed to update tasks in bulk", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao atualizar tarefas: {str(e)}"
+        )
+
+def delete_tasks(db: Session, selection: schemas.TaskBulkDelete) -> schemas.TaskBulkChangeResult:
+    """
+    Exclui várias tarefas com um DELETE ... RETURNING id baseado em conjunto.
+
+    Args:
+        db: Sessão do banco de dados
+        selection: Alvos (`ids` ou `filter`)
+
+    Returns:
+        schemas.TaskBulkChangeResult: Quantidade e IDs excluídos e os IDs não encontrados
+
+    Raises:
+        HTTPException:
+            - 400: Se os alvos forem inválidos
+            - 500: Se ocorrer erro no banco de dados
+    """
+    try:
+        ids = _execute_bulk(db, delete(models.Task), selection, db.get_bind().dialect.delete_returning)
+        changefeed.record(db, "deleted", ids)
+        db.commit()
+        task_cache.invalidate_many([task_key(task_id) for task_id in ids])
+        logger.info(f"Deleted {len(ids)} tasks in bulk")
+        return _bulk_change_result(selection, ids)
+
+    except ValueError as e:
+        log_failure(logger, "Failed to delete tasks in bulk", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error("Failed to delete tasks in bulk", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao excluir as tarefas do banco de dados: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Failed to delete tasks in bulk", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro inesperado ao excluir tarefas: {str(e)}"
+        )
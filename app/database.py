@@ -1,6 +1,10 @@
 import os
+import threading
+import time
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from dotenv import load_dotenv
@@ -10,14 +14,228 @@ load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv('DATABASE_URL')
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Modo de acesso ao banco: "sync" (psycopg2 no threadpool) ou "async" (asyncpg)
+DB_MODE = os.getenv('DB_MODE', 'sync').lower()
+
+# Drivers assíncronos equivalentes aos drivers síncronos da DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """
+    Converte a DATABASE_URL síncrona para o driver assíncrono correspondente.
+    ASYNC_DATABASE_URL, se definida, tem precedência.
+    """
+    if os.getenv('ASYNC_DATABASE_URL'):
+        return os.getenv('ASYNC_DATABASE_URL')
+    return to_async_url(url)
+
+def to_async_url(url: str) -> str:
+    """Troca o driver de uma URL síncrona pelo driver assíncrono equivalente."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"Sem driver assíncrono conhecido para '{parsed.drivername}'")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+# Configuração do pool de conexões (valores por processo/worker do uvicorn)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = _env_flag('DB_POOL_PRE_PING', 'true')
+# Com um pooler externo (ex.: pgbouncer) cada checkout abre uma conexão nova
+DB_EXTERNAL_POOLER = _env_flag('DB_EXTERNAL_POOLER', 'false')
+
+
+class PoolWaitStats:
+    """
+    Acumula o tempo que as requisições esperam por uma conexão do pool.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+class _TimedPoolMixin:
+    """Mede o tempo de espera em cada checkout do pool."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.wait_stats.record(time.perf_counter() - started, timed_out)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Monta os argumentos de `create_engine` a partir das configurações do pool.
+    """
+    if DB_EXTERNAL_POOLER:
+        return {"poolclass": NullPool}
+    if make_url(url).get_backend_name() == "sqlite":
+        # O SQLite usa o pool padrão do dialeto (sem overflow/timeout)
+        return {"pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def get_pool_status(engine) -> dict:
+    """
+    Retorna o estado atual do pool de um engine neste processo.
+    """
+    pool = engine.pool
+    status = {"pid": os.getpid(), "pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status.update(wait_stats.snapshot())
+    return status
+
+
+# Engines e fábricas de sessão são criados no primeiro uso (e não ao importar
+# o módulo): importar o pacote não exige DATABASE_URL nem o driver do banco
+_engine = None
+_session_factory = None
+_async_engine = None
+_async_session_factory = None
+_init_lock = threading.Lock()
+
+def get_engine():
+    """Engine síncrono do processo, criado no primeiro uso."""
+    global _engine
+    if _engine is None:
+        with _init_lock:
+            if _engine is None:
+                if not SQLALCHEMY_DATABASE_URL:
+                    raise RuntimeError("DATABASE_URL não configurada")
+                _engine = create_engine(
+                    SQLALCHEMY_DATABASE_URL, **get_engine_options(SQLALCHEMY_DATABASE_URL)
+                )
+    return _engine
+
+def get_session_factory():
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _session_factory
+
+def get_async_engine():
+    """Engine assíncrono (apenas com DB_MODE=async; caso contrário None)."""
+    global _async_engine
+    if DB_MODE != "async":
+        return None
+    if _async_engine is None:
+        with _init_lock:
+            if _async_engine is None:
+                # Importado só aqui: o modo síncrono não depende de greenlet/asyncpg
+                from sqlalchemy.ext.asyncio import create_async_engine
+
+                async_url = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+                _async_engine = create_async_engine(
+                    async_url, **get_engine_options(async_url, is_async=True)
+                )
+    return _async_engine
+
+def get_async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        # expire_on_commit=False evita recarregamentos implícitos (I/O) após o commit
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+async def dispose_engines():
+    """Fecha as conexões dos pools ao encerrar a aplicação."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+
+def dispose_engines_after_fork():
+    """
+    Descarta, no processo filho, as conexões herdadas do pool do processo pai
+    (sem fechá-las: elas continuam sendo do pai). O filho abre as suas.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=dispose_engines_after_fork)
 
 Base = declarative_base()
 
+# Chave de `Session.info` das sessões abertas em réplicas: o atraso máximo
+# aceito (ver `app.replicas`)
+REPLICA_MAX_LAG_INFO = "replica_max_lag"
+
 def get_db():
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
@@ -1,19 +1,19 @@
-import os
-
 from fastapi import Header, HTTPException, status
-from dotenv import load_dotenv
-
-# Token estático para simplificar a autenticação
-load_dotenv()
 
-STATIC_API_TOKEN = os.getenv('STATIC_API_TOKEN')
+from .keystore import key_store
 
 async def verify_token(token: str = Header(...)):
     """
-    Verifica se o token enviado no header 'token' é válido.
-    Se não for, lança uma exceção HTTP 401.
+    Verifica se o token enviado no header 'token' é uma das chaves de API
+    aceitas (ver `app.keystore`). Se não for, lança uma exceção HTTP 401;
+    enquanto as chaves não foram carregadas (no início da aplicação), 503.
     """
-    if token != STATIC_API_TOKEN:
+    if not key_store.loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="API keys are not loaded yet"
+        )
+    if not key_store.verify(token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API token"
@@ -0,0 +1,99 @@
+"""
+Funções auxiliares para GET condicional (ETag / If-None-Match e
+Last-Modified / If-Modified-Since).
+
+Os ETags são fortes: derivam de todos os campos de `schemas.Task` de cada
+tarefa (id, conteúdo, datas e `version`). Só `id` e `version` não bastam: no
+SQLite o id de uma tarefa excluída pode ser reutilizado, e uma tarefa
+recriada no mesmo segundo teria o mesmo id, versão e data de criação.
+
+Last-Modified é usado apenas em tarefas individuais: o `updated_at` das
+linhas de uma página não muda quando outra tarefa é excluída ou inserida.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+
+
+def _stamp(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def _fingerprint(hasher, task):
+    fields = (
+        task.id, task.title, task.description,
+        _stamp(task.created_at), _stamp(task.updated_at), task.version
+    )
+    hasher.update(repr(fields).encode())
+
+
+def task_etag(task) -> str:
+    """ETag de uma tarefa individual."""
+    hasher = blake2b(digest_size=16)
+    _fingerprint(hasher, task)
+    return f'"{hasher.hexdigest()}"'
+
+
+def list_etag(tasks) -> str:
+    """
+    ETag de uma página de tarefas. Aceita objetos ou linhas com os atributos
+    id, version e created_at.
+    """
+    hasher = blake2b(digest_size=16)
+    for task in tasks:
+        _fingerprint(hasher, task)
+    return f'"{hasher.hexdigest()}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # O SQLite devolve datas sem fuso; elas são gravadas em UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Compara o header If-None-Match com o ETag atual (comparação fraca,
+    como define a RFC 9110 para If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def not_modified_since(if_modified_since: str | None, modified: datetime | None) -> bool:
+    """Verdadeiro se o recurso não mudou desde a data do header If-Modified-Since."""
+    if not if_modified_since or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # Datas HTTP têm resolução de segundos
+    return _as_utc(modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def is_not_modified(headers, etag: str, modified: datetime | None = None) -> bool:
+    """
+    Avalia as pré-condições de um GET. If-None-Match tem precedência; o
+    If-Modified-Since só é considerado quando ele está ausente.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    return not_modified_since(headers.get("if-modified-since"), modified)
+
+
+def conditional_headers(etag: str, modified: datetime | None = None) -> dict:
+    headers = {"ETag": etag}
+    if modified is not None:
+        headers["Last-Modified"] = http_date(modified)
+    return headers
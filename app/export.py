@@ -0,0 +1,88 @@
+"""
+Geração do fluxo de exportação de tarefas (NDJSON ou CSV, opcionalmente
+comprimido com gzip).
+
+As linhas são lidas do banco com um cursor do lado do servidor e convertidas
+em blocos de bytes à medida que chegam, de modo que o uso de memória não
+depende do tamanho da tabela.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+EXPORT_FIELDS = ("id", "title", "description", "created_at", "updated_at", "version")
+
+# Linhas agrupadas em cada bloco enviado ao cliente
+EXPORT_CHUNK_ROWS = 1000
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _batched(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_chunks(rows, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Um objeto JSON por linha."""
+    for batch in _batched(rows, chunk_rows):
+        lines = (
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default, ensure_ascii=False)
+            for row in batch
+        )
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def csv_chunks(rows, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """CSV com cabeçalho; datas em ISO 8601."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in _batched(rows, chunk_rows):
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks, level: int = 6):
+    """Comprime o fluxo em formato gzip conforme os blocos são gerados."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(session_factory, iter_rows, export_format: str, after_id: int, compress: bool):
+    """
+    Gera o corpo da exportação. A sessão é aberta e fechada aqui dentro,
+    pois o fluxo continua sendo consumido depois que a rota retorna.
+    """
+    db = session_factory()
+    try:
+        rows = iter_rows(db, after_id=after_id)
+        chunks = csv_chunks(rows) if export_format == "csv" else ndjson_chunks(rows)
+        if compress:
+            chunks = gzip_chunks(chunks)
+        yield from chunks
+    finally:
+        db.close()
@@ -0,0 +1,162 @@
+"""
+Verificação periódica da saúde do banco para a sonda de prontidão (/readyz).
+
+Uma tarefa em segundo plano executa `SELECT 1` em cada engine no máximo uma
+vez a cada HEALTH_CHECK_INTERVAL segundos e guarda o resultado; as sondas só
+leem esse resultado e o estado do pool (dados em memória), sem tocar no
+banco. Assim, muitas sondas de muitos pods não viram consultas no pool. O
+comando síncrono roda no executor padrão do event loop, e não no threadpool
+que atende as rotas.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import text
+
+from . import database, migrate, replicas
+
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+# Fração do pool em uso a partir da qual o worker deixa de estar pronto (0 desativa)
+HEALTH_MAX_POOL_SATURATION = float(os.getenv("HEALTH_MAX_POOL_SATURATION", "0"))
+
+logger = logging.getLogger("app")
+
+
+def _select_one(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def _select_one_async(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+def pool_saturation(status: dict) -> float | None:
+    """Fração das conexões possíveis (pool + overflow) em uso."""
+    if "size" not in status:
+        return None
+    capacity = status["size"] + status["max_overflow"]
+    return round(status["checked_out"] / capacity, 3) if capacity else None
+
+
+class HealthMonitor:
+    """
+    Resultado em cache da última verificação do banco e das migrações.
+    """
+
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL, timeout: float = HEALTH_CHECK_TIMEOUT,
+                 max_saturation: float = HEALTH_MAX_POOL_SATURATION, clock=time.monotonic):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_saturation = max_saturation
+        self._clock = clock
+        self._task = None
+        self._pending_check = None
+        self.database = {"ok": False, "error": "ainda não verificado", "latency_ms": None, "checked_at": None}
+        self.pending_migrations = None
+        self.migrations_error = None
+
+    async def _check_database(self):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        # Um SELECT 1 síncrono preso (banco sem resposta) não é cancelável:
+        # enquanto ele não terminar, não é iniciado outro
+        if self._pending_check is None or self._pending_check.done():
+            self._pending_check = loop.run_in_executor(None, _select_one, database.get_engine())
+        checks = [asyncio.shield(self._pending_check)]
+        async_engine = database.get_async_engine()
+        if async_engine is not None:
+            checks.append(_select_one_async(async_engine))
+        await asyncio.wait_for(asyncio.gather(*checks), self.timeout)
+        return (time.perf_counter() - started) * 1000
+
+    async def check_once(self):
+        """Executa uma verificação e atualiza o resultado em cache."""
+        try:
+            latency_ms = await self._check_database()
+            self.database = {"ok": True, "error": None, "latency_ms": round(latency_ms, 3)}
+        except asyncio.TimeoutError:
+            self.database = {"ok": False, "error": f"sem resposta em {self.timeout}s", "latency_ms": None}
+        except Exception as e:
+            self.database = {"ok": False, "error": type(e).__name__, "latency_ms": None}
+        self.database["checked_at"] = self._clock()
+        if not self.database["ok"]:
+            logger.warning(f"Database health check failed: {self.database['error']}")
+            return
+
+        # O schema só muda por `app.migrate`: depois de atualizado não é mais
+        # verificado. Uma falha deixa o estado desconhecido (não pronto) e a
+        # verificação é repetida no próximo ciclo
+        if self.pending_migrations is None or self.pending_migrations:
+            try:
+                loop = asyncio.get_running_loop()
+                self.pending_migrations = await loop.run_in_executor(None, migrate.pending)
+                self.migrations_error = None
+            except Exception as e:
+                self.migrations_error = type(e).__name__
+                logger.warning("Could not check pending migrations", exc_info=True)
+
+    def _migrations_state(self) -> dict:
+        if self.migrations_error is not None or self.pending_migrations is None:
+            state = "unknown"
+        else:
+            state = "pending" if self.pending_migrations else "up_to_date"
+        return {"state": state, "pending": self.pending_migrations, "error": self.migrations_error}
+
+    async def run(self):
+        while True:
+            await self.check_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def readiness(self) -> tuple[bool, dict]:
+        """Estado de prontidão a partir do resultado em cache (sem E/S)."""
+        database_state = dict(self.database)
+        checked_at = database_state.pop("checked_at")
+        age = None if checked_at is None else round(self._clock() - checked_at, 3)
+        database_state["age_seconds"] = age
+        # Um resultado antigo indica que a verificação travou
+        fresh = age is not None and age <= self.interval * 3 + self.timeout
+
+        pools = {"sync": database.get_pool_status(database.get_engine())}
+        async_engine = database.get_async_engine()
+        if async_engine is not None:
+            pools["async"] = database.get_pool_status(async_engine.sync_engine)
+        saturated = False
+        for status in pools.values():
+            status["saturation"] = pool_saturation(status)
+            if self.max_saturation and (status["saturation"] or 0) >= self.max_saturation:
+                saturated = True
+
+        migrations = self._migrations_state()
+        ready = database_state["ok"] and fresh and not saturated and migrations["state"] == "up_to_date"
+        body = {
+            "ready": ready,
+            "database": database_state,
+            "pools": pools,
+            "migrations": migrations,
+        }
+        # Informativo: sem réplicas disponíveis as leituras vão para o primário
+        replica_set = replicas.get_replica_set()
+        if replica_set is not None:
+            body["replicas"] = replica_set.status()
+        return ready, body
+
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,225 @@
+"""
+Conjunto de chaves de API aceitas pela autenticação.
+
+As chaves ficam em memória apenas como hash SHA-256, indexadas pelos
+primeiros caracteres do hash: a verificação por requisição é uma busca O(1)
+no índice seguida da comparação do hash completo em tempo constante
+(`hmac.compare_digest`). As fontes são recarregadas em segundo
+plano (a cada API_KEYS_REFRESH_SECONDS) e ao receber SIGHUP, então chaves
+podem ser adicionadas ou revogadas sem reiniciar o servidor:
+
+- STATIC_API_TOKEN: token único legado (opcional);
+- API_KEYS_FILE: arquivo com uma chave por linha no formato `nome:hash`
+  (linhas vazias e iniciadas por `#` são ignoradas);
+- API_KEYS_FROM_DB=true: tabela `api_keys` (apenas as ativas).
+
+Para gerar o hash de uma chave nova:
+
+    python -m app.keystore hash <chave>
+"""
+import hashlib
+import hmac
+import logging
+import os
+import signal
+import sys
+import threading
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STATIC_API_TOKEN = os.getenv("STATIC_API_TOKEN")
+API_KEYS_FILE = os.getenv("API_KEYS_FILE")
+API_KEYS_FROM_DB = os.getenv("API_KEYS_FROM_DB", "false").lower() in ("1", "true", "yes", "on")
+API_KEYS_REFRESH_SECONDS = float(os.getenv("API_KEYS_REFRESH_SECONDS", "60"))
+
+logger = logging.getLogger("app")
+
+
+# Caracteres do hash usados como índice do dicionário
+INDEX_PREFIX = 16
+
+
+def hash_key(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def index_keys(keys: dict[str, str]) -> dict[str, tuple]:
+    """Agrupa os pares (hash, nome) pelo prefixo do hash."""
+    index = {}
+    for digest, name in keys.items():
+        index.setdefault(digest[:INDEX_PREFIX], []).append((digest, name))
+    return {prefix: tuple(entries) for prefix, entries in index.items()}
+
+
+def load_keys_file(path: str) -> dict[str, str]:
+    """
+    Lê o arquivo de chaves (`nome:hash` por linha).
+
+    Raises:
+        ValueError: Se alguma linha não tiver um hash SHA-256 válido
+    """
+    keys = {}
+    for number, line in enumerate(Path(path).read_text().splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, _, digest = line.rpartition(":")
+        digest = digest.strip().lower()
+        if len(digest) != 64 or any(char not in "0123456789abcdef" for char in digest):
+            raise ValueError(f"Linha {number} de {path}: hash SHA-256 inválido")
+        keys[digest] = name.strip() or f"line-{number}"
+    return keys
+
+
+def load_keys_db() -> dict[str, str]:
+    """Lê as chaves ativas da tabela `api_keys`."""
+    from . import database, models
+
+    with database.get_session_factory()() as db:
+        rows = db.query(models.ApiKey.key_hash, models.ApiKey.name)\
+            .filter(models.ApiKey.active.is_(True)).all()
+    return {key_hash.lower(): name for key_hash, name in rows}
+
+
+class KeyStore:
+    """
+    Chaves aceitas. `sources` são funções sem argumentos que retornam
+    dicionários hash -> nome; o recarregamento troca o índice inteiro de uma
+    vez, então leituras concorrentes não precisam de lock.
+    """
+
+    def __init__(self, sources=(), static_token: str | None = None):
+        self.sources = list(sources)
+        self.static_token = static_token
+        self._index: dict[str, tuple] = {}
+        self._size = 0
+        self._loaded = False
+        self._reload_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._interval = 0
+
+    def reload(self) -> bool:
+        """
+        Recarrega todas as fontes. Se alguma falhar, mantém as chaves atuais
+        e retorna False; se nenhuma carga teve sucesso ainda, o conjunto
+        continua não carregado (a autenticação responde 503) até a próxima
+        tentativa do recarregamento periódico.
+        """
+        with self._reload_lock:
+            keys = {hash_key(self.static_token): "static"} if self.static_token else {}
+            try:
+                for source in self.sources:
+                    keys.update(source())
+            except Exception:
+                logger.error("Failed to reload API keys; keeping the previous set", exc_info=True)
+                return False
+            self._index = index_keys(keys)
+            self._size = len(keys)
+            self._loaded = True
+        logger.info(f"Loaded {len(keys)} API keys")
+        return True
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def lookup(self, token: str | None) -> str | None:
+        """
+        Nome da chave correspondente ao token, ou None se não for aceita.
+        Não faz E/S: antes do primeiro carregamento nenhuma chave é aceita.
+        """
+        if not token or not self._loaded:
+            return None
+        digest = hash_key(token)
+        for stored, name in self._index.get(digest[:INDEX_PREFIX], ()):
+            if hmac.compare_digest(stored, digest):
+                return name
+        return None
+
+    def verify(self, token: str | None) -> bool:
+        return self.lookup(token) is not None
+
+    def size(self) -> int:
+        return self._size
+
+    def _refresh_loop(self, interval: float):
+        while not self._stop.is_set():
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                return
+            self.reload()
+
+    def start(self, interval: float = API_KEYS_REFRESH_SECONDS):
+        """
+        Carrega as chaves (se ainda não foram carregadas) e inicia o
+        recarregamento periódico em uma thread daemon. Também recarrega ao
+        receber SIGHUP (quando chamado na thread principal).
+        """
+        if not self._loaded:
+            self.reload()
+        self._interval = interval
+        if self._thread is None and interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._refresh_loop, args=(interval,), name="api-keys-refresh", daemon=True
+            )
+            self._thread.start()
+        self._install_sighup()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def restart_after_fork(self):
+        """Threads não sobrevivem ao fork: recria a de recarga no processo filho."""
+        if self._thread is None:
+            return
+        self._reload_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, args=(self._interval,), name="api-keys-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def _install_sighup(self):
+        if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+            return
+        previous = signal.getsignal(signal.SIGHUP)
+
+        def handle_sighup(signum, frame):
+            # Apenas acorda a thread de recarga; não faz E/S no handler
+            self._wakeup.set()
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(signal.SIGHUP, handle_sighup)
+
+
+def build_key_store() -> KeyStore:
+    sources = []
+    if API_KEYS_FILE:
+        sources.append(lambda: load_keys_file(API_KEYS_FILE))
+    if API_KEYS_FROM_DB:
+        sources.append(load_keys_db)
+    return KeyStore(sources, static_token=STATIC_API_TOKEN)
+
+
+key_store = build_key_store()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=key_store.restart_after_fork)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "hash":
+        sys.exit("Uso: python -m app.keystore hash <chave>")
+    print(hash_key(sys.argv[2]))
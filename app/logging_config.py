@@ -1,16 +1,296 @@
+import atexit
 import logging
 import logging.config
+import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 import json
 from datetime import datetime
 import os
 
-def setup_logging():
+from fastapi import HTTPException
+
+# Fila entre as threads das requisições e a thread que grava os logs
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# drop: descarta registros com a fila cheia; block: espera por espaço na fila
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop").lower()
+# Registros gravados entre dois flushes dos handlers
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "100"))
+# Regras de amostragem em JSON. Chave: nome do logger ("app") ou
+# "logger:mensagem" ("app:Failed to get task"); valor: {"every": N} (1 a
+# cada N registros) ou {"per_second": N}
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+_listener = None
+_queue_handler = None
+
+
+class BatchFlushMixin:
+    """
+    Adia o flush do stream enquanto o listener processa um lote, para que
+    o arquivo seja sincronizado uma vez por lote e não a cada registro.
+    """
+    batching = False
+
+    def flush(self):
+        if not self.batching:
+            super().flush()
+
+
+class BatchedRotatingFileHandler(BatchFlushMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class BatchedStreamHandler(BatchFlushMixin, logging.StreamHandler):
+    pass
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Envia os registros para a fila sem formatá-los: a mensagem e o traceback
+    são formatados pelos handlers na thread do listener.
+
+    Com a fila cheia, a política `drop` descarta o registro e contabiliza em
+    `dropped` (um aviso com o total é enfileirado quando houver espaço) e a
+    política `block` faz a thread que registrou aguardar.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = LOG_QUEUE_POLICY):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"LOG_QUEUE_POLICY inválido: '{policy}'")
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            if self._unreported:
+                self.queue.put_nowait(self._dropped_record())
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def _dropped_record(self):
+        return logging.LogRecord(
+            "app.logging", logging.WARNING, __file__, 0,
+            "Dropped %d log records (queue full)", (self._unreported,), None
+        )
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    Listener que retira da fila até `batch_size` registros por vez e faz um
+    único flush dos handlers ao fim de cada lote.
+
+    Falhas de um handler (disco cheio, stream fechado) são reportadas por
+    `handler.handleError` e não encerram a thread: se ela parasse, a política
+    `block` travaria as requisições e a `drop` perderia todos os registros.
+    """
+
+    def __init__(self, log_queue: queue.Queue, *handlers, batch_size: int = LOG_BATCH_SIZE):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = max(batch_size, 1)
+
+    def enqueue_sentinel(self):
+        # A fila é limitada: espera por espaço em vez de falhar com Full
+        self.queue.put(self._sentinel)
+
+    def handle(self, record):
+        record = self.prepare(record)
+        for handler in self.handlers:
+            if self.respect_handler_level and record.levelno < handler.level:
+                continue
+            try:
+                handler.handle(record)
+            except Exception:
+                handler.handleError(record)
+
+    def _monitor(self):
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            batched = [h for h in self.handlers if isinstance(h, BatchFlushMixin)]
+            for handler in batched:
+                handler.batching = True
+            stop = False
+            try:
+                for record in batch:
+                    if record is self._sentinel:
+                        stop = True
+                        continue
+                    self.handle(record)
+            finally:
+                last = next((r for r in reversed(batch) if r is not self._sentinel), None)
+                for handler in batched:
+                    handler.batching = False
+                    try:
+                        handler.flush()
+                    except Exception:
+                        handler.handleError(last)
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+
+
+class _SampleState:
+    __slots__ = ("seen", "tokens", "updated", "suppressed")
+
+    def __init__(self, tokens: float, now: float):
+        self.seen = 0
+        self.tokens = tokens
+        self.updated = now
+        self.suppressed = 0
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Amostragem e limitação de taxa por logger e por chave de mensagem.
+
+    A chave da mensagem é o atributo `log_key` do registro (enviado em
+    `extra`) ou o texto da mensagem antes da formatação. Uma regra de logger
+    vale para cada chave de mensagem separadamente. O primeiro registro que
+    passa depois de outros suprimidos leva a contagem em `suppressed`.
+    """
+
+    # Limite de chaves acompanhadas (mensagens com valores variáveis); acima
+    # dele a chave usada há mais tempo é descartada
+    MAX_KEYS = 10000
+
+    def __init__(self, rules: dict, clock=time.monotonic):
+        super().__init__()
+        self.rules = {key: self._parse_rule(key, rule) for key, rule in rules.items()}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: OrderedDict[str, _SampleState] = OrderedDict()
+
+    @staticmethod
+    def _parse_rule(key: str, rule: dict) -> tuple[str, float]:
+        if not isinstance(rule, dict) or len(rule) != 1:
+            raise ValueError(f"Regra de amostragem inválida para '{key}': {rule}")
+        kind, value = next(iter(rule.items()))
+        if kind == "every":
+            # Inteiro >= 1: o valor é usado como módulo do contador
+            valid = isinstance(value, int) and not isinstance(value, bool) and value >= 1
+        else:
+            valid = (kind == "per_second" and isinstance(value, (int, float))
+                     and not isinstance(value, bool) and value > 0)
+        if not valid:
+            raise ValueError(f"Regra de amostragem inválida para '{key}': {rule}")
+        return kind, value
+
+    def filter(self, record):
+        message_key = getattr(record, "log_key", None) or str(record.msg)
+        state_key = f"{record.name}:{message_key}"
+        rule = self.rules.get(state_key) or self.rules.get(record.name)
+        if rule is None:
+            return True
+
+        kind, value = rule
+        with self._lock:
+            now = self._clock()
+            state = self._states.get(state_key)
+            if state is None:
+                if len(self._states) >= self.MAX_KEYS:
+                    self._states.popitem(last=False)
+                state = self._states[state_key] = _SampleState(max(value, 1), now)
+            else:
+                self._states.move_to_end(state_key)
+
+            if kind == "every":
+                allowed = state.seen % int(value) == 0
+                state.seen += 1
+            else:
+                state.tokens = min(max(value, 1), state.tokens + (now - state.updated) * value)
+                state.updated = now
+                allowed = state.tokens >= 1
+                if allowed:
+                    state.tokens -= 1
+
+            if not allowed:
+                state.suppressed += 1
+                return False
+            suppressed, state.suppressed = state.suppressed, 0
+
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+        return True
+
+
+def build_sampling_filter(config: str = LOG_SAMPLING) -> SamplingFilter | None:
+    """Cria o filtro a partir de LOG_SAMPLING (None quando não configurado)."""
+    if not config.strip():
+        return None
+    return SamplingFilter(json.loads(config))
+
+
+def log_failure(logger: logging.Logger, message: str, exc: Exception):
+    """
+    Registra a falha de uma operação. Erros esperados do cliente (validação
+    e HTTP 4xx) viram WARNING sem traceback; os demais, ERROR com traceback.
+    """
+    if isinstance(exc, HTTPException) and exc.status_code < 500:
+        logger.warning("%s (%s): %s", message, exc.status_code, exc.detail, extra={"log_key": message})
+    elif isinstance(exc, ValueError):
+        logger.warning("%s (400): %s", message, exc, extra={"log_key": message})
+    else:
+        logger.error(message, exc_info=True)
+
+
+def stop_logging():
+    """Grava os registros pendentes na fila e encerra o listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def restart_logging_after_fork():
+    """
+    No processo filho a thread do listener não existe mais: cria uma fila e
+    um listener novos para os mesmos handlers.
+    """
+    global _listener
+    if _listener is None:
+        return
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler.queue = log_queue
+    _listener = BatchingQueueListener(log_queue, *_listener.handlers)
+    _listener.start()
+
+
+def setup_logging(queued: bool = True):
+    """
+    Configura o logger `app`. Com `queued`, os handlers de arquivo e console
+    passam a ser atendidos por uma thread própria (QueueHandler/QueueListener),
+    e a thread da requisição apenas enfileira o registro.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
     logs_dir = Path("logs")
     logs_dir.mkdir(exist_ok=True)
-    
+
     log_file = logs_dir / f"app_{datetime.now().strftime('%Y-%m-%d')}.log"
-    
+
     config = {
         "version": 1,
         "disable_existing_loggers": False,
@@ -25,7 +305,7 @@ def setup_logging():
         },
         "handlers": {
             "file": {
-                "class": "logging.handlers.RotatingFileHandler",
+                "class": "app.logging_config.BatchedRotatingFileHandler",
                 "level": "INFO",
                 "formatter": "json",
                 "filename": log_file,
@@ -33,7 +313,7 @@ def setup_logging():
                 "backupCount": 5
             },
             "console": {
-                "class": "logging.StreamHandler",
+                "class": "app.logging_config.BatchedStreamHandler",
                 "level": "DEBUG",
                 "formatter": "simple",
                 "stream": "ext://sys.stdout"
@@ -46,5 +326,31 @@ def setup_logging():
             }
         }
     }
-    
-    logging.config.dictConfig(config)
\ No newline at end of file
+
+    logging.config.dictConfig(config)
+
+    logger = logging.getLogger("app")
+    sampling = build_sampling_filter()
+    if not queued:
+        if sampling is not None:
+            logger.addFilter(sampling)
+        return
+
+    # Move os handlers configurados para trás da fila; a amostragem é feita
+    # antes de enfileirar
+    handlers = list(logger.handlers)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = BoundedQueueHandler(log_queue)
+    if sampling is not None:
+        queue_handler.addFilter(sampling)
+    logger.addHandler(queue_handler)
+    _queue_handler = queue_handler
+    _listener = BatchingQueueListener(log_queue, *handlers)
+    _listener.start()
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=restart_logging_after_fork)
@@ -1,15 +1,79 @@
-from fastapi import FastAPI
-from .database import engine
-from . import models
-from .routers import todos
-from .logging_config import setup_logging
+from contextlib import asynccontextmanager
 
-models.Base.metadata.create_all(bind=engine)
-setup_logging()
-app = FastAPI()
+from fastapi import FastAPI, Response
+from starlette.concurrency import run_in_threadpool
 
+from . import changefeed, database, metrics, migrate, profiling, querystats, ratelimit, replicas
+from .database import DB_MODE
+from .health import health_monitor
+from .keystore import key_store
+from .routers import health, monitoring, todos, todos_async
+from .logging_config import setup_logging, stop_logging
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A inicialização fica aqui, e não no import do módulo: importar a
+    # aplicação (testes, ferramentas, workers novos) não abre conexões
+    setup_logging()
+    querystats.instrument_engine(database.get_engine())
+    async_engine = database.get_async_engine()
+    if async_engine is not None:
+        querystats.instrument_engine(async_engine.sync_engine)
+    replica_set = replicas.get_replica_set()
+    if replica_set is not None:
+        for replica in replica_set.replicas:
+            querystats.instrument_engine(replica.engine)
+            if replica.async_engine is not None:
+                querystats.instrument_engine(replica.async_engine.sync_engine)
+    if migrate.DB_AUTO_MIGRATE:
+        await run_in_threadpool(migrate.migrate)
+    # A primeira carga pode consultar o banco (API_KEYS_FROM_DB): fora do event loop
+    await run_in_threadpool(key_store.reload)
+    key_store.start()
+    health_monitor.start()
+    if replica_set is not None:
+        replica_set.start()
+    changefeed.start()
+    try:
+        yield
+    finally:
+        await changefeed.stop()
+        if replica_set is not None:
+            await replica_set.stop()
+        await health_monitor.stop()
+        key_store.stop()
+        await database.dispose_engines()
+        stop_logging()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Escritas bem-sucedidas fixam as leituras do cliente no primário por alguns segundos
+if replicas.DATABASE_REPLICA_URLS:
+    app.add_middleware(replicas.ReplicaStickinessMiddleware)
+# Os limites ficam dentro das métricas, para que as respostas 429/503 sejam contabilizadas
+rate_limiter = ratelimit.build_rate_limiter()
+if rate_limiter is not None or ratelimit.MAX_CONCURRENT_REQUESTS > 0:
+    app.add_middleware(ratelimit.RateLimitMiddleware, limiter=rate_limiter)
+if profiling.SQL_PROFILING:
+    app.add_middleware(profiling.ProfilingMiddleware)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# No modo assíncrono as rotas `async def` têm precedência sobre as síncronas
+if DB_MODE == "async":
+    app.include_router(todos_async.router)
 app.include_router(todos.router)
+app.include_router(monitoring.router)
+app.include_router(health.router)
 
 @app.get("/")
 def health_check():
-    return {"status": "online"}
\ No newline at end of file
+    return {"status": "online"}
+
+if metrics.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics():
+        body, content_type = metrics.render()
+        return Response(content=body, media_type=content_type)
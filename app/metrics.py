@@ -0,0 +1,110 @@
+"""
+Métricas no formato do Prometheus: requisições, latência por rota,
+requisições em andamento e consultas SQL por requisição.
+
+Com vários workers do uvicorn, defina PROMETHEUS_MULTIPROC_DIR com um
+diretório vazio compartilhado pelos workers (antes de iniciar o servidor):
+cada processo grava seus valores em arquivos mapeados em memória e
+`/metrics` agrega todos eles, independentemente do worker que responder.
+"""
+import atexit
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+from .querystats import track_queries
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Rótulo das requisições que não corresponderam a nenhuma rota (evita um
+# rótulo por caminho inválido)
+UNMATCHED_ROUTE = "<unmatched>"
+
+REGISTRY = CollectorRegistry()
+
+REQUESTS = Counter(
+    "http_requests_total", "Requisições HTTP atendidas",
+    ["method", "route", "status"], registry=REGISTRY
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota",
+    ["method", "route"], registry=REGISTRY,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requisições HTTP em andamento",
+    ["method"], registry=REGISTRY, multiprocess_mode="livesum"
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "Comandos SQL executados por requisição",
+    ["route"], registry=REGISTRY,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+DB_SECONDS = Histogram(
+    "http_request_db_duration_seconds", "Tempo gasto em comandos SQL por requisição",
+    ["route"], registry=REGISTRY,
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+
+def route_template(scope) -> str:
+    """Template da rota atendida (`/tasks/{task_id}`), não o caminho bruto."""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def render() -> tuple[bytes, str]:
+    """Gera o corpo de `/metrics` (agregando os workers no modo multiprocesso)."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra as métricas de cada requisição HTTP.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - started
+                in_progress.dec()
+                route = route_template(scope)
+                REQUESTS.labels(method, route, str(status_code)).inc()
+                LATENCY.labels(method, route).observe(elapsed)
+                DB_QUERIES.labels(route).observe(stats.count)
+                DB_SECONDS.labels(route).observe(stats.seconds)
+
+
+if MULTIPROC_DIR:
+    # Remove os valores "live" deste worker ao encerrar
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
@@ -0,0 +1,154 @@
+"""
+Atualização do schema do banco, executada explicitamente (e não a cada boot):
+
+    python -m app.migrate
+    python -m app.migrate --check   # só lista o que está pendente
+
+Cria as tabelas que não existem e, nas existentes, adiciona as colunas e os
+índices definidos nos modelos que ainda faltam. Apenas acrescenta: nunca
+remove nem altera colunas. Com DB_AUTO_MIGRATE=true a aplicação executa o
+mesmo processo ao iniciar (útil em desenvolvimento).
+"""
+import logging
+import os
+import sys
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from . import database, models
+
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() in ("1", "true", "yes", "on")
+
+logger = logging.getLogger("app")
+
+
+def _sqlite_expression_default(conn, column) -> bool:
+    default = column.server_default
+    return conn.dialect.name == "sqlite" and default is not None and not isinstance(default.arg, str)
+
+
+def _sqlite_default_trigger(conn, table, column) -> str:
+    """
+    Trigger que faz o papel do default não constante que o ADD COLUMN do
+    SQLite não aceita: preenche a coluna das linhas inseridas sem ela
+    (inclusive por INSERTs que não passam pelo ORM).
+    """
+    preparer = conn.dialect.identifier_preparer
+    name = f"{table.name}_{column.name}_default"
+    table_name = preparer.format_table(table)
+    column_name = preparer.format_column(column)
+    value = column.server_default.arg.compile(dialect=conn.dialect)
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {preparer.quote(name)} AFTER INSERT ON {table_name} "
+        f"WHEN NEW.{column_name} IS NULL BEGIN "
+        f"UPDATE {table_name} SET {column_name} = {value} WHERE rowid = NEW.rowid; END"
+    ))
+    return f"create trigger {name}"
+
+
+def _add_column(conn, table, column) -> str:
+    preparer = conn.dialect.identifier_preparer
+    default = column.server_default
+    backfill = None
+    if _sqlite_expression_default(conn, column):
+        # O SQLite não aceita ADD COLUMN com default não constante (ex.:
+        # CURRENT_TIMESTAMP): a coluna é criada sem default e preenchida depois
+        column.server_default = None
+        try:
+            spec = CreateColumn(column).compile(dialect=conn.dialect)
+        finally:
+            column.server_default = default
+        backfill = default.arg
+    else:
+        spec = CreateColumn(column).compile(dialect=conn.dialect)
+
+    conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}"))
+    if backfill is not None:
+        conn.execute(table.update().values({column.name: backfill}))
+    return f"add column {table.name}.{column.name}"
+
+
+def _sqlite_search_table(conn) -> list[str]:
+    for statement in models.SQLITE_FTS_DDL:
+        conn.execute(text(statement))
+    # Indexa as linhas que já existiam antes da tabela FTS
+    conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+    return ["create sqlite search table tasks_fts"]
+
+
+def migrate(engine=None, dry_run: bool = False) -> list[str]:
+    """
+    Aplica as alterações pendentes em uma transação.
+
+    Args:
+        engine: Engine do banco (padrão: o engine da aplicação)
+        dry_run: Apenas lista as alterações pendentes, sem aplicá-las
+
+    Returns:
+        list[str]: Descrição de cada alteração aplicada (ou pendente, com
+        `dry_run`); vazia se o schema já estava atualizado
+    """
+    engine = engine or database.get_engine()
+    applied = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing = set(inspector.get_table_names())
+        for table in database.Base.metadata.sorted_tables:
+            if table.name not in existing:
+                if not dry_run:
+                    table.create(conn)
+                applied.append(f"create table {table.name}")
+                continue
+
+            columns = {column["name"]: column for column in inspector.get_columns(table.name)}
+            triggers = set()
+            if conn.dialect.name == "sqlite":
+                triggers = set(conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+                )).scalars())
+            for column in table.columns:
+                if column.name not in columns:
+                    applied.append(
+                        f"add column {table.name}.{column.name}" if dry_run else _add_column(conn, table, column)
+                    )
+                # Colunas adicionadas sem o default (também por versões
+                # anteriores desta migração) recebem o trigger equivalente
+                without_default = column.name not in columns or columns[column.name]["default"] is None
+                trigger = f"{table.name}_{column.name}_default"
+                if without_default and _sqlite_expression_default(conn, column) and trigger not in triggers:
+                    applied.append(
+                        f"create trigger {trigger}" if dry_run else _sqlite_default_trigger(conn, table, column)
+                    )
+
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in indexes:
+                    continue
+                if index._ddl_if is not None and index._ddl_if.dialect not in (None, conn.dialect.name):
+                    continue
+                if not dry_run:
+                    index.create(conn)
+                applied.append(f"create index {index.name}")
+
+        if conn.dialect.name == "sqlite" and "tasks" in existing and "tasks_fts" not in existing:
+            applied.extend(["create sqlite search table tasks_fts"] if dry_run else _sqlite_search_table(conn))
+
+    if dry_run:
+        return applied
+    for change in applied:
+        logger.info(f"Migration applied: {change}")
+    return applied
+
+
+def pending(engine=None) -> list[str]:
+    """Alterações de schema ainda não aplicadas."""
+    return migrate(engine, dry_run=True)
+
+
+if __name__ == "__main__":
+    check = "--check" in sys.argv[1:]
+    changes = pending() if check else migrate()
+    print("\n".join(changes) if changes else "Schema já atualizado")
+    # Com --check, sai com código 1 se houver alterações pendentes
+    sys.exit(1 if check and changes else 0)
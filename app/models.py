@@ -1,14 +1,105 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import (
+    DDL, Boolean, Column, DateTime, Index, Integer, String, Text, event, literal_column
+)
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from app.database import Base
 
+# No SQLite as datas são texto: o formato precisa ser o mesmo de
+# CURRENT_TIMESTAMP (server_default) para que comparações e cursores
+# ordenados por data funcionem
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite"
+)
+
+def task_search_vector(title, description):
+    """
+    Expressão tsvector usada na busca textual do PostgreSQL. As constantes são
+    literais (e não parâmetros) para que a expressão da consulta seja idêntica
+    à do índice ix_tasks_search e o planejador consiga usá-lo.
+    """
+    return func.to_tsvector(
+        literal_column("'simple'"),
+        title + literal_column("' '") + func.coalesce(description, literal_column("''"))
+    )
+
+
 class Task(Base):
     __tablename__ = "tasks"
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now())
+    # Incrementada a cada alteração; base dos ETags das respostas
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Índices das listagens: (campo, id) atende filtros por intervalo e a
+    # paginação por cursor ordenada pelo campo
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", created_at, id),
+        Index("ix_tasks_title_id", title, id),
+        # Filtro por prefixo (LIKE 'x%') no PostgreSQL com qualquer colação
+        Index(
+            "ix_tasks_title_pattern", title, postgresql_ops={"title": "text_pattern_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_tasks_search", task_search_vector(title, description), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
     
     def __repr__(self):
-        return f"<Task {self.title}>"
\ No newline at end of file
+        return f"<Task {self.title}>"
+
+
+class ApiKey(Base):
+    """Chaves de API aceitas no header `token`, guardadas apenas como hash SHA-256."""
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    key_hash = Column(String(64), nullable=False, unique=True)
+    active = Column(Boolean, nullable=False, default=True, server_default="1")
+    created_at = Column(Timestamp, server_default=func.now())
+
+    def __repr__(self):
+        return f"<ApiKey {self.name}>"
+
+
+class IdempotencyKey(Base):
+    """Respostas de POST /tasks/ guardadas por Idempotency-Key (ver `crud.create_task_idempotent`)."""
+    __tablename__ = "idempotency_keys"
+
+    # SHA-256 do cliente e da chave enviada
+    key = Column(String(64), primary_key=True)
+    # SHA-256 do corpo da requisição: a chave não pode ser reutilizada com outro corpo
+    request_hash = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    # Instante de expiração (segundos desde a época), igual em qualquer banco
+    expires_at = Column(Integer, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.key}>"
+
+
+# No SQLite (execuções locais) a busca textual usa uma tabela FTS5 mantida
+# por triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+for statement in SQLITE_FTS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
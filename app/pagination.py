@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import datetime
+
+
+# Campos aceitos no parâmetro `sort` (prefixo "-" para ordem decrescente)
+SORT_FIELDS = ("id", "created_at", "title")
+
+
+def parse_sort(sort: str) -> tuple[str, bool]:
+    """
+    Interpreta o parâmetro `sort`. Retorna (campo, decrescente).
+
+    Raises:
+        ValueError: Se o campo não for suportado
+    """
+    descending = sort.startswith("-")
+    field = sort[1:] if descending else sort
+    if field not in SORT_FIELDS:
+        raise ValueError(
+            f"O parâmetro 'sort' deve ser um de: {', '.join(SORT_FIELDS)} (use '-' para ordem decrescente)"
+        )
+    return field, descending
+
+
+def encode_cursor(last_id: int, sort_key=None) -> str:
+    """
+    Gera o cursor opaco que aponta para o registro seguinte a `last_id`.
+    Quando a ordenação não é pelo id, `sort_key` guarda o valor do campo
+    ordenado no último registro.
+    """
+    payload = {"id": last_id}
+    if sort_key is not None:
+        payload["k"] = sort_key.isoformat() if isinstance(sort_key, datetime) else sort_key
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        last_id = payload["id"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Cursor de paginação inválido")
+    if not isinstance(last_id, int) or last_id < 0:
+        raise ValueError("Cursor de paginação inválido")
+    return payload
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodifica um cursor gerado por `encode_cursor` e retorna o último id.
+
+    Raises:
+        ValueError: Se o cursor estiver malformado
+    """
+    return _decode(cursor)["id"]
+
+
+def decode_sort_cursor(cursor: str, field: str):
+    """
+    Decodifica um cursor de uma listagem ordenada por `field`.
+    Retorna (último id, valor do campo ordenado).
+
+    Raises:
+        ValueError: Se o cursor estiver malformado ou não tiver o valor do campo
+    """
+    payload = _decode(cursor)
+    if field == "id":
+        return payload["id"], payload["id"]
+    if not isinstance(payload.get("k"), str):
+        raise ValueError("Cursor de paginação inválido para esta ordenação")
+    key = payload["k"]
+    if field == "created_at":
+        try:
+            key = datetime.fromisoformat(key)
+        except ValueError:
+            raise ValueError("Cursor de paginação inválido")
+    return payload["id"], key
+
+
+def next_cursor(tasks, limit: int, sort: str = "id") -> str | None:
+    """
+    Retorna o cursor da próxima página, ou None quando a página atual é a última.
+    """
+    if len(tasks) < limit:
+        return None
+    last = tasks[-1]
+    field = sort.lstrip("-")
+    return encode_cursor(last.id, None if field == "id" else getattr(last, field))
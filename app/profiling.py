@@ -0,0 +1,160 @@
+"""
+Modo de profiling de SQL por requisição (opcional, SQL_PROFILING=true).
+
+Para cada requisição registra a quantidade de comandos, o tempo total no
+banco e o comando mais lento; envia um resumo no header `X-DB-Profile` e
+em uma linha de log estruturada. Comandos repetidos muitas vezes na mesma
+requisição (padrão N+1) geram um aviso, e comandos acima de
+SQL_SLOW_QUERY_MS são registrados junto com o plano de execução.
+"""
+import logging
+import os
+import time
+from collections import Counter
+
+from .metrics import route_template
+from .querystats import QueryStats, track_queries
+
+SQL_PROFILING = os.getenv("SQL_PROFILING", "false").lower() in ("1", "true", "yes", "on")
+# Duração a partir da qual um comando é registrado com o seu EXPLAIN
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+# Execuções do mesmo comando em uma requisição que indicam um possível N+1
+SQL_REPEATED_QUERY_THRESHOLD = int(os.getenv("SQL_REPEATED_QUERY_THRESHOLD", "5"))
+
+PROFILE_HEADER = b"x-db-profile"
+
+logger = logging.getLogger("app.profiling")
+
+
+def explain(conn, statement: str, parameters) -> str | None:
+    """
+    Plano de execução do comando, usando um cursor novo da mesma conexão
+    (sem passar pelos eventos do engine). Retorna None se não for possível.
+
+    No PostgreSQL um erro dentro de uma transação a deixa abortada para os
+    comandos seguintes da requisição: o EXPLAIN roda em um SAVEPOINT, que é
+    desfeito se ele falhar.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect in ("postgresql", "mysql", "mariadb"):
+        prefix = "EXPLAIN "
+    else:
+        return None
+    if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+        return None
+    savepoint = dialect == "postgresql" and conn.in_transaction()
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT profiling_explain")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            except Exception:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT profiling_explain")
+                raise
+            finally:
+                if savepoint:
+                    cursor.execute("RELEASE SAVEPOINT profiling_explain")
+        finally:
+            cursor.close()
+    except Exception:
+        logger.debug("Could not explain statement", exc_info=True)
+        return None
+    return "\n".join(" | ".join(str(value) for value in row) for row in rows)
+
+
+class ProfileStats(QueryStats):
+    """Estatísticas detalhadas dos comandos SQL de uma requisição."""
+    __slots__ = ("slowest_seconds", "slowest_statement", "statements", "slow_ms")
+
+    def __init__(self, slow_ms: float = SQL_SLOW_QUERY_MS):
+        super().__init__()
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+        self.statements = Counter()
+        self.slow_ms = slow_ms
+
+    def record(self, conn, statement, parameters, seconds):
+        super().record(conn, statement, parameters, seconds)
+        self.statements[statement] += 1
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        if seconds * 1000 >= self.slow_ms:
+            logger.warning(
+                "Slow query",
+                extra={
+                    "duration_ms": round(seconds * 1000, 3),
+                    "statement": statement,
+                    "plan": explain(conn, statement, parameters),
+                }
+            )
+
+    def repeated(self, threshold: int = SQL_REPEATED_QUERY_THRESHOLD) -> dict[str, int]:
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+    def header_value(self) -> bytes:
+        return (
+            f"statements={self.count}; db_ms={self.seconds * 1000:.3f}; "
+            f"slowest_ms={self.slowest_seconds * 1000:.3f}"
+        ).encode()
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que mede os comandos SQL de cada requisição HTTP.
+    """
+
+    def __init__(self, app, slow_ms: float = SQL_SLOW_QUERY_MS,
+                 repeated_threshold: int = SQL_REPEATED_QUERY_THRESHOLD):
+        self.app = app
+        self.slow_ms = slow_ms
+        self.repeated_threshold = repeated_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = ProfileStats(self.slow_ms)
+        status_code = 500
+
+        async def send_with_profile(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_HEADER, stats.header_value())]
+            await send(message)
+
+        started = time.perf_counter()
+        with track_queries(stats):
+            try:
+                await self.app(scope, receive, send_with_profile)
+            finally:
+                self._log(scope, status_code, stats, time.perf_counter() - started)
+
+    def _log(self, scope, status_code: int, stats: ProfileStats, elapsed: float):
+        route = route_template(scope)
+        logger.info(
+            "Request profile",
+            extra={
+                "method": scope["method"],
+                "route": route,
+                "status": status_code,
+                "duration_ms": round(elapsed * 1000, 3),
+                "statements": stats.count,
+                "db_ms": round(stats.seconds * 1000, 3),
+                "slowest_ms": round(stats.slowest_seconds * 1000, 3),
+                "slowest_statement": stats.slowest_statement,
+            }
+        )
+        for statement, count in stats.repeated(self.repeated_threshold).items():
+            logger.warning(
+                "Repeated query (possible N+1)",
+                extra={"route": route, "executions": count, "statement": statement}
+            )
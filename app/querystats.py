@@ -0,0 +1,71 @@
+"""
+Contagem e tempo das consultas SQL de cada requisição.
+
+Os eventos `before_cursor_execute`/`after_cursor_execute` do engine somam
+cada comando nos `QueryStats` ativos na requisição atual, guardados em uma
+ContextVar (que acompanha a requisição também no threadpool das rotas
+síncronas e nos greenlets do engine assíncrono). Blocos `track_queries`
+podem ser aninhados: cada um recebe todos os comandos executados nele.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+_active: ContextVar[tuple] = ContextVar("query_stats", default=())
+
+
+class QueryStats:
+    """Comandos SQL executados durante uma requisição."""
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def record(self, conn, statement: str, parameters, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+
+
+@contextmanager
+def track_queries(stats: QueryStats | None = None):
+    """Acumula em `stats` os comandos executados dentro do bloco."""
+    stats = stats if stats is not None else QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    active = _active.get()
+    started = conn.info.get("query_started")
+    if not active or not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    for stats in active:
+        stats.record(conn, statement, parameters, seconds)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") \
+        if exception_context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine):
+    """Registra os eventos de contagem no engine (síncrono) uma única vez."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
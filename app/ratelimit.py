@@ -0,0 +1,193 @@
+"""
+Limite de taxa por token e limite de requisições simultâneas.
+
+- Limite de taxa: balde de fichas (token bucket) por valor do header
+  `token` (ou por IP, sem token). Com RATE_LIMIT_PER_SECOND=0 fica
+  desativado. Excedido, responde 429 com `Retry-After`.
+- Limite de concorrência: no máximo MAX_CONCURRENT_REQUESTS requisições
+  em andamento por worker; as excedentes esperam até
+  CONCURRENCY_QUEUE_TIMEOUT segundos por uma vaga e depois recebem 503.
+  Como o middleware roda antes das rotas, a requisição é recusada antes de
+  pegar uma conexão do pool.
+
+O backend `memory` guarda os baldes no próprio worker. Como o middleware
+roda no event loop (uma única thread), as atualizações não precisam de
+lock. Com vários workers, RATE_LIMIT_BACKEND=redis compartilha os baldes
+entre eles (um script Lua atualiza cada balde de forma atômica).
+"""
+import asyncio
+import hashlib
+import math
+import os
+import time
+from collections import OrderedDict
+
+from starlette.responses import JSONResponse
+
+from .cache import REDIS_URL
+
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "0"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "0")) or max(int(RATE_LIMIT_PER_SECOND * 2), 1)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "0"))
+CONCURRENCY_QUEUE_TIMEOUT = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT", "0.5"))
+# Rotas que não passam pelos limites (sondas de saúde e coleta de métricas)
+RATE_LIMIT_EXEMPT_PATHS = frozenset(
+    path.strip()
+    for path in os.getenv("RATE_LIMIT_EXEMPT_PATHS", "/,/healthz,/readyz,/metrics").split(",")
+    if path.strip()
+)
+# Streams de longa duração: passam pelo limite de taxa (na conexão), mas não
+# ocupam vaga do limite de concorrência enquanto ficam abertos
+LONG_LIVED_PATHS = frozenset({"/tasks/changes"})
+
+
+class MemoryRateLimiter:
+    """
+    Baldes de fichas mantidos na memória do worker: chave -> [fichas, instante].
+    """
+    name = "memory"
+
+    # Limite de baldes acompanhados (tokens inválidos também geram baldes);
+    # acima dele o balde usado há mais tempo é descartado
+    MAX_KEYS = 100000
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        # Ordem de uso: o primeiro é o balde usado há mais tempo
+        self._buckets: OrderedDict[str, list] = OrderedDict()
+
+    async def hit(self, key: str) -> float:
+        """Consome uma ficha. Retorna 0 se permitido, ou os segundos até a próxima ficha."""
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_KEYS:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = [float(self.burst), now]
+        else:
+            self._buckets.move_to_end(key)
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / self.rate
+
+
+# Balde de fichas atômico no Redis: KEYS[1] = chave; ARGV = taxa, capacidade, agora
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+local retry = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry)
+"""
+
+
+class RedisRateLimiter:
+    """
+    Baldes de fichas compartilhados entre workers em um servidor Redis.
+    Recebe um cliente assíncrono (ex.: `redis.asyncio.Redis`).
+    """
+    name = "redis"
+
+    def __init__(self, client, rate: float, burst: int, prefix: str = "tasksynchub:ratelimit:"):
+        self.client = client
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_LUA)
+
+    async def hit(self, key: str) -> float:
+        retry = await self._script(keys=[self.prefix + key], args=[self.rate, self.burst, time.time()])
+        return float(retry)
+
+
+def build_rate_limiter(backend: str = RATE_LIMIT_BACKEND, rate: float = RATE_LIMIT_PER_SECOND,
+                       burst: int = RATE_LIMIT_BURST):
+    """Cria o backend configurado (ou None se o limite de taxa estiver desativado)."""
+    if rate <= 0:
+        return None
+    if backend == "memory":
+        return MemoryRateLimiter(rate, burst)
+    if backend == "redis":
+        import redis.asyncio
+
+        return RedisRateLimiter(redis.asyncio.Redis.from_url(REDIS_URL), rate, burst)
+    raise ValueError(f"RATE_LIMIT_BACKEND inválido: '{backend}'")
+
+
+def client_key(scope) -> str:
+    """Chave do balde: hash do header `token` ou, sem token, o IP do cliente."""
+    for name, value in scope.get("headers", ()):
+        if name == b"token":
+            return "token:" + hashlib.sha256(value).hexdigest()[:32]
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI que aplica o limite de taxa por cliente e o limite de
+    requisições simultâneas do worker.
+    """
+
+    def __init__(self, app, limiter=None, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 queue_timeout: float = CONCURRENCY_QUEUE_TIMEOUT,
+                 exempt_paths=RATE_LIMIT_EXEMPT_PATHS):
+        self.app = app
+        self.limiter = limiter
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.exempt_paths = exempt_paths
+        self._semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self.limiter is not None:
+            retry_after = await self.limiter.hit(client_key(scope))
+            if retry_after > 0:
+                response = JSONResponse(
+                    {"detail": "Limite de requisições excedido"},
+                    status_code=429,
+                    headers={"Retry-After": str(math.ceil(retry_after))}
+                )
+                await response(scope, receive, send)
+                return
+
+        if self._semaphore is None or scope["path"] in LONG_LIVED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            response = JSONResponse(
+                {"detail": "Servidor sobrecarregado, tente novamente"},
+                status_code=503,
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._semaphore.release()
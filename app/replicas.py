@@ -0,0 +1,308 @@
+"""
+Leituras em réplicas do banco (opcional, DATABASE_REPLICA_URLS).
+
+As rotas somente leitura usam `get_read_db`/`get_async_read_db`, que abrem a
+sessão em uma réplica escolhida por rodízio (`round_robin`) ou pela réplica
+com menos conexões em uso (`least_connections`). As escritas continuam no
+primário (`get_db`).
+
+- Ler o que escreveu: depois de uma escrita bem-sucedida, as leituras do
+  mesmo cliente (token ou IP) vão para o primário por REPLICA_STICKY_SECONDS.
+  O worker guarda o instante da escrita e a resposta leva o cookie
+  `db_primary_until`, que vale em qualquer worker para clientes que o
+  reenviam.
+- Atraso: uma tarefa em segundo plano mede o atraso de replicação de cada
+  réplica a cada REPLICA_LAG_CHECK_INTERVAL segundos. Réplicas com atraso
+  acima de REPLICA_MAX_LAG_SECONDS, com erro ou sem medição recente ficam
+  fora do rodízio; sem réplicas disponíveis, a leitura vai para o primário.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from . import database
+from .ratelimit import client_key
+
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# round_robin ou least_connections
+REPLICA_SELECTION = os.getenv("REPLICA_SELECTION", "round_robin").lower()
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "2"))
+
+STICKY_COOKIE = "db_primary_until"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Atraso de replicação em segundos. No PostgreSQL, uma réplica que já
+# aplicou tudo o que recebeu está em dia (mesmo sem transações recentes no
+# primário); nos demais bancos (ex.: SQLite nos testes) o atraso é 0
+LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    ),
+}
+
+logger = logging.getLogger("app")
+
+
+class Replica:
+    """Uma réplica: engines, fábrica de sessões e a última medição de atraso."""
+
+    def __init__(self, url: str, max_lag: float, is_async: bool = database.DB_MODE == "async"):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = create_engine(url, **database.get_engine_options(url))
+        info = {database.REPLICA_MAX_LAG_INFO: max_lag}
+        self.session_factory = sessionmaker(autoflush=False, bind=self.engine, info=info)
+        self.async_engine = None
+        self.async_session_factory = None
+        if is_async:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            async_url = database.to_async_url(url)
+            self.async_engine = create_async_engine(
+                async_url, **database.get_engine_options(async_url, is_async=True)
+            )
+            self.async_session_factory = async_sessionmaker(
+                self.async_engine, autoflush=False, expire_on_commit=False, info=info
+            )
+        self.lag = None
+        self.error = "ainda não verificada"
+        self.checked_at = None
+        self.reads = 0
+
+    def in_use(self) -> int:
+        engine = self.async_engine.sync_engine if self.async_engine is not None else self.engine
+        return engine.pool.checkedout() if isinstance(engine.pool, QueuePool) else 0
+
+    def measure_lag(self) -> float:
+        query = LAG_QUERIES.get(self.engine.dialect.name, "SELECT 0")
+        with self.engine.connect() as conn:
+            return float(conn.execute(text(query)).scalar() or 0)
+
+
+class ReplicaSet:
+    """
+    Escolha da réplica de cada leitura e registro das escritas recentes por cliente.
+    """
+
+    # Limite de clientes acompanhados na janela de leitura no primário
+    MAX_KEYS = 100000
+
+    def __init__(self, replicas: list, selection: str = REPLICA_SELECTION,
+                 max_lag: float = REPLICA_MAX_LAG_SECONDS, sticky_seconds: float = REPLICA_STICKY_SECONDS,
+                 check_interval: float = REPLICA_LAG_CHECK_INTERVAL, clock=time.monotonic):
+        if selection not in ("round_robin", "least_connections"):
+            raise ValueError(f"REPLICA_SELECTION inválido: '{selection}'")
+        self.replicas = replicas
+        self.selection = selection
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self._clock = clock
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._writes: dict[str, float] = {}
+        self._task = None
+        self.primary_reads = 0
+
+    def available(self) -> list:
+        """Réplicas com medição recente e atraso dentro do limite."""
+        now = self._clock()
+        stale_after = self.check_interval * 3 + 1
+        return [
+            replica for replica in self.replicas
+            if replica.lag is not None and replica.lag <= self.max_lag
+            and now - replica.checked_at <= stale_after
+        ]
+
+    def choose(self, primary: bool = False):
+        """
+        Réplica para a próxima leitura, ou None para ler no primário (sem
+        réplica disponível ou com `primary`, ex.: cliente que acabou de escrever).
+        """
+        candidates = [] if primary else self.available()
+        with self._lock:
+            if not candidates:
+                self.primary_reads += 1
+                return None
+            if self.selection == "least_connections":
+                replica = min(candidates, key=lambda candidate: candidate.in_use())
+            else:
+                replica = candidates[next(self._counter) % len(candidates)]
+            replica.reads += 1
+        return replica
+
+    def mark_write(self, key: str):
+        now = self._clock()
+        with self._lock:
+            if len(self._writes) >= self.MAX_KEYS:
+                self._writes = {k: deadline for k, deadline in self._writes.items() if deadline > now}
+            self._writes[key] = now + self.sticky_seconds
+
+    def wrote_recently(self, key: str) -> bool:
+        deadline = self._writes.get(key)
+        return deadline is not None and deadline > self._clock()
+
+    def refresh(self):
+        """Mede o atraso de todas as réplicas."""
+        for replica in self.replicas:
+            try:
+                replica.lag = replica.measure_lag()
+                replica.error = None
+            except Exception as e:
+                replica.lag = None
+                replica.error = type(e).__name__
+                logger.warning(f"Replica check failed for {replica.name}: {replica.error}")
+            replica.checked_at = self._clock()
+            if replica.lag is not None and replica.lag > self.max_lag:
+                logger.warning(f"Replica {replica.name} lagging {replica.lag:.1f}s; reads go to the primary")
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self.refresh)
+            await asyncio.sleep(self.check_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            if replica.async_engine is not None:
+                await replica.async_engine.dispose()
+            replica.engine.dispose()
+
+    def status(self) -> dict:
+        available = self.available()
+        return {
+            "selection": self.selection,
+            "primary_reads": self.primary_reads,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "available": replica in available,
+                    "lag_seconds": replica.lag,
+                    "error": replica.error,
+                    "in_use": replica.in_use(),
+                    "reads": replica.reads,
+                }
+                for replica in self.replicas
+            ],
+        }
+
+
+_replica_set = None
+_init_lock = threading.Lock()
+
+def get_replica_set() -> ReplicaSet | None:
+    """Conjunto de réplicas configurado, criado no primeiro uso (None sem réplicas)."""
+    global _replica_set
+    if _replica_set is None and DATABASE_REPLICA_URLS:
+        with _init_lock:
+            if _replica_set is None:
+                _replica_set = ReplicaSet([Replica(url, REPLICA_MAX_LAG_SECONDS) for url in DATABASE_REPLICA_URLS])
+    return _replica_set
+
+def dispose_replicas_after_fork():
+    """Descarta no processo filho as conexões herdadas das réplicas (ver `database.dispose_engines_after_fork`)."""
+    if _replica_set is not None:
+        for replica in _replica_set.replicas:
+            replica.engine.dispose(close=False)
+            if replica.async_engine is not None:
+                replica.async_engine.sync_engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=dispose_replicas_after_fork)
+
+
+def _primary_cookie(value: str | None) -> bool:
+    # Aceita apenas prazos dentro da janela (um cookie forjado não fixa o cliente no primário)
+    try:
+        remaining = float(value) - time.time()
+    except (TypeError, ValueError):
+        return False
+    replica_set = get_replica_set()
+    return 0 < remaining <= replica_set.sticky_seconds
+
+
+def route_read(request: Request):
+    """Réplica que atende a leitura desta requisição, ou None para o primário."""
+    replica_set = get_replica_set()
+    if replica_set is None:
+        return None
+    primary = (
+        replica_set.wrote_recently(client_key(request.scope))
+        or _primary_cookie(request.cookies.get(STICKY_COOKIE))
+    )
+    return replica_set.choose(primary=primary)
+
+
+def read_session_factory(request: Request):
+    replica = route_read(request)
+    return replica.session_factory if replica is not None else database.get_session_factory()
+
+
+def get_read_db(request: Request):
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    replica = route_read(request)
+    factory = replica.async_session_factory if replica is not None else database.get_async_session_factory()
+    async with factory() as db:
+        yield db
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Middleware ASGI que registra as escritas bem-sucedidas de cada cliente e
+    envia o cookie `db_primary_until`, para que as leituras seguintes do
+    mesmo cliente vejam a escrita.
+    """
+
+    def __init__(self, app, replica_set: ReplicaSet | None = None):
+        self.app = app
+        # Sem `replica_set`, usa o configurado (criado no primeiro uso, não no import)
+        self.replica_set = replica_set
+
+    async def __call__(self, scope, receive, send):
+        replica_set = self.replica_set or get_replica_set()
+        if scope["type"] != "http" or scope["method"] in READ_METHODS or replica_set is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_mark(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                replica_set.mark_write(client_key(scope))
+                seconds = replica_set.sticky_seconds
+                cookie = (
+                    f"{STICKY_COOKIE}={time.time() + seconds:.3f}; Max-Age={int(seconds) or 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_mark)
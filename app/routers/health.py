@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..health import health_monitor
+
+# Sondas de vivacidade e prontidão (sem autenticação e sem acesso ao banco)
+router = APIRouter(tags=["Health"])
+
+@router.get("/healthz")
+async def liveness():
+    """
+    Indica apenas que o processo está respondendo.
+    """
+    return {"status": "alive"}
+
+@router.get("/readyz")
+async def readiness():
+    """
+    Indica se o worker pode receber tráfego: banco respondendo na última
+    verificação periódica, schema atualizado e pool não saturado.
+
+    Retorna 503 quando não está pronto. O resultado vem do cache da
+    verificação em segundo plano (HEALTH_CHECK_INTERVAL), não de uma
+    consulta por sonda.
+    """
+    ready, body = health_monitor.readiness()
+    return JSONResponse(body, status_code=200 if ready else 503)
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends
+
+from .. import async_crud, changefeed, crud, database, schemas, dependencies
+from ..cache import task_cache
+
+# Rotas operacionais (estado interno do processo)
+router = APIRouter(
+    prefix="/monitoring",
+    tags=["Monitoring"]
+)
+
+@router.get(
+    "/pool",
+    response_model=dict[str, schemas.PoolStatus],
+    response_model_exclude_none=True
+)
+def read_pool_status(_ = Depends(dependencies.verify_token)):
+    """
+    Retorna o estado do pool de conexões deste worker: conexões em uso,
+    overflow e tempo de espera por checkout.
+
+    Cada worker do uvicorn tem o seu próprio pool; o campo `pid` identifica
+    qual worker respondeu.
+    """
+    status = {"sync": database.get_pool_status(database.get_engine())}
+    async_engine = database.get_async_engine()
+    if async_engine is not None:
+        status["async"] = database.get_pool_status(async_engine.sync_engine)
+    return status
+
+
+@router.get("/cache", response_model=schemas.CacheStatus)
+def read_cache_status(_ = Depends(dependencies.verify_token)):
+    """
+    Retorna os contadores do cache de leitura de tarefas deste worker.
+    """
+    return {
+        "backend": task_cache.name,
+        "entries": task_cache.size(),
+        **task_cache.stats.snapshot(),
+        "coalesced": crud.task_flight.coalesced + async_crud.task_flight.coalesced,
+    }
+
+
+@router.get("/changes")
+def read_change_feed_status(_ = Depends(dependencies.verify_token)):
+    """
+    Retorna o estado do feed de alterações deste worker: assinantes
+    conectados, eventos publicados e eventos no buffer de reconexão.
+    """
+    return changefeed.change_feed.status()
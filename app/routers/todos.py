@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas, dependencies
+from .. import changefeed, crud, export, schemas, dependencies
+from ..pagination import next_cursor
+from ..ratelimit import client_key
+from ..serialization import FastJSONResponse, idempotent_response, task_list_response
+from ..etag import conditional_headers, is_not_modified, list_etag, task_etag
 from ..database import get_db
+from ..replicas import get_read_db, read_session_factory
 
 # Cria um "roteador" para agrupar as rotas relacionadas a tarefas
 router = APIRouter(
@@ -16,7 +24,9 @@ router = APIRouter(
     status_code=status.HTTP_201_CREATED
 )
 def create_task(
+    request: Request,
     task: schemas.TaskCreate,
+    idempotency_key: str | None = Header(None),
     db: Session = Depends(get_db),
     _ = Depends(dependencies.verify_token)
 ):
@@ -27,22 +37,185 @@ def create_task(
     - **description**: A descrição da tarefa (opcional).
 
     É necessário enviar um header `token` com o valor correto para autenticação.
+
+    Com o header `Idempotency-Key`, repetições da mesma requisição (ex.:
+    após um timeout) recebem a resposta original, com o header
+    `Idempotent-Replayed: true`, sem criar outra tarefa. Reutilizar a chave
+    com outro corpo resulta em 422.
+    """
+    if idempotency_key is None:
+        return crud.create_task(db=db, task=task)
+    body, replayed = crud.create_task_idempotent(db, task, idempotency_key, client_key(request.scope))
+    return idempotent_response(body, replayed)
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.TaskBulkResult,
+    status_code=status.HTTP_201_CREATED
+)
+def create_tasks(
+    tasks: list[schemas.TaskCreate],
+    chunk_size: int = crud.BULK_INSERT_CHUNK_SIZE,
+    all_or_nothing: bool = False,
+    db: Session = Depends(get_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Cria várias tarefas de uma só vez, usando INSERTs multi-linha em blocos.
+
+    - **chunk_size**: Número de tarefas inseridas por comando.
+    - **all_or_nothing**: Se verdadeiro, um item inválido cancela o lote inteiro.
+      Caso contrário, cada item com problema é reportado em `errors` e os demais
+      são criados normalmente.
+    """
+    return crud.create_tasks(
+        db=db, tasks=tasks, chunk_size=chunk_size, all_or_nothing=all_or_nothing
+    )
+
+
+@router.patch("/bulk", response_model=schemas.TaskBulkChangeResult)
+def update_tasks(
+    changes: schemas.TaskBulkUpdate,
+    db: Session = Depends(get_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Atualiza várias tarefas com um único comando, sem carregá-las antes.
+
+    - **ids** ou **filter**: Tarefas alvo (lista de IDs ou os mesmos filtros
+      da listagem: `title_prefix`, `q`, `created_after`, `created_before`).
+    - **title** / **description**: Novos valores; apenas os campos enviados
+      são alterados.
+
+    A resposta traz a quantidade e os IDs afetados e, quando a seleção é por
+    IDs, os que não foram encontrados (`missing_ids`).
+    """
+    return crud.update_tasks(db, changes=changes)
+
+
+@router.delete("/bulk", response_model=schemas.TaskBulkChangeResult)
+def delete_tasks(
+    selection: schemas.TaskBulkDelete,
+    db: Session = Depends(get_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Exclui várias tarefas com um único comando.
+
+    - **ids** ou **filter**: Tarefas alvo, como em `PATCH /tasks/bulk`.
     """
-    return crud.create_task(db=db, task=task)
+    return crud.delete_tasks(db, selection=selection)
 
 
-@router.get("/", response_model=list[schemas.Task])
+@router.get("/", response_model=list[schemas.Task], response_class=FastJSONResponse)
 def read_tasks(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    after: str | None = None,
+    sort: str = "id",
+    filters: schemas.TaskFilter = Depends(),
+    db: Session = Depends(get_read_db),
     _ = Depends(dependencies.verify_token)
 ):
     """
     Retorna uma lista de todas as tarefas.
+
+    - **skip** / **limit**: Paginação por deslocamento.
+    - **after**: Cursor opaco para paginação por cursor. O cursor da próxima
+      página é enviado no header `X-Next-Cursor` (ausente na última página).
+    - **title_prefix**: Apenas tarefas cujo título começa com o valor.
+    - **q**: Busca textual no título e na descrição.
+    - **created_after** / **created_before**: Intervalo da data de criação.
+    - **sort**: `id`, `created_at` ou `title`; prefixo `-` para ordem decrescente.
+
+    Suporta GET condicional com `If-None-Match` (ETag): se a página não
+    mudou a resposta é um 304 sem corpo. A listagem não usa Last-Modified:
+    exclusões e inserções mudam a página sem alterar nenhum `updated_at`.
     """
-    tasks = crud.get_tasks(db, skip=skip, limit=limit)
-    return tasks
+    # Tuplas de colunas codificadas direto com orjson: o `response_model` fica
+    # apenas para o schema do OpenAPI, sem validar item por item
+    rows = crud.get_task_rows(
+        db, skip=skip, limit=limit, after=after, filters=filters, sort=sort
+    )
+    etag = list_etag(rows)
+    headers = conditional_headers(etag)
+    cursor = next_cursor(rows, limit, sort)
+    if cursor is not None:
+        headers["X-Next-Cursor"] = cursor
+    if is_not_modified(request.headers, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return task_list_response(rows, headers=headers)
+
+
+@router.get("/export")
+def export_tasks(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    after_id: int = 0,
+    compress: bool = False,
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Exporta todas as tarefas em um único fluxo, em ordem de id.
+
+    - **format**: `ndjson` (um objeto JSON por linha) ou `csv`.
+    - **after_id**: Retoma a exportação a partir do id seguinte (use o último
+      id recebido de uma exportação interrompida).
+    - **compress**: Comprime o fluxo com gzip (`Content-Encoding: gzip`).
+
+    As linhas são lidas com um cursor do lado do servidor, então a memória
+    usada não depende do tamanho da tabela.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export.export_stream(read_session_factory(request), crud.iter_tasks, format, after_id, compress),
+        media_type=media_type,
+        headers=headers
+    )
+
+
+@router.get("/batch", response_model=schemas.TaskBatch)
+def read_tasks_batch(
+    ids: str,
+    db: Session = Depends(get_read_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Retorna várias tarefas em uma requisição.
+
+    - **ids**: IDs separados por vírgula (máximo de 100), ex.: `ids=1,2,3`.
+
+    As tarefas vêm na ordem pedida; os IDs inexistentes são listados em
+    `missing_ids`. As que não estão no cache são buscadas em uma única consulta.
+    """
+    return crud.get_tasks_batch(db, ids=ids)
+
+
+@router.get("/changes")
+async def stream_changes(
+    last_event_id: str | None = Header(None),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Feed de alterações das tarefas (server-sent events).
+
+    Cada evento tem um `id` e o corpo `{"type": "created" | "updated" |
+    "deleted", "task_id": ...}`, emitido quando a escrita é confirmada. Ao
+    reconectar, envie o último `id` recebido no header `Last-Event-ID` (o
+    `EventSource` do navegador faz isso sozinho) para receber os eventos
+    perdidos. `{"type": "reset"}` indica que eventos se perderam: releia a
+    lista. Comentários `: keepalive` mantêm a conexão aberta.
+    """
+    return StreamingResponse(
+        changefeed.change_feed.subscribe(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 from fastapi import HTTPException
@@ -50,15 +223,27 @@ from fastapi import HTTPException
 @router.get("/{task_id}", response_model=schemas.Task)
 def read_task(
     task_id: int, 
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     _ = Depends(dependencies.verify_token)
 ):
     """
     Retorna os detalhes de uma tarefa específica.
+
+    Envia o header `ETag`; com `If-None-Match` igual ao ETag atual a resposta
+    é um 304 sem corpo.
     """
-    db_task = crud.get_task(db, task_id=task_id)
+    db_task = crud.get_task_cached(db, task_id=task_id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    etag = task_etag(db_task)
+    if is_not_modified(request.headers, etag, db_task.updated_at):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=conditional_headers(etag, db_task.updated_at)
+        )
+    response.headers.update(conditional_headers(etag, db_task.updated_at))
     return db_task
 
 
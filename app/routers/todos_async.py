@@ -0,0 +1,152 @@
+from fastapi import APIRouter, Depends, Header, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import async_crud, schemas, dependencies
+from ..pagination import next_cursor
+from ..ratelimit import client_key
+from ..serialization import FastJSONResponse, idempotent_response, task_list_response
+from ..etag import conditional_headers, is_not_modified, list_etag, task_etag
+from ..database import get_async_db
+from ..replicas import get_async_read_db
+
+# Versões `async def` das rotas de tarefas, registradas quando DB_MODE=async.
+# São incluídas antes de `todos.router`, que continua atendendo as rotas que
+# não têm versão assíncrona (ex.: /tasks/bulk). Por isso o parâmetro de
+# caminho usa o conversor `:int`, para não capturar caminhos como /tasks/bulk.
+router = APIRouter(
+    prefix="/tasks",
+    tags=["Tasks"]
+)
+
+@router.post(
+    "/",
+    response_model=schemas.Task,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_task(
+    request: Request,
+    task: schemas.TaskCreate,
+    idempotency_key: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Cria uma nova tarefa.
+
+    - **title**: O título da tarefa (obrigatório).
+    - **description**: A descrição da tarefa (opcional).
+
+    É necessário enviar um header `token` com o valor correto para autenticação.
+
+    Com o header `Idempotency-Key`, repetições da mesma requisição (ex.:
+    após um timeout) recebem a resposta original, com o header
+    `Idempotent-Replayed: true`, sem criar outra tarefa. Reutilizar a chave
+    com outro corpo resulta em 422.
+    """
+    if idempotency_key is None:
+        return await async_crud.create_task(db=db, task=task)
+    body, replayed = await async_crud.create_task_idempotent(db, task, idempotency_key, client_key(request.scope))
+    return idempotent_response(body, replayed)
+
+
+@router.get("/", response_model=list[schemas.Task], response_class=FastJSONResponse)
+async def read_tasks(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    after: str | None = None,
+    sort: str = "id",
+    filters: schemas.TaskFilter = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Retorna uma lista de todas as tarefas.
+
+    - **skip** / **limit**: Paginação por deslocamento.
+    - **after**: Cursor opaco para paginação por cursor. O cursor da próxima
+      página é enviado no header `X-Next-Cursor` (ausente na última página).
+    - **title_prefix**: Apenas tarefas cujo título começa com o valor.
+    - **q**: Busca textual no título e na descrição.
+    - **created_after** / **created_before**: Intervalo da data de criação.
+    - **sort**: `id`, `created_at` ou `title`; prefixo `-` para ordem decrescente.
+
+    Suporta GET condicional com `If-None-Match` (ETag): se a página não
+    mudou a resposta é um 304 sem corpo. A listagem não usa Last-Modified:
+    exclusões e inserções mudam a página sem alterar nenhum `updated_at`.
+    """
+    # Tuplas de colunas codificadas direto com orjson: o `response_model` fica
+    # apenas para o schema do OpenAPI, sem validar item por item
+    rows = await async_crud.get_task_rows(
+        db, skip=skip, limit=limit, after=after, filters=filters, sort=sort
+    )
+    etag = list_etag(rows)
+    headers = conditional_headers(etag)
+    cursor = next_cursor(rows, limit, sort)
+    if cursor is not None:
+        headers["X-Next-Cursor"] = cursor
+    if is_not_modified(request.headers, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return task_list_response(rows, headers=headers)
+
+
+@router.get("/batch", response_model=schemas.TaskBatch)
+async def read_tasks_batch(
+    ids: str,
+    db: AsyncSession = Depends(get_async_read_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Retorna várias tarefas em uma requisição (ver `GET /tasks/batch` síncrono).
+    """
+    return await async_crud.get_tasks_batch(db, ids=ids)
+
+
+@router.get("/{task_id:int}", response_model=schemas.Task)
+async def read_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Retorna os detalhes de uma tarefa específica.
+
+    Envia o header `ETag`; com `If-None-Match` igual ao ETag atual a resposta
+    é um 304 sem corpo.
+    """
+    db_task = await async_crud.get_task_cached(db, task_id=task_id)
+    etag = task_etag(db_task)
+    if is_not_modified(request.headers, etag, db_task.updated_at):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=conditional_headers(etag, db_task.updated_at)
+        )
+    response.headers.update(conditional_headers(etag, db_task.updated_at))
+    return db_task
+
+
+@router.put("/{task_id:int}", response_model=schemas.Task)
+async def update_task(
+    task_id: int,
+    task: schemas.TaskCreate,
+    db: AsyncSession = Depends(get_async_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Atualiza o título e a descrição de uma tarefa existente.
+    """
+    return await async_crud.update_task(db, task_id=task_id, task=task)
+
+
+@router.delete("/{task_id:int}", response_model=schemas.Task)
+async def delete_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _ = Depends(dependencies.verify_token)
+):
+    """
+    Exclui uma tarefa específica.
+    """
+    return await async_crud.delete_task(db, task_id=task_id)
@@ -12,5 +12,75 @@ class Task(BaseModel):
     title: str
     description: str | None = None
     created_at: datetime
+    updated_at: datetime | None = None
+    version: int = 1
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# Esquemas para a criação em lote de tarefas
+class TaskBulkError(BaseModel):
+    index: int
+    detail: str
+
+class TaskBulkResult(BaseModel):
+    created: int
+    ids: list[int]
+    errors: list[TaskBulkError] = []
+
+
+# Esquema com o estado do pool de conexões de um worker
+class PoolStatus(BaseModel):
+    pid: int
+    pool_class: str
+    size: int | None = None
+    max_overflow: int | None = None
+    checked_out: int | None = None
+    checked_in: int | None = None
+    overflow: int | None = None
+    checkouts: int | None = None
+    timeouts: int | None = None
+    wait_total_ms: float | None = None
+    wait_avg_ms: float | None = None
+    wait_max_ms: float | None = None
+
+
+# Esquema com os contadores do cache de leitura
+class CacheStatus(BaseModel):
+    backend: str
+    entries: int | None = None
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    # Leituras que aguardaram uma consulta idêntica em andamento (single-flight)
+    coalesced: int = 0
+
+
+# Filtros das listagens de tarefas (parâmetros de consulta de GET /tasks/)
+class TaskFilter(BaseModel):
+    title_prefix: str | None = None
+    q: str | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+
+
+# Esquemas para atualização e exclusão em lote: os alvos são uma lista de
+# IDs ou um filtro (um dos dois)
+class TaskBulkDelete(BaseModel):
+    ids: list[int] | None = None
+    filter: TaskFilter | None = None
+
+class TaskBulkUpdate(TaskBulkDelete):
+    title: str | None = None
+    description: str | None = None
+
+class TaskBulkChangeResult(BaseModel):
+    affected: int
+    ids: list[int]
+    missing_ids: list[int] = []
+
+
+# Resposta de GET /tasks/batch: tarefas na ordem pedida e IDs inexistentes
+class TaskBatch(BaseModel):
+    tasks: list[Task]
+    missing_ids: list[int]
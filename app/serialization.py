@@ -0,0 +1,37 @@
+"""
+Serialização rápida das listagens de tarefas.
+
+As linhas (tuplas com as colunas de `crud.TASK_COLUMNS`) são codificadas
+direto em JSON pelo orjson, sem instanciar objetos do ORM nem validar cada
+item com o Pydantic. O JSON gerado é o mesmo de `schemas.Task` (datas em
+ISO 8601, UTC como "Z"), e as rotas mantêm `response_model` para que o
+schema do OpenAPI não mude.
+"""
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+from . import schemas
+
+TASK_FIELDS = tuple(schemas.Task.model_fields)
+
+
+def task_rows_to_dicts(rows) -> list[dict]:
+    return [dict(zip(TASK_FIELDS, row)) for row in rows]
+
+
+class FastJSONResponse(JSONResponse):
+    """Resposta JSON codificada com orjson."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def task_list_response(rows, headers: dict | None = None) -> FastJSONResponse:
+    """Resposta com a página de tarefas, sem passar pela validação do response_model."""
+    return FastJSONResponse(task_rows_to_dicts(rows), headers=headers)
+
+
+def idempotent_response(body: str, replayed: bool) -> Response:
+    """Resposta 201 com o JSON guardado da tarefa criada (ver `crud.create_task_idempotent`)."""
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return Response(content=body, status_code=201, media_type="application/json", headers=headers)
@@ -0,0 +1,90 @@
+"""
+Ponto de entrada de produção: uvicorn com vários workers.
+
+    python -m app.serve
+    python -m app.serve --workers 4 --port 8000
+
+Os workers são processos novos (spawn) que importam `app.main` cada um: o
+engine, o pool de conexões e as threads de log/chaves são criados dentro do
+worker, e não herdados do processo principal. Este módulo não importa a
+aplicação por esse motivo. Para servidores que fazem fork após importar a
+aplicação (ex.: gunicorn com --preload), `app.database` descarta as conexões
+herdadas no processo filho.
+
+Cada worker tem o seu pool: o total de conexões com o banco é
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+"""
+import argparse
+import importlib.util
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def default_workers() -> int:
+    """CPUs disponíveis para o processo (respeita a afinidade, ex.: em contêineres)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0")) or default_workers()
+# Segundos que uma conexão keep-alive ociosa fica aberta
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+# Conexões aguardando accept() na fila do socket
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+# Tempo para concluir as requisições em andamento ao receber SIGTERM
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+SERVER_ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG", "false").lower() in ("1", "true", "yes", "on")
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options(workers: int = WEB_CONCURRENCY, host: str = HOST, port: int = PORT) -> dict:
+    """Argumentos de `uvicorn.run` para o perfil de produção."""
+    return {
+        "host": host,
+        "port": port,
+        "workers": workers,
+        "loop": "uvloop" if _available("uvloop") else "asyncio",
+        "http": "httptools" if _available("httptools") else "h11",
+        "timeout_keep_alive": SERVER_KEEPALIVE,
+        "backlog": SERVER_BACKLOG,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_TIMEOUT,
+        "access_log": SERVER_ACCESS_LOG,
+        "proxy_headers": True,
+    }
+
+
+def prepare_metrics_dir(workers: int):
+    """
+    Com mais de um worker, as métricas do Prometheus precisam de um diretório
+    compartilhado; cria um temporário se PROMETHEUS_MULTIPROC_DIR não estiver
+    definido. A variável é herdada pelos workers.
+    """
+    if workers > 1 and not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="tasksynchub-metrics-")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de produção do TaskSyncHub")
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    prepare_metrics_dir(args.workers)
+    uvicorn.run("app.main:app", **server_options(args.workers, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
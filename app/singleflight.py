@@ -0,0 +1,100 @@
+"""
+Coalescência de leituras idênticas em andamento (single-flight).
+
+Enquanto uma chamada para uma chave está em andamento, as demais chamadas
+com a mesma chave esperam por ela e recebem o mesmo resultado (ou a mesma
+exceção) em vez de repetir a consulta. Vale apenas dentro do processo; o
+resultado não é guardado depois que a chamada termina (isso é papel do cache).
+
+O resultado é compartilhado entre requisições: deve ser um valor que não
+dependa da sessão de quem o buscou (ex.: um `schemas.Task`, não um
+`models.Task`).
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Versão para as rotas síncronas (threads do threadpool)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class _LeaderCancelled(Exception):
+    """A requisição que fazia a consulta foi cancelada: quem esperava tenta de novo."""
+
+
+class AsyncSingleFlight:
+    """Versão para as rotas `async def` (um único event loop)."""
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn):
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                # shield: o cancelamento de quem espera não cancela a consulta
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        # Evita o aviso de exceção não lida quando ninguém estava esperando
+        future.add_done_callback(lambda f: f.exception())
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
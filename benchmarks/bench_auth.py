@@ -0,0 +1,72 @@
+"""
+Mede o custo da autenticação por requisição: a comparação direta com um
+token único (implementação anterior) vs. a busca no KeyStore com N chaves,
+e a latência de uma rota mínima com e sem a dependência `verify_token`.
+
+    python -m benchmarks.bench_auth --keys 1,100,10000
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("STATIC_API_TOKEN", "bench-token")
+
+from benchmarks.common import measure  # noqa: E402
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import dependencies  # noqa: E402
+from app.keystore import KeyStore, hash_key, key_store  # noqa: E402
+
+
+def ns_per_call(fn, calls: int) -> float:
+    started = time.perf_counter_ns()
+    for _ in range(calls):
+        fn()
+    return round((time.perf_counter_ns() - started) / calls, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", default="1,100,10000")
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    token = os.environ["STATIC_API_TOKEN"]
+    report = {"verify_ns_per_call": {"plain_compare": ns_per_call(lambda: token != "bench-token", args.calls)}}
+    for size in (int(value) for value in args.keys.split(",")):
+        keys = {hash_key(f"key-{i}"): f"client-{i}" for i in range(size)}
+        store = KeyStore([lambda keys=keys: keys])
+        store.reload()
+        report["verify_ns_per_call"][f"keystore_{size}_keys_valid"] = ns_per_call(
+            lambda: store.verify("key-0"), args.calls
+        )
+        report["verify_ns_per_call"][f"keystore_{size}_keys_invalid"] = ns_per_call(
+            lambda: store.verify("wrong-key"), args.calls
+        )
+
+    app = FastAPI()
+
+    @app.get("/open")
+    def open_route():
+        return {}
+
+    @app.get("/auth")
+    def auth_route(_=Depends(dependencies.verify_token)):
+        return {}
+
+    key_store.reload()  # carrega as chaves antes da medição
+    client = TestClient(app)
+    headers = {"token": token}
+    report["request_latency"] = {
+        "without_auth": measure(lambda: client.get("/open", headers=headers), args.requests),
+        "with_verify_token": measure(lambda: client.get("/auth", headers=headers), args.requests),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Leituras de painel: N chamadas de `get_task` vs. um `get_tasks_batch`, e
+consultas ao banco com leituras simultâneas da mesma tarefa (single-flight).
+O cache de leitura fica desativado para que toda leitura chegue ao banco.
+
+    python -m benchmarks.bench_batch_reads --url sqlite:///bench.db --ids 50 --threads 32
+"""
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import DEFAULT_URL, make_session, measure, seed_tasks
+from app import cache, crud
+from app.singleflight import SingleFlight
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+class NoFlight:
+    """Sem single-flight: cada chamada vai direto ao banco."""
+    def do(self, key, fn):
+        return fn()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--ids", type=int, default=50, help="tarefas por tela do painel")
+    parser.add_argument("--threads", type=int, default=32, help="leituras simultâneas da mesma tarefa")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    crud.task_cache = cache.NullCache()
+    db = make_session(args.url)
+    seed_tasks(db, max(args.ids, 1000))
+    engine = db.get_bind()
+    Session = sessionmaker(bind=engine)
+    ids = list(range(1, args.ids + 1))
+    ids_param = ",".join(map(str, ids))
+    counter = QueryCounter(engine)
+
+    def per_id():
+        for task_id in ids:
+            crud.get_task_cached(db, task_id)
+
+    def batch():
+        crud.get_tasks_batch(db, ids_param)
+
+    report = {}
+    for name, fn in (("per_id", per_id), ("batch", batch)):
+        counter.count = 0
+        result = measure(fn, args.repeat)
+        result["queries_per_screen"] = counter.count / args.repeat
+        report[name] = result
+
+    def hot_read(_):
+        with Session() as session:
+            crud.get_task_cached(session, 1)
+
+    for name, flight in (("hot_key_without_single_flight", NoFlight()), ("hot_key_with_single_flight", SingleFlight())):
+        crud.task_flight = flight
+        counter.count = 0
+        with ThreadPoolExecutor(args.threads) as pool:
+            list(pool.map(hot_read, range(args.threads)))
+        report[name] = {"reads": args.threads, "queries": counter.count}
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
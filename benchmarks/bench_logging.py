@@ -0,0 +1,87 @@
+"""
+Mede a latência (p50/p95/p99) de GET /tasks/{task_id} com o logging
+desativado, com os handlers gravando na thread da requisição (`direct`) e
+com a fila QueueHandler/QueueListener (`queued`). Metade das requisições
+pede uma tarefa inexistente, o que registra um ERROR com traceback.
+
+Use `--stall-ms` para simular um disco lento em cada gravação do arquivo.
+
+    python -m benchmarks.bench_logging --url sqlite:///bench.db --requests 5000 --stall-ms 2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = ("disabled", "direct", "queued")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///./bench.db")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--stall-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # O pacote `app` lê as variáveis ao ser importado
+    os.environ["DATABASE_URL"] = args.url
+    os.environ.setdefault("STATIC_API_TOKEN", "bench")
+
+    import logging
+
+    from fastapi.testclient import TestClient
+
+    from benchmarks.common import make_session, seed_tasks
+    from app import logging_config
+    from app.main import app
+
+    db = make_session(args.url)
+    seed_tasks(db, 1000)
+    db.close()
+
+    if args.stall_ms:
+        emit = logging_config.BatchedRotatingFileHandler.emit
+
+        def slow_emit(self, record):
+            time.sleep(args.stall_ms / 1000)
+            emit(self, record)
+
+        logging_config.BatchedRotatingFileHandler.emit = slow_emit
+
+    client = TestClient(app)
+    headers = {"token": os.environ["STATIC_API_TOKEN"]}
+    paths = [f"/tasks/{i % 1000 + 1}" if i % 2 else f"/tasks/{10_000_000 + i}" for i in range(args.requests)]
+
+    def timed_get(path):
+        started = time.perf_counter()
+        client.get(path, headers=headers)
+        return (time.perf_counter() - started) * 1000
+
+    report = {}
+    stdout = sys.stdout
+    for mode in MODES:
+        # O console do logger vai para /dev/null durante a medição
+        sys.stdout = open(os.devnull, "w")
+        try:
+            logging_config.setup_logging(queued=(mode == "queued"))
+            logging.getLogger("app").disabled = mode == "disabled"
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                samples = sorted(pool.map(timed_get, paths))
+            logging_config.stop_logging()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        report[mode] = {
+            "p50_ms": round(samples[len(samples) // 2], 3),
+            "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+            "p99_ms": round(samples[int(len(samples) * 0.99) - 1], 3),
+            "max_ms": round(samples[-1], 3),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
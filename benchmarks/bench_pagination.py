@@ -0,0 +1,55 @@
+"""
+Compara a latência de páginas profundas entre a paginação por deslocamento
+(`skip`) e a paginação por cursor (`after`) à medida que a tabela cresce.
+
+    python -m benchmarks.bench_pagination --url sqlite:///bench.db --sizes 10000,100000,1000000
+"""
+import argparse
+import json
+
+from benchmarks.common import DEFAULT_URL, make_session, measure, seed_tasks
+
+from sqlalchemy import select
+
+from app import crud, models
+from app.pagination import encode_cursor
+
+
+def run(url: str, sizes: list[int], limit: int, repeat: int) -> list[dict]:
+    db = make_session(url)
+    results = []
+    for size in sorted(sizes):
+        seed_tasks(db, size)
+        # Última página completa da tabela, o pior caso para o OFFSET
+        skip = size - limit
+        last_id = db.execute(
+            select(models.Task.id).order_by(models.Task.id).offset(skip - 1).limit(1)
+        ).scalar_one()
+        cursor = encode_cursor(last_id)
+
+        offset = measure(lambda: crud.get_tasks(db, skip=skip, limit=limit), repeat)
+        keyset = measure(lambda: crud.get_tasks(db, limit=limit, after=cursor), repeat)
+        db.expunge_all()
+        results.append({"rows": size, "offset": offset, "keyset": keyset})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(args.url, sizes, args.limit, args.repeat)
+
+    print(f"{'linhas':>10} {'offset p50 (ms)':>16} {'cursor p50 (ms)':>16}")
+    for result in results:
+        print(f"{result['rows']:>10} {result['offset']['p50_ms']:>16} {result['keyset']['p50_ms']:>16}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compara, por página de 1000 linhas, o caminho padrão de GET /tasks/
+(objetos do ORM validados por `response_model=list[schemas.Task]` e
+codificados com json) com o caminho rápido (tuplas de colunas codificadas
+direto com orjson).
+
+    python -m benchmarks.bench_serialization --url sqlite:///bench.db --rows 1000
+"""
+import argparse
+import json
+
+from benchmarks.common import DEFAULT_URL, make_session, measure, seed_tasks
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app import crud, models, schemas
+from app.serialization import FastJSONResponse, task_rows_to_dicts
+
+TASK_LIST = TypeAdapter(list[schemas.Task])
+
+
+def pydantic_serialize(tasks) -> bytes:
+    """O que o FastAPI faz com o response_model: valida, converte e codifica."""
+    validated = TASK_LIST.validate_python(tasks, from_attributes=True)
+    content = TASK_LIST.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def orjson_serialize(rows) -> bytes:
+    return FastJSONResponse(None).render(task_rows_to_dicts(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db = make_session(args.url)
+    seed_tasks(db, args.rows)
+
+    def load_objects():
+        db.expunge_all()
+        return db.execute(select(models.Task).limit(args.rows)).scalars().all()
+
+    def load_rows():
+        return db.execute(select(*crud.TASK_COLUMNS).limit(args.rows)).all()
+
+    objects, rows = load_objects(), load_rows()
+    assert json.loads(pydantic_serialize(objects)) == json.loads(orjson_serialize(rows))
+
+    report = {
+        "rows": args.rows,
+        "query": {
+            "orm_objects": measure(load_objects, args.repeat),
+            "column_tuples": measure(load_rows, args.repeat),
+        },
+        "serialize": {
+            "pydantic_response_model": measure(lambda: pydantic_serialize(objects), args.repeat),
+            "orjson_rows": measure(lambda: orjson_serialize(rows), args.repeat),
+        },
+        "query_and_serialize": {
+            "orm_and_pydantic": measure(lambda: pydantic_serialize(load_objects()), args.repeat),
+            "rows_and_orjson": measure(lambda: orjson_serialize(load_rows()), args.repeat),
+        },
+    }
+    db.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
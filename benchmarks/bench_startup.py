@@ -0,0 +1,85 @@
+"""
+Tempo de inicialização: importação de `app.main` (medida com
+`python -X importtime`) e tempo até a primeira resposta do servidor.
+
+    python -m benchmarks.bench_startup --url sqlite:///bench.db --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import DEFAULT_URL
+
+
+def import_profile(url: str) -> tuple[float, list[tuple[str, float]]]:
+    """
+    Importa `app.main` em um processo novo com `-X importtime`. Retorna o
+    tempo acumulado da importação (ms) e os módulos de maior tempo próprio.
+    """
+    env = dict(os.environ, DATABASE_URL=url)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue  # cabeçalho
+        modules.append((name, int(self_us) / 1000))
+        if name == "app.main":
+            total = int(cumulative_us) / 1000
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return total, modules
+
+
+def time_to_first_request(url: str, port: int, timeout: float = 60.0) -> float:
+    """Milissegundos entre iniciar o uvicorn e a primeira resposta de `/`."""
+    env = dict(os.environ, DATABASE_URL=url)
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    return (time.perf_counter() - started) * 1000
+            except httpx.TransportError:
+                time.sleep(0.01)
+        raise RuntimeError("Servidor não respondeu")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="módulos mais lentos listados")
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    imports = [import_profile(args.url) for _ in range(args.repeat)]
+    first_request = [time_to_first_request(args.url, args.port) for _ in range(args.repeat)]
+
+    print(json.dumps({
+        "import_app_main_ms": round(statistics.median(total for total, _ in imports), 1),
+        "time_to_first_request_ms": round(statistics.median(first_request), 1),
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in imports[-1][1][:args.top]},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Os scripts deste diretório são executados manualmente (não fazem parte da
+suíte do pytest), por exemplo:
+
+    python -m benchmarks.bench_pagination --url sqlite:///bench.db
+"""
+import os
+import statistics
+import time
+
+DEFAULT_URL = "sqlite:///./bench.db"
+
+# O pacote `app` lê DATABASE_URL ao ser importado
+os.environ.setdefault("DATABASE_URL", DEFAULT_URL)
+
+from sqlalchemy import create_engine, func, insert, select, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import models  # noqa: E402
+
+
+def make_session(url: str):
+    """Cria o schema (se necessário) e devolve uma sessão ligada a `url`."""
+    engine = create_engine(url)
+    models.Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+# Geração das linhas no próprio banco (INSERT ... SELECT), sem enviá-las
+# pela conexão: semear 10^7 tarefas leva minutos em vez de horas
+SEED_SQL = {
+    "postgresql": (
+        "INSERT INTO tasks (title, description) "
+        "SELECT 'Tarefa ' || n, 'Descrição da tarefa ' || n FROM generate_series(:start, :stop) AS n"
+    ),
+    "sqlite": (
+        "WITH RECURSIVE seq(n) AS (SELECT :start UNION ALL SELECT n + 1 FROM seq WHERE n < :stop) "
+        "INSERT INTO tasks (title, description) "
+        "SELECT 'Tarefa ' || n, 'Descrição da tarefa ' || n FROM seq"
+    ),
+}
+
+
+def seed_tasks(db, total: int, chunk: int = 5000) -> int:
+    """
+    Completa a tabela de tarefas até `total` linhas. Retorna o total final.
+    """
+    current = db.execute(select(func.count(models.Task.id))).scalar_one()
+    seed_sql = SEED_SQL.get(db.get_bind().dialect.name)
+    if seed_sql is not None:
+        chunk = max(chunk, 100000)
+    while current < total:
+        size = min(chunk, total - current)
+        if seed_sql is not None:
+            db.execute(text(seed_sql), {"start": current, "stop": current + size - 1})
+        else:
+            rows = [
+                {"title": f"Tarefa {current + i}", "description": f"Descrição da tarefa {current + i}"}
+                for i in range(size)
+            ]
+            db.execute(insert(models.Task), rows)
+        db.commit()
+        current += size
+    return current
+
+
+def measure(fn, repeat: int = 20) -> dict:
+    """Executa `fn` `repeat` vezes e retorna as latências em milissegundos."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "p99_ms": round(samples[int(len(samples) * 0.99) - 1], 3),
+        "max_ms": round(samples[-1], 3),
+    }
@@ -0,0 +1,131 @@
+"""
+Latência de clientes bem-comportados com um cliente abusivo, com e sem os
+limites de taxa e de concorrência.
+
+Um cliente "guloso" dispara leituras sem pausa com muitas conexões, enquanto
+vários clientes comportados fazem poucas requisições por segundo, cada um com
+o seu token. Para cada cenário imprime p50/p99 e os status recebidos:
+
+    python -m benchmarks.loadtest_rate_limit --duration 15 --greedy 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from app.keystore import hash_key
+from benchmarks.common import DEFAULT_URL, make_session, seed_tasks
+from benchmarks.loadtest_db_modes import wait_ready
+
+GREEDY_TOKEN = "loadtest-greedy"
+
+
+def polite_token(n: int) -> str:
+    return f"loadtest-polite-{n}"
+
+
+def start_server(url: str, port: int, keys_file: str, limits: dict) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=url, API_KEYS_FILE=keys_file, **limits)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def drive(base_url: str, duration: float, greedy: int, polite: int,
+                polite_rate: float, seeded: int) -> dict:
+    stop_at = time.monotonic() + duration
+    latencies = []
+    statuses = {"greedy": Counter(), "polite": Counter()}
+
+    async def request(client: httpx.AsyncClient, token: str, n: int, kind: str):
+        started = time.perf_counter()
+        try:
+            response = await client.get(f"/tasks/{n % seeded + 1}", headers={"token": token})
+            statuses[kind][response.status_code] += 1
+        except httpx.TransportError:
+            statuses[kind]["error"] += 1
+        return (time.perf_counter() - started) * 1000
+
+    async def greedy_worker(worker_id: int, client: httpx.AsyncClient):
+        n = worker_id
+        while time.monotonic() < stop_at:
+            n += greedy
+            await request(client, GREEDY_TOKEN, n, "greedy")
+
+    async def polite_worker(worker_id: int, client: httpx.AsyncClient):
+        n = worker_id
+        while time.monotonic() < stop_at:
+            n += polite
+            latencies.append(await request(client, polite_token(worker_id), n, "polite"))
+            await asyncio.sleep(1 / polite_rate)
+
+    limits = httpx.Limits(max_connections=greedy + polite)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await asyncio.gather(
+            *(greedy_worker(i, client) for i in range(greedy)),
+            *(polite_worker(i, client) for i in range(polite)),
+        )
+
+    latencies.sort()
+    return {
+        "polite_p50_ms": round(statistics.median(latencies), 3),
+        "polite_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "polite_status": {str(k): v for k, v in statuses["polite"].items()},
+        "greedy_status": {str(k): v for k, v in statuses["greedy"].items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--greedy", type=int, default=64, help="conexões do cliente guloso")
+    parser.add_argument("--polite", type=int, default=10, help="clientes comportados")
+    parser.add_argument("--polite-rate", type=float, default=5, help="req/s de cada cliente comportado")
+    parser.add_argument("--rate", type=float, default=20, help="RATE_LIMIT_PER_SECOND do cenário limitado")
+    parser.add_argument("--max-concurrent", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    seeded = seed_tasks(make_session(args.url), args.rows)
+    tokens = [GREEDY_TOKEN] + [polite_token(i) for i in range(args.polite)]
+    scenarios = {
+        "unlimited": {},
+        "limited": {
+            "RATE_LIMIT_PER_SECOND": str(args.rate),
+            "MAX_CONCURRENT_REQUESTS": str(args.max_concurrent),
+        },
+    }
+
+    results = {}
+    with tempfile.NamedTemporaryFile("w", suffix=".keys") as keys_file:
+        keys_file.write("".join(f"{token}:{hash_key(token)}\n" for token in tokens))
+        keys_file.flush()
+        for name, limits in scenarios.items():
+            server = start_server(args.url, args.port, keys_file.name, limits)
+            try:
+                base_url = f"http://127.0.0.1:{args.port}"
+                asyncio.run(wait_ready(base_url))
+                results[name] = asyncio.run(drive(
+                    base_url, args.duration, args.greedy, args.polite, args.polite_rate, seeded
+                ))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
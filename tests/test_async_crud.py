@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import pytest
+
+from fastapi import status, HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime
+
+from app.models import Task
+from app.schemas import TaskCreate
+from app import async_crud
+from app.cache import MemoryCache
+
+
+@pytest.fixture
+def mock_async_session():
+    """Fixture que fornece uma sessão assíncrona mockada do banco de dados"""
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.expunge = MagicMock()
+    session.info = {}
+    # Dialeto sem RETURNING: update/delete buscam a tarefa antes de alterá-la
+    session.bind = MagicMock()
+    session.bind.dialect.update_returning = False
+    session.bind.dialect.delete_returning = False
+    return session
+
+def test_create_task_success(mock_async_session):
+    """Testa a criação assíncrona de uma tarefa"""
+    task_data = TaskCreate(title="  Tarefa Async  ", description=None)
+
+    result = asyncio.run(async_crud.create_task(mock_async_session, task_data))
+
+    assert result.title == "Tarefa Async"
+    mock_async_session.add.assert_called_once()
+    mock_async_session.commit.assert_awaited_once()
+    mock_async_session.refresh.assert_awaited_once_with(result)
+
+def test_create_task_database_error(mock_async_session):
+    """Testa o rollback quando o commit assíncrono falha"""
+    mock_async_session.commit.side_effect = SQLAlchemyError("Erro de banco de dados")
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(async_crud.create_task(mock_async_session, TaskCreate(title="Tarefa")))
+
+    assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    mock_async_session.rollback.assert_awaited_once()
+
+def test_get_task_not_found(mock_async_session):
+    """Testa o 404 quando a tarefa não existe"""
+    mock_async_session.get.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(async_crud.get_task(mock_async_session, 999))
+
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+    assert "Tarefa com ID 999 não encontrada" in str(exc_info.value.detail)
+
+def test_update_task_success(mock_async_session):
+    """Testa a atualização assíncrona de uma tarefa existente"""
+    existing_task = Task(id=1, title="Antigo", description="Antiga", created_at=datetime.now())
+    mock_async_session.get.return_value = existing_task
+
+    result = asyncio.run(
+        async_crud.update_task(mock_async_session, 1, TaskCreate(title=" Novo ", description="Nova"))
+    )
+
+    assert result.title == "Novo"
+    assert result.description == "Nova"
+    mock_async_session.commit.assert_awaited_once()
+
+def test_delete_task_success(mock_async_session):
+    """Testa a exclusão assíncrona de uma tarefa"""
+    task_to_delete = Task(id=1, title="Apagar", description=None)
+    mock_async_session.get.return_value = task_to_delete
+
+    result = asyncio.run(async_crud.delete_task(mock_async_session, 1))
+
+    assert result.id == 1
+    mock_async_session.delete.assert_awaited_once_with(task_to_delete)
+    mock_async_session.commit.assert_awaited_once()
+
+def test_update_task_with_returning(mock_async_session):
+    """Testa a atualização assíncrona em um único UPDATE ... RETURNING"""
+    mock_async_session.bind.dialect.update_returning = True
+    updated = Task(id=1, title="Novo", description=None, version=2)
+    mock_async_session.execute.return_value = MagicMock()
+    mock_async_session.execute.return_value.scalar_one_or_none.return_value = updated
+
+    result = asyncio.run(async_crud.update_task(mock_async_session, 1, TaskCreate(title="Novo")))
+
+    assert result is updated
+    mock_async_session.get.assert_not_awaited()
+    mock_async_session.refresh.assert_not_awaited()
+    mock_async_session.commit.assert_awaited_once()
+
+
+def test_blocking_cache_runs_off_the_event_loop(mock_async_session, monkeypatch):
+    """Testa que um cache de rede (como o Redis) é acessado fora da thread do event loop"""
+    threads = set()
+
+    class NetworkCache(MemoryCache):
+        blocking = True
+
+        def get(self, key):
+            threads.add(threading.get_ident())
+            return super().get(key)
+
+        def set(self, key, value):
+            threads.add(threading.get_ident())
+            super().set(key, value)
+
+    monkeypatch.setattr(async_crud, "task_cache", NetworkCache())
+    mock_async_session.get.return_value = Task(
+        id=1, title="Tarefa", description=None, created_at=datetime.now(), version=1
+    )
+
+    async def read_twice():
+        await async_crud.get_task_cached(mock_async_session, 1)
+        await async_crud.get_task_cached(mock_async_session, 1)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(read_twice())
+
+    assert threads and loop_thread not in threads
+    mock_async_session.get.assert_awaited_once()
@@ -0,0 +1,161 @@
+import pytest
+
+from unittest.mock import MagicMock
+from datetime import datetime
+
+from app import crud
+from app.cache import MemoryCache, RedisCache, task_key
+from app.models import Task
+from app.schemas import TaskCreate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Dublê local com a mesma interface usada de um cliente Redis"""
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+
+    def register_script(self, script):
+        # Equivalente em Python do script de `RedisCache.fill`
+        def fill(keys, args):
+            generation_key, key = keys
+            if self.data.get(generation_key, b"0") != str(args[0]).encode():
+                return 0
+            self.set(key, args[1], ex=args[2])
+            return 1
+        return fill
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """Substitui o cache global por um cache em memória isolado"""
+    cache = MemoryCache(max_entries=10, ttl=60)
+    monkeypatch.setattr(crud, "task_cache", cache)
+    return cache
+
+def test_memory_cache_expires_entries():
+    """Testa a expiração por TTL"""
+    clock = FakeClock()
+    cache = MemoryCache(max_entries=10, ttl=5, clock=clock)
+    cache.set("a", "1")
+
+    assert cache.get("a") == "1"
+    clock.now = 6
+    assert cache.get("a") is None
+    assert cache.stats.snapshot()["evictions"] == 1
+
+def test_memory_cache_evicts_least_recently_used():
+    """Testa a remoção LRU ao atingir o limite de entradas"""
+    cache = MemoryCache(max_entries=2, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats.snapshot() == {"hits": 2, "misses": 1, "evictions": 1, "invalidations": 0}
+
+def test_redis_cache_with_fake_client():
+    """Testa o backend Redis com um cliente falso"""
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=60)
+    cache.set("a", "valor")
+
+    assert cache.get("a") == "valor"
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.stats.snapshot()["misses"] == 1
+
+def test_fill_is_discarded_after_concurrent_invalidation():
+    """Testa que uma leitura anterior a uma escrita não repovoa o cache"""
+    cache = MemoryCache()
+    generation = cache.generation()
+    cache.invalidate("a")
+    cache.fill("a", "antigo", generation)
+
+    assert cache.get("a") is None
+
+def test_redis_fill_is_discarded_after_invalidation_in_another_worker():
+    """Testa que a geração é compartilhada entre workers pelo Redis"""
+    client = FakeRedis()
+    reader, writer = RedisCache(client), RedisCache(client)
+    generation = reader.generation()
+    writer.invalidate("a")
+    reader.fill("a", "antigo", generation)
+
+    assert reader.get("a") is None
+    reader.fill("a", "novo", reader.generation())
+    assert writer.get("a") == "novo"
+
+def test_get_task_cached_reads_database_once(memory_cache):
+    """Testa que a segunda leitura é servida pelo cache"""
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = Task(
+        id=1, title="Tarefa", description=None, created_at=datetime.now(), version=1
+    )
+
+    first = crud.get_task_cached(db, 1)
+    second = crud.get_task_cached(db, 1)
+
+    assert first == second
+    db.query.assert_called_once()
+
+def test_update_task_invalidates_cache(memory_cache):
+    """Testa que a atualização remove a entrada do cache"""
+    memory_cache.set(task_key(1), "{}")
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = Task(
+        id=1, title="Antigo", description=None
+    )
+
+    crud.update_task(db, 1, TaskCreate(title="Novo"))
+
+    assert memory_cache.get(task_key(1)) is None
+
+def test_get_tasks_batch_reads_misses_in_one_query(memory_cache):
+    """Testa que o lote usa o cache e busca as faltas em uma única consulta"""
+    memory_cache.set(task_key(1), crud.schemas.Task(
+        id=1, title="Em cache", description=None, created_at=datetime.now(), version=1
+    ).model_dump_json())
+    db = MagicMock()
+    db.execute.return_value.scalars.return_value = [
+        Task(id=2, title="Do banco", description=None, created_at=datetime.now(), version=1)
+    ]
+
+    batch = crud.get_tasks_batch(db, ids="2,1,3,2")
+
+    assert [task.id for task in batch.tasks] == [2, 1]
+    assert batch.missing_ids == [3]
+    db.execute.assert_called_once()
+    assert memory_cache.get(task_key(2)) is not None
+
+def test_redis_cache_get_many_uses_mget():
+    """Testa a leitura de várias chaves com um único MGET"""
+    cache = RedisCache(FakeRedis())
+    cache.set("a", "1")
+
+    assert cache.get_many(["a", "b"]) == ["1", None]
+    assert cache.stats.snapshot()["hits"] == 1
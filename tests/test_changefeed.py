@@ -0,0 +1,114 @@
+import asyncio
+import signal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import changefeed, crud, schemas
+from app.changefeed import ChangeFeed
+from app.migrate import migrate
+
+
+def change(event_id: str, task_id: int) -> dict:
+    return {"id": event_id, "type": "updated", "task_id": task_id}
+
+
+async def read(stream, count: int) -> list[bytes]:
+    return [await asyncio.wait_for(stream.__anext__(), 1) for _ in range(count)]
+
+
+def test_subscribers_receive_events_and_resume_from_last_event_id():
+    """Testa a entrega aos assinantes, a retomada pelo Last-Event-ID e o reset quando o evento saiu do buffer"""
+    async def scenario():
+        feed = ChangeFeed(backlog=3, heartbeat=60)
+        feed.start()
+        live = feed.subscribe()
+        assert await read(live, 1) == [b"retry: 3000\n\n"]
+
+        waiting = asyncio.ensure_future(live.__anext__())
+        await asyncio.sleep(0)
+        feed.append([change("a-1", 1), change("a-2", 2)])
+        message = await asyncio.wait_for(waiting, 1)
+        assert message == b'id: a-1\ndata: {"type":"updated","task_id":1}\n\nid: a-2\ndata: {"type":"updated","task_id":2}\n\n'
+
+        resumed = feed.subscribe("a-1")
+        assert (await read(resumed, 2))[1] == b'id: a-2\ndata: {"type":"updated","task_id":2}\n\n'
+
+        feed.append([change("a-3", 3), change("a-4", 4), change("a-5", 5)])
+        assert (await read(feed.subscribe("a-1"), 2))[1] == changefeed.RESET
+
+        await feed.stop()
+        await live.aclose()
+        await resumed.aclose()
+        return feed.subscribers
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_heartbeat_sends_keepalive_to_idle_subscribers():
+    """Testa o keep-alive periódico sem eventos novos"""
+    async def scenario():
+        feed = ChangeFeed(heartbeat=0.01)
+        feed.start()
+        stream = feed.subscribe()
+        messages = await read(stream, 2)
+        await feed.stop()
+        await stream.aclose()
+        return messages[1]
+
+    assert asyncio.run(scenario()) == changefeed.KEEPALIVE
+
+
+def test_shutdown_signal_ends_open_streams_before_lifespan_shutdown():
+    """Testa que SIGTERM encerra os streams e repassa o sinal ao handler anterior (o do servidor)"""
+    received = []
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+    original_int = signal.getsignal(signal.SIGINT)
+
+    async def scenario():
+        feed = ChangeFeed(heartbeat=60)
+        feed.start()
+        feed.close_on_shutdown_signal()
+        stream = feed.subscribe()
+        await read(stream, 1)
+        waiting = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+        try:
+            await asyncio.wait_for(waiting, 1)
+        except StopAsyncIteration:
+            ended = True
+        else:
+            ended = False
+        await feed.stop()
+        return ended
+
+    try:
+        assert asyncio.run(scenario()) is True
+    finally:
+        signal.signal(signal.SIGTERM, original)
+        signal.signal(signal.SIGINT, original_int)
+    assert received == [signal.SIGTERM]
+
+
+def test_events_are_published_only_after_commit(monkeypatch):
+    """Testa que as escritas do crud publicam eventos na confirmação e não no rollback"""
+    engine = create_engine("sqlite://")
+    migrate(engine)
+    published = []
+
+    class RecordingFeed:
+        def publish(self, changes):
+            published.extend((item["type"], item["task_id"]) for item in changes)
+
+    monkeypatch.setattr(changefeed, "change_feed", RecordingFeed())
+    with sessionmaker(bind=engine)() as db:
+        task = crud.create_task(db, schemas.TaskCreate(title="Tarefa"))
+        crud.update_task(db, task.id, schemas.TaskCreate(title="Alterada"))
+        db.begin()
+        changefeed.record(db, "deleted", [task.id])
+        db.rollback()
+        crud.delete_task(db, task.id)
+
+    assert published == [("created", task.id), ("updated", task.id), ("deleted", task.id)]
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import dependencies
+from app.database import Base
+from app.models import Task
+from app.replicas import get_read_db
+from app.routers import todos
+from app.etag import etag_matches, http_date, is_not_modified, list_etag, not_modified_since, task_etag
+
+
+def make_task(task_id=1, version=1, title="Tarefa"):
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return SimpleNamespace(
+        id=task_id, title=title, description=None, version=version, created_at=created, updated_at=created
+    )
+
+def test_etag_changes_with_version():
+    """Testa que o ETag muda quando a versão da tarefa muda"""
+    assert task_etag(make_task(version=1)) == task_etag(make_task(version=1))
+    assert task_etag(make_task(version=1)) != task_etag(make_task(version=2))
+
+def test_etag_changes_when_reused_id_gets_new_content():
+    """Testa que uma tarefa recriada com o mesmo id, versão e data tem outro ETag"""
+    assert task_etag(make_task(title="Excluída")) != task_etag(make_task(title="Recriada"))
+
+def test_list_etag_changes_when_page_changes():
+    """Testa que o ETag da lista muda ao incluir ou alterar uma tarefa"""
+    page = [make_task(1), make_task(2)]
+
+    assert list_etag(page) != list_etag(page + [make_task(3)])
+    assert list_etag(page) != list_etag([make_task(1), make_task(2, version=2)])
+
+def test_etag_matches_header_lists_and_weak_tags():
+    """Testa a comparação com If-None-Match (listas, W/ e *)"""
+    etag = task_etag(make_task())
+
+    assert etag_matches(f'"outro", {etag}', etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"outro"', etag)
+    assert not etag_matches(None, etag)
+
+def test_if_modified_since():
+    """Testa If-Modified-Since e a precedência do If-None-Match"""
+    task = make_task()
+    since = http_date(task.updated_at)
+
+    assert not_modified_since(since, task.updated_at)
+    assert not not_modified_since("Mon, 01 Jan 2018 00:00:00 GMT", task.updated_at)
+    assert not not_modified_since("data inválida", task.updated_at)
+    headers = {"if-none-match": '"outro"', "if-modified-since": since}
+    assert not is_not_modified(headers, task_etag(task), task.updated_at)
+
+
+def test_list_is_modified_after_delete_even_with_if_modified_since(tmp_path):
+    """Testa que a listagem não responde 304 por If-Modified-Since depois de uma exclusão"""
+    engine = create_engine(f"sqlite:///{tmp_path}/tasks.db")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([Task(title=f"Tarefa {i}") for i in (1, 2, 3)])
+        db.commit()
+
+    def read_db():
+        with Session() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(todos.router)
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[dependencies.verify_token] = lambda: None
+    client = TestClient(app)
+
+    first = client.get("/tasks/", params={"limit": 2})
+    assert "Last-Modified" not in first.headers
+    etag = first.headers["ETag"]
+    assert client.get("/tasks/", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 304
+
+    with Session() as db:
+        db.query(Task).filter(Task.id == 1).delete()
+        db.commit()
+
+    since = http_date(datetime.now(timezone.utc))
+    response = client.get("/tasks/", params={"limit": 2}, headers={"If-Modified-Since": since})
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == [2, 3]
+    assert client.get("/tasks/", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 200
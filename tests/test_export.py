@@ -0,0 +1,41 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app import export
+
+ROWS = [
+    (1, "Primeira", None, datetime(2024, 1, 1, 12, 0), datetime(2024, 1, 1, 12, 0), 1),
+    (2, "Com, vírgula", 'aspas "duplas"', datetime(2024, 1, 2, 8, 30), None, 3),
+]
+
+
+def test_ndjson_chunks_one_object_per_line():
+    body = b"".join(export.ndjson_chunks(iter(ROWS), chunk_rows=1))
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert [line["id"] for line in lines] == [1, 2]
+    assert lines[0]["created_at"] == "2024-01-01T12:00:00"
+    assert lines[1]["title"] == "Com, vírgula"
+    assert lines[1]["updated_at"] is None
+
+
+def test_csv_chunks_with_header_and_quoting():
+    chunks = list(export.csv_chunks(iter(ROWS), chunk_rows=1))
+    assert len(chunks) == 2
+    reader = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert reader[0] == list(export.EXPORT_FIELDS)
+    assert reader[2][1:3] == ["Com, vírgula", 'aspas "duplas"']
+
+
+def test_export_stream_gzip_and_closes_session():
+    db = MagicMock()
+    iter_rows = MagicMock(return_value=iter(ROWS))
+
+    body = b"".join(export.export_stream(lambda: db, iter_rows, "ndjson", 5, True))
+
+    iter_rows.assert_called_once_with(db, after_id=5)
+    assert len(gzip.decompress(body).splitlines()) == 2
+    db.close.assert_called_once()
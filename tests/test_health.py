@@ -0,0 +1,70 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app import database, health
+from app.health import HealthMonitor
+from app.migrate import migrate
+
+
+def test_readiness_uses_cached_check_and_expires(monkeypatch):
+    """Testa que a prontidão vem da última verificação e expira se ela não for renovada"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    migrate(engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    now = [100.0]
+    monitor = HealthMonitor(interval=5, timeout=2, clock=lambda: now[0])
+
+    assert monitor.readiness()[0] is False  # ainda não verificado
+    asyncio.run(monitor.check_once())
+    ready, body = monitor.readiness()
+
+    assert ready is True
+    assert body["database"]["ok"] is True
+    assert body["migrations"] == {"state": "up_to_date", "pending": [], "error": None}
+    assert body["pools"]["sync"]["pool_class"] == "StaticPool"
+
+    now[0] += 60
+    assert monitor.readiness()[0] is False
+
+
+def test_readiness_reports_database_failure_and_pending_migrations(monkeypatch):
+    """Testa o estado não pronto com o banco indisponível e com migrações pendentes"""
+    monkeypatch.setattr(database, "get_engine", lambda: create_engine("sqlite:////nonexistent/dir/db.sqlite"))
+    monitor = HealthMonitor()
+    asyncio.run(monitor.check_once())
+    ready, body = monitor.readiness()
+    assert ready is False
+    assert body["database"]["error"] == "OperationalError"
+
+    empty = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    monkeypatch.setattr(database, "get_engine", lambda: empty)
+    asyncio.run(monitor.check_once())
+    ready, body = monitor.readiness()
+    assert ready is False
+    assert "create table tasks" in body["migrations"]["pending"]
+
+
+def test_readiness_reports_unknown_migrations_and_retries(monkeypatch):
+    """Testa que uma falha ao verificar as migrações deixa o estado desconhecido até a próxima verificação"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    migrate(engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+
+    def failing_pending():
+        raise RuntimeError("falha")
+
+    monkeypatch.setattr(health.migrate, "pending", failing_pending)
+    monitor = HealthMonitor()
+    asyncio.run(monitor.check_once())
+    ready, body = monitor.readiness()
+
+    assert ready is False
+    assert body["migrations"] == {"state": "unknown", "pending": None, "error": "RuntimeError"}
+
+    monkeypatch.setattr(health.migrate, "pending", lambda: [])
+    asyncio.run(monitor.check_once())
+    ready, body = monitor.readiness()
+    assert ready is True
+    assert body["migrations"]["state"] == "up_to_date"
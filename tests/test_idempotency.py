@@ -0,0 +1,76 @@
+import json
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.migrate import migrate
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/idempotency.db", connect_args={"check_same_thread": False})
+    migrate(engine)
+    return sessionmaker(bind=engine)
+
+
+def count_tasks(make_session) -> int:
+    with make_session() as db:
+        return db.scalar(select(func.count()).select_from(models.Task))
+
+
+def test_replay_returns_original_response_without_creating_task(make_session):
+    """Testa a repetição com a mesma chave, a chave com outro corpo e a mesma chave de outro cliente"""
+    task = schemas.TaskCreate(title="Pagar conta")
+    with make_session() as db:
+        body, replayed = crud.create_task_idempotent(db, task, "key-1", "token:a")
+    assert replayed is False
+
+    with make_session() as db:
+        assert crud.create_task_idempotent(db, task, "key-1", "token:a") == (body, True)
+        with pytest.raises(HTTPException) as exc:
+            crud.create_task_idempotent(db, schemas.TaskCreate(title="Outra"), "key-1", "token:a")
+        assert exc.value.status_code == 422
+        other_body, replayed = crud.create_task_idempotent(db, task, "key-1", "token:b")
+
+    assert replayed is False
+    assert json.loads(other_body)["id"] != json.loads(body)["id"]
+    assert count_tasks(make_session) == 2
+
+
+def test_concurrent_duplicates_create_a_single_task(make_session):
+    """Testa que requisições simultâneas com a mesma chave criam uma única tarefa"""
+    task = schemas.TaskCreate(title="Enviar relatório")
+    barrier = threading.Barrier(8)
+    results = []
+
+    def post():
+        barrier.wait()
+        with make_session() as db:
+            results.append(crud.create_task_idempotent(db, task, "retry", "token:a"))
+
+    threads = [threading.Thread(target=post) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({body for body, _ in results}) == 1
+    assert [replayed for _, replayed in results].count(False) == 1
+    assert count_tasks(make_session) == 1
+
+
+def test_expired_key_can_be_used_again(make_session, monkeypatch):
+    """Testa que uma chave expirada cria uma nova tarefa"""
+    task = schemas.TaskCreate(title="Backup")
+    monkeypatch.setattr(crud, "IDEMPOTENCY_TTL_SECONDS", -1)
+    with make_session() as db:
+        first, _ = crud.create_task_idempotent(db, task, "key", "token:a")
+    with make_session() as db:
+        second, replayed = crud.create_task_idempotent(db, task, "key", "token:a")
+
+    assert replayed is False
+    assert json.loads(first)["id"] != json.loads(second)["id"]
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import dependencies
+from app.keystore import KeyStore, hash_key, load_keys_file
+
+
+def test_key_store_accepts_rotated_keys_without_restart():
+    """Testa a troca das chaves aceitas ao recarregar as fontes"""
+    current = {hash_key("chave-1"): "cliente-a"}
+    store = KeyStore([lambda: dict(current)], static_token="legado")
+    store.reload()
+
+    assert store.lookup("chave-1") == "cliente-a"
+    assert store.lookup("legado") == "static"
+    assert not store.verify("chave-2")
+
+    current.clear()
+    current[hash_key("chave-2")] = "cliente-b"
+    store.reload()
+
+    assert not store.verify("chave-1")
+    assert store.lookup("chave-2") == "cliente-b"
+
+
+def test_key_store_keeps_previous_keys_when_source_fails():
+    """Testa que uma falha no recarregamento mantém as chaves atuais"""
+    calls = []
+
+    def source():
+        calls.append(1)
+        if len(calls) > 1:
+            raise OSError("arquivo indisponível")
+        return {hash_key("chave"): "cliente"}
+
+    store = KeyStore([source])
+    assert store.reload() is True
+    assert store.reload() is False
+    assert store.verify("chave")
+    assert not store.verify("")
+
+
+def test_key_store_rejects_tokens_until_loaded():
+    """Testa que a verificação não carrega as fontes por conta própria"""
+    calls = []
+    store = KeyStore([lambda: calls.append(1) or {hash_key("chave"): "cliente"}])
+
+    assert not store.loaded
+    assert store.lookup("chave") is None
+    assert calls == []
+
+    store.reload()
+    assert store.lookup("chave") == "cliente"
+
+
+def test_verify_token_returns_503_before_keys_are_loaded(monkeypatch):
+    """Testa a resposta 503 enquanto as chaves ainda não foram carregadas"""
+    store = KeyStore([lambda: {hash_key("chave"): "cliente"}])
+    monkeypatch.setattr(dependencies, "key_store", store)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(dependencies.verify_token("chave"))
+    assert exc_info.value.status_code == 503
+
+    store.reload()
+    asyncio.run(dependencies.verify_token("chave"))
+
+
+def test_load_keys_file(tmp_path):
+    """Testa a leitura do arquivo de chaves e a rejeição de hashes inválidos"""
+    keys_file = tmp_path / "keys.txt"
+    keys_file.write_text(f"# comentário\n\nci:{hash_key('a')}\n{hash_key('b').upper()}\n")
+
+    assert load_keys_file(str(keys_file)) == {hash_key("a"): "ci", hash_key("b"): "line-4"}
+
+    keys_file.write_text("ci:texto-puro\n")
+    with pytest.raises(ValueError):
+        load_keys_file(str(keys_file))
+
+
+def test_failed_first_load_keeps_store_unloaded(monkeypatch):
+    """Testa que uma falha na primeira carga resulta em 503, e não em 401, até uma carga bem-sucedida"""
+    available = []
+
+    def source():
+        if not available:
+            raise OSError("banco indisponível")
+        return {hash_key("chave"): "cliente"}
+
+    store = KeyStore([source], static_token="legado")
+    monkeypatch.setattr(dependencies, "key_store", store)
+
+    assert store.reload() is False
+    assert not store.loaded
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(dependencies.verify_token("legado"))
+    assert exc_info.value.status_code == 503
+
+    available.append(True)
+    assert store.reload() is True
+    asyncio.run(dependencies.verify_token("legado"))
+    assert store.lookup("chave") == "cliente"
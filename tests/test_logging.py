@@ -0,0 +1,165 @@
+import io
+import logging
+import queue
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+from app.logging_config import (
+    BatchedStreamHandler, BatchingQueueListener, BoundedQueueHandler, SamplingFilter, log_failure
+)
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("app", logging.ERROR, __file__, 1, message, None, None)
+
+
+def test_queue_handler_drops_when_full_and_reports():
+    """Testa a política drop: registros excedentes são descartados e contados"""
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, policy="drop")
+
+    for i in range(5):
+        handler.emit(make_record(f"registro {i}"))
+
+    assert handler.dropped == 3
+    log_queue.get_nowait()
+    log_queue.get_nowait()
+    handler.emit(make_record("depois"))
+    summary = log_queue.get_nowait()
+    assert summary.getMessage() == "Dropped 3 log records (queue full)"
+
+
+def test_queue_handler_does_not_format_on_caller_thread():
+    """Testa que o traceback é formatado apenas pelo listener"""
+    log_queue = queue.Queue()
+    handler = BoundedQueueHandler(log_queue)
+    try:
+        raise ValueError("falha")
+    except ValueError:
+        record = logging.LogRecord("app", logging.ERROR, __file__, 1, "erro", None, sys.exc_info())
+
+    handler.emit(record)
+
+    queued = log_queue.get_nowait()
+    assert queued.exc_info is not None
+    assert queued.exc_text is None
+
+
+def test_listener_flushes_once_per_batch():
+    """Testa que o listener grava o lote inteiro e faz um único flush"""
+    stream = io.StringIO()
+    flushes = []
+    target = BatchedStreamHandler(stream)
+    stream.flush = lambda: flushes.append(stream.getvalue().count("\n"))
+    log_queue = queue.Queue()
+    for i in range(10):
+        log_queue.put_nowait(make_record(f"registro {i}"))
+
+    listener = BatchingQueueListener(log_queue, target, batch_size=100)
+    listener.start()
+    listener.stop()
+
+    assert stream.getvalue().count("\n") == 10
+    assert flushes[0] == 10
+
+
+def test_sampling_one_in_n_with_suppressed_count():
+    """Testa a amostragem 1 a cada N por chave de mensagem"""
+    sampling = SamplingFilter({"app:Failed to get task": {"every": 3}})
+
+    passed = [sampling.filter(make_record("Failed to get task")) for _ in range(4)]
+    other = sampling.filter(make_record("Outra mensagem"))
+
+    assert passed == [True, False, False, True]
+    assert other is True
+
+
+def test_sampling_per_second_reports_suppressed():
+    """Testa o limite por segundo e o resumo dos registros suprimidos"""
+    now = [0.0]
+    sampling = SamplingFilter({"app": {"per_second": 2}}, clock=lambda: now[0])
+
+    passed = [sampling.filter(make_record("erro")) for _ in range(5)]
+    now[0] = 1.0
+    record = make_record("erro")
+
+    assert passed == [True, True, False, False, False]
+    assert sampling.filter(record) is True
+    assert record.suppressed == 3
+    assert "[3 similar messages suppressed]" in record.getMessage()
+
+
+def test_sampling_rejects_invalid_rules():
+    """Testa a rejeição de regras que quebrariam o filtro ao registrar"""
+    for rule in ({"every": 0.5}, {"every": 0}, {"every": True}, {"per_second": 0}, {"per_second": False}):
+        with pytest.raises(ValueError):
+            SamplingFilter({"app": rule})
+
+
+def test_sampling_evicts_least_recently_used_keys(monkeypatch):
+    """Testa que o limite de chaves descarta a mais antiga sem zerar as demais"""
+    monkeypatch.setattr(SamplingFilter, "MAX_KEYS", 2)
+    sampling = SamplingFilter({"app": {"every": 2}})
+
+    assert sampling.filter(make_record("a")) is True
+    assert sampling.filter(make_record("b")) is True
+    assert sampling.filter(make_record("a")) is False
+    assert sampling.filter(make_record("c")) is True  # descarta "b"
+
+    assert list(sampling._states) == ["app:a", "app:c"]
+    assert sampling.filter(make_record("a")) is True
+    assert sampling.filter(make_record("a")) is False
+
+
+def test_log_failure_skips_traceback_for_client_errors(caplog):
+    """Testa que erros 4xx viram WARNING sem traceback e 5xx mantêm o traceback"""
+    logger = logging.getLogger("app")
+
+    try:
+        raise HTTPException(status_code=404, detail="Tarefa com ID 9 não encontrada")
+    except HTTPException as e:
+        log_failure(logger, "Failed to get task", e)
+    try:
+        raise HTTPException(status_code=500, detail="Erro")
+    except HTTPException as e:
+        log_failure(logger, "Failed to get task", e)
+
+    expected, unexpected = caplog.records[-2:]
+    assert expected.levelno == logging.WARNING
+    assert expected.exc_info is None
+    assert expected.log_key == "Failed to get task"
+    assert unexpected.levelno == logging.ERROR
+    assert unexpected.exc_info is not None
+
+
+def test_listener_survives_handler_failures():
+    """Testa que uma falha no flush não encerra o listener nem trava a fila"""
+    stream = io.StringIO()
+    errors = []
+    failures = [OSError("disco cheio")]
+
+    class FailingHandler(BatchedStreamHandler):
+        def flush(self):
+            if not self.batching and failures:
+                raise failures.pop()
+            super().flush()
+
+        def handleError(self, record):
+            errors.append(record)
+
+    target = FailingHandler(stream)
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, policy="block")
+    listener = BatchingQueueListener(log_queue, target, batch_size=1)
+    listener.start()
+
+    for i in range(10):
+        handler.emit(make_record(f"registro {i}"))
+    log_queue.join()
+
+    assert listener._thread.is_alive()
+    listener.stop()
+    assert len(errors) == 1
+    assert stream.getvalue().count("\n") == 10
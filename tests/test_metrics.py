@@ -0,0 +1,47 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app import metrics
+from app.querystats import instrument_engine, track_queries
+
+
+def test_track_queries_counts_statements_in_block():
+    """Testa a contagem de comandos SQL apenas dentro do bloco monitorado"""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    instrument_engine(engine)  # registrar duas vezes não duplica a contagem
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+    assert stats.count == 2
+    assert stats.seconds > 0
+
+
+def test_middleware_labels_requests_by_route_template():
+    """Testa que as métricas usam o template da rota e não o caminho bruto"""
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    def sample(name, **labels):
+        return metrics.REGISTRY.get_sample_value(name, labels) or 0
+
+    before = sample("http_requests_total", method="GET", route="/items/{item_id}", status="200")
+    unmatched = sample("http_requests_total", method="GET", route=metrics.UNMATCHED_ROUTE, status="404")
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/outra/rota")
+
+    assert sample("http_requests_total", method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert sample("http_requests_total", method="GET", route=metrics.UNMATCHED_ROUTE, status="404") == unmatched + 1
+    assert sample("http_requests_in_progress", method="GET") == 0
@@ -0,0 +1,57 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrate import migrate
+
+
+def test_migrate_creates_missing_schema_once():
+    """Testa a criação do schema em um banco vazio e que a segunda execução não altera nada"""
+    engine = create_engine("sqlite://")
+
+    applied = migrate(engine)
+
+    assert "create table tasks" in applied
+    assert "create table api_keys" in applied
+    assert migrate(engine) == []
+
+
+def test_migrate_upgrades_existing_tasks_table():
+    """Testa a inclusão de colunas, índices e da busca textual em uma tabela antiga"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR(100) NOT NULL, "
+            "description TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        conn.execute(text("INSERT INTO tasks (title, description) VALUES ('antiga', 'linha existente')"))
+
+    applied = migrate(engine)
+
+    assert "add column tasks.updated_at" in applied
+    assert "add column tasks.version" in applied
+    assert "create index ix_tasks_title_id" in applied
+    inspector = inspect(engine)
+    assert {"updated_at", "version"} <= {c["name"] for c in inspector.get_columns("tasks")}
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT updated_at, version FROM tasks")).one()
+        found = conn.execute(text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'existente'")).all()
+    assert row.updated_at is not None and row.version == 1
+    assert len(found) == 1
+
+
+def test_migrated_sqlite_table_fills_expression_defaults_on_insert():
+    """Testa que linhas inseridas fora do ORM após a migração recebem updated_at"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR(100) NOT NULL, "
+            "description TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        ))
+
+    applied = migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO tasks (title) VALUES ('nova')"))
+        row = conn.execute(text("SELECT updated_at, version FROM tasks")).one()
+
+    assert "create trigger tasks_updated_at_default" in applied
+    assert row.updated_at is not None and row.version == 1
+    assert migrate(engine) == []
@@ -0,0 +1,84 @@
+import logging
+
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.profiling import ProfileStats, ProfilingMiddleware, explain
+from app.querystats import QueryStats, instrument_engine, track_queries
+
+
+def make_engine():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    instrument_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    return engine
+
+
+def test_profile_detects_repeated_and_slow_queries(caplog):
+    """Testa a detecção de comandos repetidos (N+1) e o EXPLAIN de comandos lentos"""
+    engine = make_engine()
+    stats = ProfileStats(slow_ms=0)
+
+    with caplog.at_level(logging.WARNING, logger="app.profiling"):
+        with engine.connect() as conn, track_queries(QueryStats()) as outer, track_queries(stats):
+            for item_id in range(6):
+                conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+
+    assert stats.count == outer.count == 6
+    assert stats.repeated(threshold=5) == {"SELECT name FROM items WHERE id = ?": 6}
+    assert stats.slowest_statement == "SELECT name FROM items WHERE id = ?"
+    slow = [record for record in caplog.records if record.getMessage() == "Slow query"]
+    assert "USING INTEGER PRIMARY KEY" in slow[0].plan
+
+
+def test_failed_explain_is_rolled_back_to_savepoint_on_postgres():
+    """Testa que um EXPLAIN com erro no PostgreSQL não deixa a transação da requisição abortada"""
+    executed = []
+
+    class Cursor:
+        def execute(self, sql, parameters=None):
+            executed.append(sql)
+            if sql.startswith("EXPLAIN"):
+                raise RuntimeError("parâmetros incompatíveis")
+
+        def close(self):
+            pass
+
+    conn = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        in_transaction=lambda: True,
+        connection=SimpleNamespace(cursor=Cursor),
+    )
+
+    assert explain(conn, "SELECT 1", ()) is None
+    assert executed == [
+        "SAVEPOINT profiling_explain",
+        "EXPLAIN SELECT 1",
+        "ROLLBACK TO SAVEPOINT profiling_explain",
+        "RELEASE SAVEPOINT profiling_explain",
+    ]
+
+
+def test_middleware_adds_profile_header():
+    """Testa o header com a contagem e o tempo dos comandos da requisição"""
+    engine = make_engine()
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/items")
+    def read_items():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT * FROM items"))
+            conn.execute(text("SELECT count(*) FROM items"))
+        return []
+
+    response = TestClient(app).get("/items")
+
+    assert response.headers["x-db-profile"].startswith("statements=2; db_ms=")
@@ -0,0 +1,86 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.ratelimit import MemoryRateLimiter, RateLimitMiddleware
+
+
+def test_memory_limiter_refills_bucket_over_time():
+    """Testa o consumo e a reposição das fichas do balde"""
+    now = [0.0]
+    limiter = MemoryRateLimiter(rate=2, burst=2, clock=lambda: now[0])
+
+    assert asyncio.run(limiter.hit("a")) == 0
+    assert asyncio.run(limiter.hit("a")) == 0
+    assert asyncio.run(limiter.hit("a")) == 0.5
+    assert asyncio.run(limiter.hit("b")) == 0  # cada chave tem o seu balde
+
+    now[0] = 0.5
+    assert asyncio.run(limiter.hit("a")) == 0
+
+
+def test_memory_limiter_bounds_buckets_evicting_least_recently_used(monkeypatch):
+    """Testa que chaves novas além do limite descartam o balde usado há mais tempo"""
+    monkeypatch.setattr(MemoryRateLimiter, "MAX_KEYS", 3)
+    limiter = MemoryRateLimiter(rate=1, burst=1, clock=lambda: 0.0)
+
+    for key in ("a", "b", "c"):
+        asyncio.run(limiter.hit(key))
+    assert asyncio.run(limiter.hit("a")) == 1.0  # "a" passa a ser o mais recente
+    asyncio.run(limiter.hit("d"))
+    assert list(limiter._buckets) == ["c", "a", "d"]
+
+    for i in range(100):
+        asyncio.run(limiter.hit(f"aleatorio-{i}"))
+    assert len(limiter._buckets) == 3
+
+
+def test_middleware_limits_each_token_separately():
+    """Testa a resposta 429 com Retry-After apenas para o token que excedeu o limite"""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=MemoryRateLimiter(rate=1, burst=1), max_concurrent=0)
+
+    @app.get("/items")
+    def read_items():
+        return []
+
+    client = TestClient(app)
+    assert client.get("/items", headers={"token": "a"}).status_code == 200
+
+    response = client.get("/items", headers={"token": "a"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/items", headers={"token": "b"}).status_code == 200
+
+
+def test_middleware_sheds_requests_over_concurrency_limit():
+    """Testa a resposta 503 quando não há vaga dentro do tempo de espera"""
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = RateLimitMiddleware(slow_app, max_concurrent=1, queue_timeout=0.05)
+    scope = {"type": "http", "path": "/items", "method": "GET", "headers": []}
+
+    async def call():
+        statuses = []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await middleware(scope, None, send)
+        return statuses[0]
+
+    async def scenario():
+        first = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        shed = await call()
+        release.set()
+        return await first, shed
+
+    assert asyncio.run(scenario()) == (200, 503)
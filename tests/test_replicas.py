@@ -0,0 +1,102 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, database, replicas
+from app.cache import MemoryCache
+from app.replicas import Replica, ReplicaSet, ReplicaStickinessMiddleware, get_read_db
+
+
+def make_replicas(tmp_path, clock, **options):
+    """Duas réplicas SQLite (arquivos separados) já verificadas"""
+    members = [Replica(f"sqlite:///{tmp_path}/replica{i}.db", max_lag=5, is_async=False) for i in (1, 2)]
+    replica_set = ReplicaSet(members, max_lag=5, check_interval=2, clock=clock, **options)
+    replica_set.refresh()
+    return replica_set
+
+
+def test_round_robin_and_least_connections(tmp_path):
+    """Testa o rodízio entre as réplicas e a escolha da réplica com menos conexões em uso"""
+    replica_set = make_replicas(tmp_path, clock=lambda: 0.0)
+    first, second = replica_set.replicas
+    assert [replica_set.choose() for _ in range(4)] == [first, second, first, second]
+
+    replica_set.selection = "least_connections"
+    with first.engine.connect():
+        assert replica_set.choose() is second
+        assert replica_set.choose() is second
+    assert replica_set.choose(primary=True) is None
+    assert replica_set.primary_reads == 1
+
+
+def test_lagging_or_stale_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    """Testa que réplicas atrasadas ou sem medição recente ficam fora do rodízio"""
+    now = [0.0]
+    replica_set = make_replicas(tmp_path, clock=lambda: now[0])
+    first, second = replica_set.replicas
+
+    monkeypatch.setattr(first, "measure_lag", lambda: 10.0)
+    replica_set.refresh()
+    assert {replica_set.choose() for _ in range(3)} == {second}
+
+    monkeypatch.setattr(second, "measure_lag", lambda: 10.0)
+    replica_set.refresh()
+    assert replica_set.choose() is None
+
+    monkeypatch.undo()
+    replica_set.refresh()
+    assert replica_set.choose() is not None
+    now[0] += 60  # a verificação parou de rodar
+    assert replica_set.choose() is None
+    assert replica_set.status()["replicas"][0]["available"] is False
+
+
+def test_write_pins_client_reads_to_primary(tmp_path, monkeypatch):
+    """Testa a leitura no primário logo após uma escrita do mesmo cliente"""
+    now = [0.0]
+    replica_set = make_replicas(tmp_path, clock=lambda: now[0], sticky_seconds=5)
+    primary = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path}/primary.db"))
+    monkeypatch.setattr(replicas, "_replica_set", replica_set)
+    monkeypatch.setattr(database, "get_session_factory", lambda: primary)
+
+    app = FastAPI()
+    app.add_middleware(ReplicaStickinessMiddleware, replica_set=replica_set)
+
+    @app.get("/source")
+    def read_source(db=Depends(get_read_db)):
+        return db.get_bind().url.database.rsplit("/", 1)[-1]
+
+    @app.post("/write")
+    def write():
+        return {}
+
+    client = TestClient(app)
+    assert client.get("/source").json().startswith("replica")
+
+    response = client.post("/write")
+    assert replicas.STICKY_COOKIE in response.cookies
+    assert client.get("/source").json() == "primary.db"
+    # Outro cliente continua lendo nas réplicas
+    assert TestClient(app).get("/source", headers={"token": "other"}).json().startswith("replica")
+
+    # Janela encerrada: o cookie expirou no cliente e o prazo passou no worker
+    now[0] += 6
+    client.cookies.clear()
+    assert client.get("/source").json().startswith("replica")
+
+
+def test_replica_reads_do_not_fill_cache_right_after_invalidation(tmp_path, monkeypatch):
+    """Testa que uma leitura na réplica não grava no cache um valor possivelmente anterior à escrita"""
+    replica = Replica(f"sqlite:///{tmp_path}/replica.db", max_lag=5, is_async=False)
+    monkeypatch.setattr(crud, "task_cache", MemoryCache(max_entries=10, ttl=60))
+    with replica.session_factory() as db:
+        crud.task_cache.invalidate(crud.task_key(1))
+        assert crud.can_fill_cache(db) is False
+        crud.task_cache.invalidated_at -= 10
+        assert crud.can_fill_cache(db) is True
+
+    primary = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path}/primary.db"))
+    with primary() as db:
+        crud.task_cache.invalidate(crud.task_key(1))
+        assert crud.can_fill_cache(db) is True
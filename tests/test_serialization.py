@@ -0,0 +1,29 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from app import schemas
+from app.serialization import task_list_response
+
+
+def test_fast_serialization_matches_response_model():
+    """Testa que o JSON do caminho rápido é igual ao de schemas.Task"""
+    rows = [
+        (1, "Título com \"aspas\" e acentuação", None,
+         datetime(2024, 1, 1, 12, 0, 0, 400000), None, 1),
+        (2, "UTC", "descrição", datetime(2024, 1, 2, tzinfo=timezone.utc),
+         datetime(2024, 1, 3, 1, 2, 3, tzinfo=timezone(timedelta(hours=-3))), 4),
+    ]
+    expected = [
+        schemas.Task(
+            id=row[0], title=row[1], description=row[2], created_at=row[3],
+            updated_at=row[4], version=row[5]
+        ).model_dump(mode="json")
+        for row in rows
+    ]
+
+    response = task_list_response(rows, headers={"ETag": '"abc"'})
+
+    assert json.loads(response.body) == expected
+    assert b'"2024-01-02T00:00:00Z"' in response.body
+    assert response.headers["etag"] == '"abc"'
+    assert response.media_type == "application/json"
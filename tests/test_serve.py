@@ -0,0 +1,55 @@
+import logging
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import database, logging_config, serve
+
+
+def test_server_options_fall_back_without_optional_packages(monkeypatch):
+    """Testa o uso do asyncio/h11 quando uvloop e httptools não estão instalados"""
+    monkeypatch.setattr(serve, "_available", lambda module: False)
+
+    options = serve.server_options(workers=3, port=9000)
+
+    assert options["workers"] == 3
+    assert options["port"] == 9000
+    assert (options["loop"], options["http"]) == ("asyncio", "h11")
+
+
+@pytest.fixture
+def queued_logging(tmp_path, monkeypatch):
+    """Liga o listener de logs gravando em tmp_path e restaura o logger `app` no fim"""
+    logger = logging.getLogger("app")
+    handlers, filters, level = list(logger.handlers), list(logger.filters), logger.level
+    monkeypatch.chdir(tmp_path)
+    logging_config.setup_logging()
+    yield
+    logging_config.stop_logging()
+    for handler in logger.handlers:
+        if handler not in handlers:
+            handler.close()
+    logger.handlers[:], logger.filters[:] = handlers, filters
+    logger.setLevel(level)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requer os.fork")
+def test_forked_child_gets_fresh_pool_and_log_listener(tmp_path, monkeypatch, queued_logging):
+    """Testa que o processo filho não reutiliza conexões do pai e recria o listener de logs"""
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    # O hook de fork descarta o pool do engine global do módulo
+    monkeypatch.setattr(database, "_engine", engine)
+    with database.get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert database.get_engine().pool.checkedin() > 0
+
+    pid = os.fork()
+    if pid == 0:
+        listener = logging_config._listener
+        ok = database.get_engine().pool.checkedin() == 0 and listener._thread.is_alive()
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    engine.dispose()
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import time
+
+from app.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """Testa que chamadas simultâneas com a mesma chave executam a função uma vez"""
+    flight = SingleFlight()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return "tarefa"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("task:1", load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["tarefa"] * 8
+    assert len(calls) == 1
+    assert flight.coalesced == 7
+
+
+def test_async_waiter_retries_when_leader_is_cancelled():
+    """Testa que quem espera refaz a consulta se a requisição líder for cancelada"""
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("task:1", load))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("task:1", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(scenario()) == 2
+    assert len(calls) == 2
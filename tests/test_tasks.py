@@ -2,6 +2,7 @@ import os, sys
 import pytest
 
 from fastapi import status, HTTPException
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from unittest.mock import MagicMock
 from datetime import datetime
@@ -10,8 +11,12 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.models import Task
-from app.schemas import TaskCreate
-from app.crud import create_task, get_tasks, get_task, update_task, delete_task
+from app.schemas import TaskBulkDelete, TaskBulkUpdate, TaskCreate, TaskFilter
+from app.crud import (
+    apply_task_filters, create_task, create_tasks, get_tasks, get_task, update_task, delete_task,
+    update_tasks, delete_tasks
+)
+from app.pagination import decode_sort_cursor, encode_cursor, next_cursor
 
 @pytest.fixture
 def mock_db_session():
@@ -20,6 +25,9 @@ def mock_db_session():
     session.commit = MagicMock()
     session.refresh = MagicMock()
     session.rollback = MagicMock()
+    # Dialeto sem RETURNING: update/delete buscam a tarefa antes de alterá-la
+    session.get_bind.return_value.dialect.update_returning = False
+    session.get_bind.return_value.dialect.delete_returning = False
     return session
 
 def test_create_task_success(mock_db_session):
@@ -145,6 +153,85 @@ def test_get_tasks_with_invalid_limit(mock_db_session):
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
     assert "O parâmetro 'limit' deve estar entre 1 e 1000" in str(exc_info.value.detail)
     mock_db_session.query.assert_not_called()
+
+
+def test_get_tasks_with_cursor(mock_db_session):
+    """Testa a paginação por cursor (WHERE id > :cursor)"""
+    # Arrange
+    mock_tasks = [
+        Task(id=11, title="Tarefa 11", description=None, created_at=datetime.now()),
+        Task(id=12, title="Tarefa 12", description=None, created_at=datetime.now())
+    ]
+    (mock_db_session.query.return_value
+     .filter.return_value
+     .order_by.return_value
+     .limit.return_value
+     .all.return_value) = mock_tasks
+
+    # Act
+    result = get_tasks(db=mock_db_session, limit=2, after=encode_cursor(10))
+
+    # Assert
+    assert [task.id for task in result] == [11, 12]
+    assert next_cursor(result, limit=2) == encode_cursor(12)
+    mock_db_session.query.return_value.offset.assert_not_called()
+
+
+def test_get_tasks_with_invalid_cursor(mock_db_session):
+    """Testa a rejeição de um cursor malformado"""
+    with pytest.raises(HTTPException) as exc_info:
+        get_tasks(db=mock_db_session, after="não-é-um-cursor")
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Cursor de paginação inválido" in str(exc_info.value.detail)
+    mock_db_session.query.assert_not_called()
+    
+    
+def test_get_tasks_with_invalid_sort(mock_db_session):
+    """Testa a rejeição de um campo de ordenação desconhecido"""
+    with pytest.raises(HTTPException) as exc_info:
+        get_tasks(db=mock_db_session, sort="description")
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    assert "O parâmetro 'sort'" in str(exc_info.value.detail)
+    mock_db_session.query.assert_not_called()
+
+
+def test_task_filters_use_index_friendly_predicates():
+    """Testa que o prefixo do título vira um intervalo e a busca usa o FTS5 no SQLite"""
+    filters = TaskFilter(title_prefix="Rel", q="orçamento")
+
+    query = apply_task_filters(select(Task.id), filters, "sqlite")
+    sql = str(query.compile(compile_kwargs={"literal_binds": True}))
+
+    assert "tasks.title >= 'Rel'" in sql
+    assert "tasks.title < 'Rem'" in sql
+    assert "tasks_fts MATCH" in sql
+
+
+def test_title_prefix_filter_on_postgres_and_edge_prefixes():
+    """Testa o LIKE sem intervalo no PostgreSQL e prefixos sem próximo code point"""
+    sql = str(apply_task_filters(select(Task.id), TaskFilter(title_prefix="a-"), "postgresql")
+              .compile(compile_kwargs={"literal_binds": True}))
+    assert "LIKE 'a-' || '%'" in sql
+    assert "<" not in sql
+
+    last = chr(0x10FFFF)
+    sql = str(apply_task_filters(select(Task.id), TaskFilter(title_prefix="a" + last), "sqlite")
+              .compile(compile_kwargs={"literal_binds": True}))
+    assert "tasks.title < 'b'" in sql
+    query = apply_task_filters(select(Task.id), TaskFilter(title_prefix=last), "sqlite")
+    assert "<" not in str(query.compile(compile_kwargs={"literal_binds": True}))
+
+
+def test_sort_cursor_round_trip():
+    """Testa o cursor de uma listagem ordenada por data de criação"""
+    created = datetime(2024, 5, 1, 12, 30)
+    tasks = [Task(id=7, title="Tarefa", created_at=created)]
+
+    cursor = next_cursor(tasks, limit=1, sort="-created_at")
+
+    assert decode_sort_cursor(cursor, "created_at") == (7, created)
     
     
 def test_get_task_success(mock_db_session):
@@ -221,6 +308,43 @@ def test_update_task_not_found(mock_db_session):
     
     
     
+def test_update_task_with_returning(mock_db_session):
+    """Testa a atualização em um único UPDATE ... RETURNING, sem SELECT prévio"""
+    # Arrange
+    mock_db_session.get_bind.return_value.dialect.update_returning = True
+    updated = Task(id=1, title="Título Novo", description=None, version=2)
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = updated
+
+    # Act
+    result = update_task(db=mock_db_session, task_id=1, task=TaskCreate(title=" Título Novo "))
+
+    # Assert
+    assert result is updated
+    statement = str(mock_db_session.execute.call_args.args[0])
+    assert statement.startswith("UPDATE tasks SET title=")
+    assert "RETURNING" in statement
+    mock_db_session.query.assert_not_called()
+    mock_db_session.refresh.assert_not_called()
+    mock_db_session.expunge.assert_called_once_with(updated)
+    mock_db_session.commit.assert_called_once()
+
+
+def test_delete_task_with_returning_not_found(mock_db_session):
+    """Testa o 404 quando o DELETE ... RETURNING não encontra a tarefa"""
+    # Arrange
+    mock_db_session.get_bind.return_value.dialect.delete_returning = True
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = None
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc_info:
+        delete_task(db=mock_db_session, task_id=999)
+
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+    mock_db_session.execute.assert_called_once()
+    mock_db_session.query.assert_not_called()
+    mock_db_session.commit.assert_not_called()
+
+
 def test_delete_task_success(mock_db_session):
     """Testa a exclusão bem-sucedida de uma tarefa"""
     # Arrange
@@ -258,4 +382,87 @@ def test_delete_task_database_error_on_commit(mock_db_session):
     assert "Erro ao excluir a tarefa do banco de dados" in str(exc_info.value.detail)
     mock_db_session.delete.assert_called_once_with(task_to_delete)
     mock_db_session.commit.assert_called_once()
-    mock_db_session.rollback.assert_called_once()
\ No newline at end of file
+    mock_db_session.rollback.assert_called_once()
+
+
+def test_create_tasks_in_chunks(mock_db_session):
+    """Testa a criação em lote usando um INSERT multi-linha por bloco"""
+    # Arrange
+    tasks = [TaskCreate(title=f"Tarefa {i}") for i in range(5)]
+    mock_db_session.execute.return_value.scalars.return_value.all.side_effect = [
+        [2, 1], [4, 3], [5]
+    ]
+
+    # Act
+    result = create_tasks(db=mock_db_session, tasks=tasks, chunk_size=2)
+
+    # Assert
+    assert result.created == 5
+    assert result.ids == [1, 2, 3, 4, 5]
+    assert result.errors == []
+    assert mock_db_session.execute.call_count == 3
+    mock_db_session.commit.assert_called_once()
+
+
+def test_create_tasks_reports_invalid_items(mock_db_session):
+    """Testa que um item inválido é reportado sem impedir a criação dos demais"""
+    # Arrange
+    tasks = [TaskCreate(title="Válida"), TaskCreate(title="   "), TaskCreate(title="x" * 101)]
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [10]
+
+    # Act
+    result = create_tasks(db=mock_db_session, tasks=tasks)
+
+    # Assert
+    assert result.ids == [10]
+    assert [error.index for error in result.errors] == [1, 2]
+    assert "O título da tarefa não pode estar vazio" in result.errors[0].detail
+    mock_db_session.commit.assert_called_once()
+
+
+def test_create_tasks_all_or_nothing_rejects_batch(mock_db_session):
+    """Testa que no modo tudo-ou-nada um item inválido cancela o lote"""
+    # Arrange
+    tasks = [TaskCreate(title="Válida"), TaskCreate(title="  ")]
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc_info:
+        create_tasks(db=mock_db_session, tasks=tasks, all_or_nothing=True)
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    assert exc_info.value.detail[0]["index"] == 1
+    mock_db_session.execute.assert_not_called()
+    mock_db_session.commit.assert_not_called()
+
+
+def test_update_tasks_by_ids_reports_missing(mock_db_session):
+    """Testa a atualização em lote com um único UPDATE ... RETURNING"""
+    # Arrange
+    mock_db_session.get_bind.return_value.dialect.name = "sqlite"
+    mock_db_session.get_bind.return_value.dialect.update_returning = True
+    mock_db_session.execute.return_value.scalars.return_value = [3, 1]
+    changes = TaskBulkUpdate(ids=[1, 3, 7], title="  Nova  ")
+
+    # Act
+    result = update_tasks(mock_db_session, changes=changes)
+
+    # Assert
+    assert result.affected == 2
+    assert result.ids == [1, 3]
+    assert result.missing_ids == [7]
+    statement = mock_db_session.execute.call_args.args[0]
+    assert str(statement).startswith("UPDATE tasks SET title=")
+    assert "RETURNING tasks.id" in str(statement)
+    mock_db_session.commit.assert_called_once()
+
+
+def test_delete_tasks_requires_filter_criteria(mock_db_session):
+    """Testa que a exclusão por filtro exige ao menos um critério"""
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc_info:
+        delete_tasks(mock_db_session, selection=TaskBulkDelete(filter=TaskFilter(q="  ")))
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    mock_db_session.execute.assert_not_called()
+    mock_db_session.commit.assert_not_called()
+